@@ -1,6 +1,8 @@
 import os
 import sys
-from django.core.wsgi import get_wsgi_application
+import time
+
+_started = time.perf_counter()
 
 # Add the parent directory (project root) to Python path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -10,39 +12,51 @@ if project_root not in sys.path:
 # Set the Django settings module
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'job_portal.settings')
 
+# Seconds spent in each initialization phase (reported by manage.py profile_startup)
+startup_timings = {}
+
+
+def _phase(name, since):
+    now = time.perf_counter()
+    startup_timings[name] = round(now - since, 4)
+    return now
+
+
 try:
     # Initialize Django
     import django
     django.setup()
-    
-    # Run migrations automatically on startup (for Vercel)
-    # Only run once per deployment using a module-level flag
-    from django.core.management import call_command
-    from django.db import connection
+    mark = _phase('setup', _started)
+
+    from django.conf import settings
     from django.db.utils import OperationalError
-    
-    # Module-level flag to ensure migrations run only once
-    if not hasattr(sys.modules[__name__], '_migrations_run'):
-        try:
-            # Check if database is accessible
-            connection.ensure_connection()
-            
-            # Run migrations
-            print("Running database migrations...")
-            call_command('migrate', '--noinput', verbosity=0)
-            print("Migrations completed successfully")
-            
-            # Set flag to prevent re-running
-            setattr(sys.modules[__name__], '_migrations_run', True)
-        except OperationalError as db_error:
-            print(f"Database connection error: {db_error}")
-            # Continue anyway - let Django handle the error
-        except Exception as migration_error:
-            print(f"Migration error (non-fatal): {migration_error}")
-            # Continue anyway - migrations might already be applied
-    
+    from jobs import startup
+
+    # Replaces migrate-on-boot: a marker-file hit or one SELECT, and migrate
+    # only when something is pending (see jobs/startup.py)
+    try:
+        migration_status = startup.ensure_migrated()
+        print(f"Migrations: {migration_status}")
+    except OperationalError as db_error:
+        print(f"Database connection error: {db_error}")
+        # Continue anyway - let Django handle the error
+    except Exception as migration_error:
+        print(f"Migration error (non-fatal): {migration_error}")
+    mark = _phase('migrations', mark)
+
     # Get the WSGI application
+    from django.core.wsgi import get_wsgi_application
     app = get_wsgi_application()
+    mark = _phase('wsgi', mark)
+
+    if settings.STARTUP_WARMUP:
+        try:
+            startup.warmup()
+        except Exception as warmup_error:
+            # The broken page fails on its own when requested; serve the rest
+            print(f"Warmup error (non-fatal): {warmup_error}")
+        mark = _phase('warmup', mark)
+    startup_timings['total'] = round(mark - _started, 4)
 except Exception as e:
     print(f"Error initializing Django application: {e}")
     import traceback
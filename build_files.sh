@@ -45,6 +45,10 @@ export PYTHONPATH="${PYTHONPATH}:$(pwd)"
 echo "Validating Django configuration..."
 python3 manage.py check
 
+# Compile every template once, so syntax errors fail the build instead of a request
+echo "Compiling templates..."
+python3 manage.py warm_templates
+
 # 4. DATABASE MIGRATIONS - SKIPPED DURING BUILD
 # Migrations should be run manually or via a release hook
 echo "🗄️  Skipping database migrations during build..."
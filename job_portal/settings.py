@@ -6,6 +6,7 @@ Generated by 'django-admin startproject' using Django 6.0.1.
 
 from pathlib import Path
 import os
+import tempfile
 import dj_database_url
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -53,6 +54,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover every other middleware
+    'jobs.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -67,23 +70,39 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'job_portal.urls'
 
+# Template loading. 'cached' (default) keeps every compiled template in
+# process memory after its first use; 'uncached' reads and parses templates
+# on every render (template debugging only). Compile them all up front with
+# manage.py warm_templates or STARTUP_WARMUP (see jobs/startup.py).
+TEMPLATE_LOADING = os.environ.get('TEMPLATE_LOADING', 'cached')
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'jobs' / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            'loaders': (
+                TEMPLATE_LOADERS if TEMPLATE_LOADING == 'uncached'
+                else [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)]
+            ),
         },
     },
 ]
 
 WSGI_APPLICATION = 'job_portal.wsgi.application'
 
+# Keeps file-backed indexes of test runs out of the shared temp directory
+TEST_RUNNER = 'job_portal.test_runner.ScratchDirRunner'
+
 
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
@@ -106,6 +125,36 @@ else:
         }
     }
 
+# Caches
+# Rendered job card/detail fragments go to the 'template_fragments' cache
+# (used automatically by {% cache %}). JOB_FRAGMENT_CACHE picks its backend:
+# locmem (per process), file (shared by processes on one host), redis (shared
+# by all hosts; any Redis-compatible server, needs the redis package) or dummy.
+JOB_FRAGMENT_CACHE = os.environ.get('JOB_FRAGMENT_CACHE', 'locmem')
+JOB_FRAGMENT_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'job-fragments',
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('JOB_FRAGMENT_CACHE_LOCATION',
+                                   os.path.join(tempfile.gettempdir(), 'job_portal_fragments')),
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('JOB_FRAGMENT_CACHE_LOCATION', 'redis://127.0.0.1:6379/1'),
+        'KEY_PREFIX': 'job-fragments',
+    },
+    'dummy': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'template_fragments': JOB_FRAGMENT_CACHE_BACKENDS[JOB_FRAGMENT_CACHE],
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -162,14 +211,91 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Parse resumes in the background (manage.py process_resume_queue) instead
+# of inside the apply request; set to False where no worker can run
+RESUME_PARSE_ASYNC = os.environ.get('RESUME_PARSE_ASYNC', 'True').lower() == 'true'
+
+# Resume text extraction profile: 'accurate' (full pdfminer layout analysis)
+# or 'fast' (no layout analysis, page/character caps); see jobs/utils.py.
+# The caps below override the profile's own when set.
+RESUME_PARSE_PROFILE = os.environ.get('RESUME_PARSE_PROFILE', 'accurate')
+RESUME_PARSE_MAX_PAGES = int(os.environ['RESUME_PARSE_MAX_PAGES']) if os.environ.get('RESUME_PARSE_MAX_PAGES') else None
+RESUME_PARSE_MAX_CHARS = int(os.environ['RESUME_PARSE_MAX_CHARS']) if os.environ.get('RESUME_PARSE_MAX_CHARS') else None
+
+# Extracted resume text is cached by file hash (least recently used entries
+# are evicted past these limits; size is measured in characters of text)
+RESUME_TEXT_CACHE_MAX_ENTRIES = int(os.environ.get('RESUME_TEXT_CACHE_MAX_ENTRIES', 10000))
+RESUME_TEXT_CACHE_MAX_BYTES = int(os.environ.get('RESUME_TEXT_CACHE_MAX_BYTES', 200 * 1024 * 1024))
+# Checking those limits scans the table, so it runs once per this many stores
+RESUME_TEXT_CACHE_EVICT_EVERY = int(os.environ.get('RESUME_TEXT_CACHE_EVICT_EVERY', 100))
+# Point duplicate uploads at the already stored copy instead of saving another
+RESUME_REUSE_STORED_FILES = os.environ.get('RESUME_REUSE_STORED_FILES', 'False').lower() == 'true'
+
+# Job feed pagination: 'offset' (numbered pages) or 'cursor' (keyset on
+# created_at/id: deep pages cost the same as the first; see jobs/pagination.py)
+JOB_FEED_PAGINATION = os.environ.get('JOB_FEED_PAGINATION', 'offset')
+# How long a feed's "N jobs found" count is cached. Any Job change invalidates it
+# in every process: the generation it is cached under is a database row
+# (jobs/counts.py), so a per-process cache is enough.
+JOB_FEED_COUNT_CACHE_SECONDS = int(os.environ.get('JOB_FEED_COUNT_CACHE_SECONDS', 60))
+# On PostgreSQL, feeds the planner expects to exceed this many rows show its
+# row estimate instead of an exact COUNT(*); 0 always counts exactly
+JOB_COUNT_ESTIMATE_THRESHOLD = int(os.environ.get('JOB_COUNT_ESTIMATE_THRESHOLD', 10000))
+
 # File Upload Settings
 # For Vercel, we need to be careful with large files in memory
 DATA_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
 FILE_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
+# Stream every uploaded file to a temp file (hashing it on the way) instead of
+# buffering it in memory; storage then moves the temp file into place
+FILE_UPLOAD_HANDLERS = ['jobs.uploadhandlers.HashingTemporaryFileUploadHandler']
 
 # Custom User Model
 AUTH_USER_MODEL = 'jobs.User'
 
+# Job search backend: 'auto' (PostgreSQL full-text / SQLite FTS5, falling back
+# to an in-memory index), or force one of 'postgresql', 'sqlite', 'memory'.
+# The in-memory index is per process and only sees that process's writes, so
+# use it with a single worker.
+SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND', 'auto')
+
+# Autocomplete index snapshot shared by all workers on this machine
+# (must be writable; /tmp is the only writable path on Vercel). Unless a path
+# is given, one file per database is kept in AUTOCOMPLETE_SNAPSHOT_DIR.
+AUTOCOMPLETE_SNAPSHOT_PATH = os.environ.get('AUTOCOMPLETE_SNAPSHOT_PATH', '')
+AUTOCOMPLETE_SNAPSHOT_DIR = os.environ.get('AUTOCOMPLETE_SNAPSHOT_DIR', tempfile.gettempdir())
+
+# Serverless cold starts (api/index.py, jobs/startup.py).
+# STARTUP_MIGRATIONS: 'check' runs migrate only when the cached migration
+# fingerprint check finds pending migrations, 'always' runs it on every boot,
+# 'off' never. STARTUP_WARMUP builds the URL resolver and compiles every
+# project template during initialization instead of in the first requests.
+STARTUP_MIGRATIONS = os.environ.get('STARTUP_MIGRATIONS', 'check')
+STARTUP_WARMUP = os.environ.get('STARTUP_WARMUP', 'True').lower() == 'true'
+STARTUP_STATE_DIR = os.environ.get('STARTUP_STATE_DIR', tempfile.gettempdir())
+
+# In-process bitmap index over job filters (jobs/bitmaps.py), built in a
+# background thread on first use. The home feed and its facet counts use it
+# for filters it covers. It catches up on other workers' changes from the
+# JobChange log; one that cannot, or is older than JOB_BITMAP_INDEX_MAX_AGE
+# seconds, is rebuilt in the background at most once every
+# JOB_BITMAP_INDEX_MIN_REBUILD_SECONDS; the feed is filtered in SQL meanwhile.
+JOB_BITMAP_INDEX = os.environ.get('JOB_BITMAP_INDEX', 'True').lower() == 'true'
+JOB_BITMAP_INDEX_MAX_AGE = int(os.environ.get('JOB_BITMAP_INDEX_MAX_AGE', '300'))
+JOB_BITMAP_INDEX_MIN_REBUILD_SECONDS = int(os.environ.get('JOB_BITMAP_INDEX_MIN_REBUILD_SECONDS', '30'))
+
+# "Recommended jobs" index (jobs/recommendations.py): a directory of
+# memory-mapped vector files shared by all workers on this machine (must be
+# writable). Indexes with more active jobs than RECOMMENDATIONS_EXACT_MAX
+# are clustered, and a query then scans the RECOMMENDATIONS_NPROBE nearest
+# clusters instead of every job.
+RECOMMENDATIONS_INDEX_DIR = os.environ.get(
+    'RECOMMENDATIONS_INDEX_DIR',
+    os.path.join(tempfile.gettempdir(), 'job_portal_recommendations'),
+)
+RECOMMENDATIONS_EXACT_MAX = int(os.environ.get('RECOMMENDATIONS_EXACT_MAX', '20000'))
+RECOMMENDATIONS_NPROBE = int(os.environ.get('RECOMMENDATIONS_NPROBE', '8'))
+
 # Crispy Forms
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
@@ -222,6 +348,19 @@ else:
     EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD')
     DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'JobPortal <noreply@jobportal.com>')
 
+# Notification emails are queued in the outbox and delivered by
+# manage.py send_queued_emails; this caps its throughput (emails per second, 0 = no limit)
+EMAIL_OUTBOX_RATE_LIMIT = float(os.environ.get('EMAIL_OUTBOX_RATE_LIMIT', 0))
+
+# Request metrics (jobs/metrics.py), scraped from /metrics/ with
+# "Authorization: Bearer <METRICS_TOKEN>". Without a token the endpoint is a
+# 404 unless DEBUG is on. Requests slower than
+# METRICS_SLOW_REQUEST_MS (unset = off) are logged with their SQL to the
+# jobs.slow_requests logger.
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() == 'true'
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_SLOW_REQUEST_MS = int(os.environ['METRICS_SLOW_REQUEST_MS']) if os.environ.get('METRICS_SLOW_REQUEST_MS') else None
+
 # Django Allauth
 AUTHENTICATION_BACKENDS = [
     'django.contrib.auth.backends.ModelBackend',
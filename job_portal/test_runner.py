@@ -0,0 +1,27 @@
+import tempfile
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class ScratchDirRunner(DiscoverRunner):
+    """
+    Test runner keeping file-backed indexes in a temporary directory, not the
+    shared temp files. The job bitmap index is off unless a test enables it:
+    it would build itself in a background thread, outside the test's transaction.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.scratch = tempfile.TemporaryDirectory(prefix='job_portal_tests_')
+        self.scratch_settings = override_settings(
+            AUTOCOMPLETE_SNAPSHOT_PATH='',
+            AUTOCOMPLETE_SNAPSHOT_DIR=self.scratch.name,
+            JOB_BITMAP_INDEX=False,
+        )
+        self.scratch_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.scratch_settings.disable()
+        self.scratch.cleanup()
+        super().teardown_test_environment(**kwargs)
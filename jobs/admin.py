@@ -1,7 +1,11 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.utils.html import format_html
-from .models import User, Job, Application, Category
+from django.utils import timezone
+from django.template.response import TemplateResponse
+from django.urls import path
+from . import minhash
+from .models import User, Job, JobSignature, Application, Category, ResumeParseTask, ResumeTextCache, OutboundEmail
 
 class CustomUserAdmin(UserAdmin):
     fieldsets = UserAdmin.fieldsets + (
@@ -17,14 +21,10 @@ admin.site.register(User, CustomUserAdmin)
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
-    list_display = ('name', 'slug', 'job_count')
+    list_display = ('name', 'slug', 'open_jobs', 'total_jobs')
     prepopulated_fields = {'slug': ('name',)}
     search_fields = ('name', 'description')
     ordering = ('name',)
-    
-    def job_count(self, obj):
-        return obj.jobs.count()
-    job_count.short_description = 'Number of Jobs'
 
 @admin.register(Job)
 class JobAdmin(admin.ModelAdmin):
@@ -52,6 +52,33 @@ class JobAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_urls(self):
+        urls = [
+            path('near-duplicates/', self.admin_site.admin_view(self.near_duplicates_view),
+                 name='jobs_job_near_duplicates'),
+        ]
+        return urls + super().get_urls()
+
+    def near_duplicates_view(self, request):
+        """Groups of active jobs with near-identical descriptions (see jobs/minhash.py)."""
+        groups = minhash.near_duplicate_groups()
+        jobs = Job.objects.select_related('employer').in_bulk([pk for group in groups for pk in group])
+        signatures = dict(JobSignature.objects.filter(job__in=jobs).values_list('job_id', 'minhash'))
+        rows = []
+        for group in groups:
+            first = group[0]
+            for pk in group:
+                jobs[pk].similarity = minhash.similarity(signatures.get(first), signatures.get(pk)) * 100
+            rows.append([jobs[pk] for pk in group])
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Near-duplicate jobs',
+            'groups': rows,
+            'threshold_percent': round(minhash.DUPLICATE_THRESHOLD * 100),
+        }
+        return TemplateResponse(request, 'admin/jobs/job/near_duplicates.html', context)
+
     def employer_name(self, obj):
         return obj.employer.company_name or obj.employer.username
     employer_name.short_description = 'Employer'
@@ -66,12 +93,12 @@ class JobAdmin(admin.ModelAdmin):
 
 @admin.register(Application)
 class ApplicationAdmin(admin.ModelAdmin):
-    list_display = ('applicant_name', 'job_title', 'status', 'applied_at', 'has_resume')
-    list_filter = ('status', 'applied_at', 'job__category')
+    list_display = ('applicant_name', 'job_title', 'status', 'applied_at', 'has_resume', 'parse_status')
+    list_filter = ('status', 'parse_status', 'applied_at', 'job__category')
     search_fields = ('applicant__username', 'applicant__email', 'job__title', 'cover_letter')
     date_hierarchy = 'applied_at'
     ordering = ('-applied_at',)
-    readonly_fields = ('applied_at', 'parsed_text_preview')
+    readonly_fields = ('applied_at', 'parse_status', 'parsed_text_preview')
     
     fieldsets = (
         ('Application Info', {
@@ -81,7 +108,7 @@ class ApplicationAdmin(admin.ModelAdmin):
             'fields': ('resume', 'cover_letter')
         }),
         ('Parsed Resume', {
-            'fields': ('parsed_text_preview',),
+            'fields': ('parse_status', 'parsed_text_preview',),
             'classes': ('collapse',)
         }),
         ('Metadata', {
@@ -115,7 +142,46 @@ class ApplicationAdmin(admin.ModelAdmin):
         return 'No parsed text available'
     parsed_text_preview.short_description = 'Parsed Resume Text'
 
+@admin.register(ResumeParseTask)
+class ResumeParseTaskAdmin(admin.ModelAdmin):
+    list_display = ('application', 'status', 'attempts', 'run_after', 'updated_at')
+    list_filter = ('status',)
+    search_fields = ('application__applicant__username', 'application__job__title', 'last_error')
+    ordering = ('-created_at',)
+    readonly_fields = ('application', 'attempts', 'locked_until', 'last_error', 'created_at', 'updated_at')
+    actions = ['retry_tasks']
+
+    def retry_tasks(self, request, queryset):
+        from .tasks import enqueue_resume_parse
+        for task in queryset.select_related('application'):
+            enqueue_resume_parse(task.application)
+        self.message_user(request, f"Re-queued {queryset.count()} task(s).")
+    retry_tasks.short_description = 'Retry selected tasks'
+
+@admin.register(ResumeTextCache)
+class ResumeTextCacheAdmin(admin.ModelAdmin):
+    list_display = ('sha256', 'size', 'hits', 'created_at', 'last_used_at')
+    search_fields = ('sha256', 'file_name')
+    ordering = ('-last_used_at',)
+    readonly_fields = ('sha256', 'text', 'size', 'file_name', 'hits', 'created_at', 'last_used_at')
+
 # Customize admin site header and title
 admin.site.site_header = "Job Portal Administration"
 admin.site.site_title = "Job Portal Admin"
 admin.site.index_title = "Welcome to Job Portal Admin"
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'run_after', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('subject', 'recipients', 'last_error')
+    ordering = ('-created_at',)
+    readonly_fields = ('attempts', 'locked_until', 'last_error', 'created_at', 'sent_at')
+    actions = ['retry_emails']
+
+    def retry_emails(self, request, queryset):
+        updated = queryset.exclude(status='sent').update(
+            status='queued', attempts=0, run_after=timezone.now(), locked_until=None, last_error=''
+        )
+        self.message_user(request, f"Re-queued {updated} email(s).")
+    retry_emails.short_description = 'Retry selected emails'
@@ -0,0 +1,335 @@
+"""
+In-process autocomplete for job titles and locations.
+
+Distinct titles and locations of active jobs are kept in sorted arrays of
+word-start keys, so a completion is a bisect plus a short scan and never
+touches the database. Counts of active jobs per value are used to rank
+suggestions by popularity.
+
+The index is persisted to a JSON snapshot file (``snapshot_path()``, one
+per database) plus a log next to it: a Job signal appends one line with the
+job's new entry, under a file lock, instead of rewriting the snapshot. Other
+worker processes notice the log grew with a ``stat()`` and apply only the
+new lines. ``rebuild()`` (``manage.py rebuild_autocomplete``, worth running
+on a schedule) writes a fresh snapshot and empties the log; workers reload
+the snapshot when it changed.
+"""
+import hashlib
+import heapq
+import json
+import os
+import tempfile
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Completions per prefix kept in the per-index result cache.
+_CACHE_SIZE = 2048
+
+
+def normalize(text):
+    return ' '.join((text or '').lower().split())
+
+
+class PrefixIndex:
+    """
+    Sorted array of ``(key, value)`` pairs with one key per word start of
+    each value, so "pyth" completes "Senior Python Developer".
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        self.keys = []
+        self._cache = {}
+
+    def __len__(self):
+        return len(self.counts)
+
+    @classmethod
+    def from_values(cls, values):
+        """Index of ``values`` (repeats counted), with the keys sorted once."""
+        index = cls()
+        index.counts = Counter(value for value in values if value)
+        index.keys = sorted((key, value) for value in index.counts for key in cls._keys_for(value))
+        return index
+
+    @staticmethod
+    def _keys_for(value):
+        words = normalize(value).split(' ')
+        return {' '.join(words[i:]) for i in range(len(words))}
+
+    def add(self, value, n=1):
+        if not value:
+            return
+        if value not in self.counts:
+            for key in self._keys_for(value):
+                insort(self.keys, (key, value))
+        self.counts[value] += n
+        self._cache.clear()
+
+    def discard(self, value, n=1):
+        if value not in self.counts:
+            return
+        self.counts[value] -= n
+        if self.counts[value] <= 0:
+            del self.counts[value]
+            for key in self._keys_for(value):
+                i = bisect_left(self.keys, (key, value))
+                if i < len(self.keys) and self.keys[i] == (key, value):
+                    del self.keys[i]
+        self._cache.clear()
+
+    def complete(self, prefix, k=5):
+        """Returns up to ``k`` values with a word starting with ``prefix``, most popular first."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        cached = self._cache.get((prefix, k))
+        if cached is not None:
+            return cached
+
+        matches = set()
+        keys = self.keys
+        i = bisect_left(keys, (prefix,))
+        while i < len(keys) and keys[i][0].startswith(prefix):
+            matches.add(keys[i][1])
+            i += 1
+        counts = self.counts
+        result = heapq.nsmallest(k, matches, key=lambda value: (-counts[value], value.lower()))
+
+        if len(self._cache) >= _CACHE_SIZE:
+            self._cache.clear()
+        self._cache[(prefix, k)] = result
+        return result
+
+
+class AutocompleteService:
+    """Title and location prefix indexes plus the per-job entries they were built from."""
+
+    def __init__(self, snapshot_path):
+        self.snapshot_path = snapshot_path
+        self.log_path = snapshot_path + '.log'
+        self.titles = PrefixIndex()
+        self.locations = PrefixIndex()
+        self.entries = {}
+        self._loaded = False
+        # Identity of the loaded snapshot, and how much of the log is applied
+        self._snapshot_stat = None
+        self._log_offset = 0
+        self._lock = threading.RLock()
+
+    # Queries
+
+    def complete(self, term, k=5):
+        self._refresh()
+        return {
+            'titles': self.titles.complete(term, k),
+            'locations': self.locations.complete(term, k),
+        }
+
+    # Updates
+
+    def update_job(self, job):
+        entry = (job.title, job.location) if job.is_active else None
+        self._update(job.pk, entry)
+
+    def remove_job(self, job_id):
+        self._update(job_id, None)
+
+    def rebuild(self):
+        """Reloads every active job from the database, writes a fresh snapshot and empties the log."""
+        from .models import Job
+        # Lines appended from here on may be newer than the rows read below
+        log_start = self._log_size()
+        rows = Job.objects.filter(is_active=True).values_list('pk', 'title', 'location')
+        entries = {pk: (title, location) for pk, title, location in rows.iterator()}
+        with self._lock, self._snapshot_lock():
+            self._load_entries(entries)
+            self._log_offset = min(log_start, self._log_size())
+            self._read_log()
+            self._write_snapshot()
+        return len(self.entries)
+
+    def _update(self, job_id, entry):
+        self._refresh()
+        with self._lock, self._snapshot_lock():
+            self._catch_up()
+            if self.entries.get(job_id) == entry:
+                return
+            self._apply(job_id, entry)
+            self._append(job_id, entry)
+
+    def _apply(self, job_id, entry):
+        old = self.entries.pop(job_id, None)
+        if old is not None:
+            self.titles.discard(old[0])
+            self.locations.discard(old[1])
+        if entry is not None:
+            self.entries[job_id] = entry
+            self.titles.add(entry[0])
+            self.locations.add(entry[1])
+
+    def _load_entries(self, entries):
+        self.entries = dict(entries)
+        self.titles = PrefixIndex.from_values(title for title, _ in self.entries.values())
+        self.locations = PrefixIndex.from_values(location for _, location in self.entries.values())
+        self._loaded = True
+
+    # Snapshot handling
+
+    def _stat_snapshot(self):
+        try:
+            stat = os.stat(self.snapshot_path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _log_size(self):
+        try:
+            return os.stat(self.log_path).st_size
+        except OSError:
+            return 0
+
+    def _refresh(self):
+        """Loads the index on first use and applies what other workers wrote since."""
+        if (self._loaded and self._stat_snapshot() == self._snapshot_stat
+                and self._log_size() == self._log_offset):
+            return
+        with self._lock:
+            with self._snapshot_lock(shared=True):
+                loaded = self._catch_up()
+            if not loaded:
+                self.rebuild()
+
+    def _catch_up(self):
+        """Reloads a changed snapshot and applies new log lines; call with the snapshot lock held."""
+        snapshot = self._stat_snapshot()
+        if snapshot is None:
+            return False
+        if not self._loaded or snapshot != self._snapshot_stat or self._log_size() < self._log_offset:
+            if not self._read_snapshot():
+                return False
+        self._read_log()
+        return True
+
+    def _read_snapshot(self):
+        try:
+            with open(self.snapshot_path, encoding='utf-8') as f:
+                stat = os.fstat(f.fileno())
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        self._load_entries({pk: (title, location) for pk, title, location in data['jobs']})
+        self._snapshot_stat = stat.st_ino, stat.st_mtime_ns, stat.st_size
+        self._log_offset = 0
+        return True
+
+    def _read_log(self):
+        try:
+            with open(self.log_path, 'rb') as f:
+                f.seek(self._log_offset)
+                data = f.read()
+        except OSError:
+            return
+        # Only whole lines; appends happen under the lock, so this is just caution
+        data = data[:data.rfind(b'\n') + 1]
+        for line in data.splitlines():
+            try:
+                job_id, title, location = json.loads(line)
+            except ValueError:
+                continue
+            self._apply(job_id, (title, location) if title is not None else None)
+        self._log_offset += len(data)
+
+    def _append(self, job_id, entry):
+        title, location = entry or (None, None)
+        try:
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps([job_id, title, location]) + '\n')
+                self._log_offset = f.tell()
+        except OSError as e:
+            # The in-memory index is still correct for this worker
+            print(f"Autocomplete log write failed: {e}")
+
+    def _write_snapshot(self):
+        directory = os.path.dirname(self.snapshot_path) or '.'
+        data = {'jobs': [[pk, title, location] for pk, (title, location) in self.entries.items()]}
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                # dumps() uses the C encoder; dump() streams through the pure-Python one
+                f.write(json.dumps(data))
+            os.replace(tmp_path, self.snapshot_path)
+            # Every line of the log is in the snapshot now
+            if os.path.exists(self.log_path):
+                os.remove(self.log_path)
+        except OSError as e:
+            # The in-memory index is still correct for this worker
+            print(f"Autocomplete snapshot write failed: {e}")
+            return
+        self._snapshot_stat = self._stat_snapshot()
+        self._log_offset = 0
+
+    def _snapshot_lock(self, shared=False):
+        return _FileLock(self.snapshot_path + '.lock', shared)
+
+
+class _FileLock:
+    """Advisory lock across worker processes (no-op where fcntl is unavailable)."""
+
+    def __init__(self, path, shared=False):
+        self.path = path
+        self.shared = shared
+        self.file = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            try:
+                self.file = open(self.path, 'a')
+                fcntl.flock(self.file, fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX)
+            except OSError:
+                self.file = None
+        return self
+
+    def __exit__(self, *exc):
+        if self.file is not None:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+            self.file.close()
+            self.file = None
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def snapshot_path():
+    """``settings.AUTOCOMPLETE_SNAPSHOT_PATH``, else a file per database in ``AUTOCOMPLETE_SNAPSHOT_DIR``."""
+    path = getattr(settings, 'AUTOCOMPLETE_SNAPSHOT_PATH', None)
+    if path:
+        return path
+    directory = getattr(settings, 'AUTOCOMPLETE_SNAPSHOT_DIR', None) or tempfile.gettempdir()
+    digest = hashlib.sha1(str(connection.settings_dict['NAME']).encode()).hexdigest()[:12]
+    return os.path.join(directory, f'job_portal_autocomplete_{digest}.json')
+
+
+def get_service():
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = AutocompleteService(snapshot_path())
+    return _service
+
+
+def reset_service():
+    global _service
+    _service = None
@@ -0,0 +1,269 @@
+"""
+End-to-end request benchmarks for every URL in jobs/urls.py.
+
+``manage.py benchmark_views`` seeds a load-test data set (jobs/loadgen.py),
+then drives each ``SCENARIOS`` entry through the Django test client, which
+runs the full middleware, view and template stack. Per scenario it records
+wall-clock latency percentiles, queries per request and the peak memory
+allocated while handling one request (measured in separate runs under
+tracemalloc, so tracing does not distort the timings).
+
+Everything happens in one transaction that is rolled back, and uploads,
+the autocomplete snapshot, the recommendation index and the search backend
+are redirected to throwaway locations, so a run leaves no trace. That
+transaction never commits, so the ``transaction.on_commit`` work a request
+registers (index and counter updates, queued email) is run right after it,
+inside its timing, as a server would when the request's transaction commits.
+The job bitmap index is built up front, after seeding, so the scenarios
+time a warm index; a server builds it in the background on first use.
+"""
+import gc
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from statistics import median
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from . import autocomplete, bitmaps, recommendations, search
+from .benchmarking import make_pdf, percentile
+from .loadgen import LoadGenerator, refresh_derived_data
+from .models import Application, Job, User
+from .views import HomeView
+
+# /metrics/ needs a token outside DEBUG
+BENCHMARK_METRICS_TOKEN = 'benchmark'
+RESUME_PDF = make_pdf([['Jane Doe', 'Senior Python Developer', 'Django, PostgreSQL, AWS'] * 10])
+
+
+@dataclass
+class Scenario:
+    """
+    One kind of request. ``args`` and ``params`` may be callables taking
+    (BenchmarkData, iteration), for requests that must differ every time.
+    """
+    name: str
+    url_name: str
+    args: object = ()
+    params: object = field(default_factory=dict)
+    user: str = None  # 'employer', 'seeker' (no applications yet), 'applicant' or 'scraper'
+    method: str = 'get'
+
+    def request(self, data, iteration):
+        args = self.args(data, iteration) if callable(self.args) else self.args
+        params = self.params(data, iteration) if callable(self.params) else self.params
+        return reverse(self.url_name, args=args), params
+
+
+def _resume(data, iteration):
+    return {
+        'resume': SimpleUploadedFile('resume.pdf', RESUME_PDF, content_type='application/pdf'),
+        'cover_letter': 'I would love to join the team.',
+    }
+
+
+SCENARIOS = [
+    Scenario('home', 'home'),
+    Scenario('home_search', 'home', params={'query': 'senior python developer'}),
+    Scenario('home_filtered', 'home', params=lambda data, i: {'location': 'Remote', 'category': data.category}),
+    Scenario('home_faceted', 'home', params={'job_type': ['FT', 'CT'], 'salary': ['80-120', '120-160'],
+                                             'locations': 'Remote', 'salary_min': '60000'}),
+    Scenario('home_deep_page', 'home', params=lambda data, i: {'page': data.deep_page}),
+    Scenario('job_autocomplete', 'job_autocomplete', params=lambda data, i: {'term': ('py', 'eng', 'sen', 'lon')[i % 4]}),
+    Scenario('recommended_jobs', 'recommended_jobs', user='applicant'),
+    Scenario('job_detail', 'job_detail', args=lambda data, i: [data.job_slugs[i % len(data.job_slugs)]]),
+    Scenario('apply_job_form', 'apply_job', args=lambda data, i: [data.job_slugs[0]], user='seeker'),
+    # A new job every time: a seeker can only apply once
+    Scenario('apply_job_submit', 'apply_job', args=lambda data, i: [data.job_slugs[i % len(data.job_slugs)]],
+             params=_resume, user='seeker', method='post'),
+    Scenario('company_list', 'company_list'),
+    Scenario('company_detail', 'company_detail', args=lambda data, i: [data.employer.pk]),
+    Scenario('employer_dashboard', 'employer_dashboard', user='employer'),
+    Scenario('post_job_form', 'post_job', user='employer'),
+    Scenario('update_job_form', 'update_job', args=lambda data, i: [data.hot_job], user='employer'),
+    Scenario('job_applications', 'job_applications', args=lambda data, i: [data.hot_job], user='employer'),
+    Scenario('job_applications_match', 'job_applications', args=lambda data, i: [data.hot_job],
+             params={'sort': 'match'}, user='employer'),
+    Scenario('health_check', 'health_check'),
+    Scenario('metrics', 'metrics', user='scraper'),
+]
+
+
+@dataclass
+class BenchmarkData:
+    employer: User
+    seeker: User
+    applicant: User
+    hot_job: str
+    job_slugs: list
+    category: str
+    deep_page: int
+    volumes: dict
+
+
+def prepare_data(profile, progress=None):
+    """Seeds ``profile`` (unless its prefix is already loaded) and picks the benchmark's actors."""
+    generator = LoadGenerator(profile, progress=progress)
+    if not generator.existing():
+        generator.run()
+        refresh_derived_data(Job.objects.filter(employer__username__startswith=f'{profile.prefix}-employer-'))
+
+    prefix = f'{profile.prefix}-'
+    jobs = Job.objects.filter(employer__username__startswith=f'{prefix}employer-', is_active=True)
+    volumes = {
+        'employers': User.objects.filter(username__startswith=f'{prefix}employer-').count(),
+        'seekers': User.objects.filter(username__startswith=f'{prefix}seeker-').count(),
+        'jobs': Job.objects.filter(employer__username__startswith=f'{prefix}employer-').count(),
+        'applications': Application.objects.filter(job__employer__username__startswith=f'{prefix}employer-').count(),
+    }
+    # The most-applied-to posting: the heaviest applications page
+    hot_job = jobs.annotate(n=Count('applications')).order_by('-n', 'pk').select_related('employer', 'category').first()
+    if hot_job is None:
+        raise ValueError('The benchmark data set has no active jobs')
+    # The seeker with the most applications: the broadest recommendation profile
+    applicant = (
+        User.objects.filter(username__startswith=f'{prefix}seeker-').annotate(n=Count('applications'))
+        .order_by('-n', 'pk').first()
+    )
+    seeker = User.objects.create_user(username=f'{profile.prefix}-benchmark-seeker', is_seeker=True,
+                                      email='seeker@benchmark.example.com')
+    return BenchmarkData(
+        employer=hot_job.employer,
+        seeker=seeker,
+        applicant=applicant or seeker,
+        hot_job=hot_job.slug,
+        # Enough distinct jobs for apply_job_submit to never repeat one
+        job_slugs=list(jobs.order_by('-created_at').values_list('slug', flat=True)[:10000]),
+        category=hot_job.category.slug if hot_job.category else '',
+        deep_page=max(1, min(50, Job.objects.filter(is_active=True).count() // HomeView.paginate_by)),
+        volumes=volumes,
+    )
+
+
+def run_commit_hooks(start):
+    """
+    Runs and discards the on_commit callbacks registered after the first
+    ``start``, like ``TestCase.captureOnCommitCallbacks(execute=True)``.
+    """
+    # Callbacks may register more
+    while len(connection.run_on_commit) > start:
+        callbacks = connection.run_on_commit[start:]
+        del connection.run_on_commit[start:]
+        for _, callback, _ in callbacks:
+            callback()
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def run_scenario(scenario, data, clients, requests=100, warmup=5, traced=5):
+    """
+    Times ``requests`` requests for ``scenario`` after ``warmup`` untimed ones.
+    Returns:
+        dict: latency percentiles (ms), queries and peak allocation per request.
+    """
+    client = clients[scenario.user]
+    send = getattr(client, scenario.method)
+    iteration = 0
+
+    def call():
+        nonlocal iteration
+        path, params = scenario.request(data, iteration)
+        iteration += 1
+        pending = len(connection.run_on_commit)
+        response = send(path, params)
+        run_commit_hooks(pending)
+        if response.status_code >= 400:
+            raise AssertionError(f'{scenario.name}: {scenario.method.upper()} {path} returned {response.status_code}')
+        return response
+
+    for _ in range(warmup):
+        call()
+
+    timings, queries = [], []
+    gc.collect()
+    for _ in range(requests):
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            started = time.perf_counter()
+            call()
+            timings.append(time.perf_counter() - started)
+        queries.append(counter.count)
+
+    peaks = []
+    for _ in range(traced):
+        gc.collect()
+        tracemalloc.start()
+        try:
+            call()
+            peaks.append(tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+
+    ms = [t * 1000 for t in timings]
+    return {
+        'requests': requests,
+        'p50_ms': round(percentile(ms, 50), 3),
+        'p95_ms': round(percentile(ms, 95), 3),
+        'p99_ms': round(percentile(ms, 99), 3),
+        'max_ms': round(max(ms), 3),
+        'queries': max(queries),
+        'queries_median': median(queries),
+        'peak_alloc_bytes': int(median(peaks)) if peaks else 0,
+    }
+
+
+def run_suite(profile, scenarios=SCENARIOS, requests=100, warmup=5, traced=5, progress=None, report=None):
+    """
+    Seeds ``profile`` and runs ``scenarios``, all inside a rolled-back
+    transaction. ``report(name, result)`` is called after each scenario.
+    Returns:
+        tuple: (data volumes, {scenario name: result})
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as scratch, override_settings(
+        ALLOWED_HOSTS=['testserver'],
+        MEDIA_ROOT=scratch,
+        AUTOCOMPLETE_SNAPSHOT_PATH=f'{scratch}/autocomplete.json',
+        RECOMMENDATIONS_INDEX_DIR=f'{scratch}/recommendations',
+        METRICS_TOKEN=BENCHMARK_METRICS_TOKEN,
+        # A background rebuild would not see the uncommitted data
+        JOB_BITMAP_INDEX_MAX_AGE=24 * 3600,
+    ):
+        autocomplete.reset_service()
+        bitmaps.reset_index()
+        recommendations.reset_index()
+        search.reset_backend()
+        try:
+            with transaction.atomic():
+                data = prepare_data(profile, progress=progress)
+                # Built once the data exists, in this transaction
+                bitmaps.start()
+                clients = {None: Client(), 'employer': Client(), 'seeker': Client(), 'applicant': Client(),
+                           'scraper': Client(headers={'Authorization': f'Bearer {BENCHMARK_METRICS_TOKEN}'})}
+                clients['employer'].force_login(data.employer)
+                clients['seeker'].force_login(data.seeker)
+                clients['applicant'].force_login(data.applicant)
+                for scenario in scenarios:
+                    results[scenario.name] = run_scenario(scenario, data, clients, requests, warmup, traced)
+                    if report:
+                        report(scenario.name, results[scenario.name])
+                transaction.set_rollback(True)
+        finally:
+            autocomplete.reset_service()
+            bitmaps.reset_index()
+            recommendations.reset_index()
+            search.reset_backend()
+    return data.volumes, results
@@ -0,0 +1,123 @@
+"""
+Helpers shared by the ``benchmark_*`` management commands.
+"""
+import gc
+import time
+import tracemalloc
+from statistics import median
+
+
+def _escape_pdf_text(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def make_pdf(pages):
+    """
+    Builds a PDF in memory.
+    Args:
+        pages: A string (one page, one line) or a list of pages, each a list of lines.
+    Returns:
+        bytes: The PDF file.
+    """
+    if isinstance(pages, str):
+        pages = [[pages]]
+
+    font_id = 3
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        font_id: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    kids = []
+    next_id = 4
+    for lines in pages:
+        page_id, content_id = next_id, next_id + 1
+        next_id += 2
+        commands = ["BT /F1 11 Tf 14 TL 72 760 Td"]
+        for line in lines:
+            commands.append(f"({_escape_pdf_text(line)}) Tj T*")
+        commands.append("ET")
+        stream = '\n'.join(commands).encode('latin-1', 'replace')
+        objects[content_id] = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        objects[page_id] = (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (font_id, content_id)
+        )
+        kids.append(b"%d 0 R" % page_id)
+    objects[2] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b' '.join(kids), len(kids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for number in sorted(objects):
+        offsets[number] = len(out)
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, objects[number])
+    xref = len(out)
+    size = max(objects) + 1
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % size
+    for number in range(1, size):
+        out += b"%010d 00000 n \n" % offsets[number]
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref)
+    return bytes(out)
+
+
+def measure(func, *args, repeat=3, trace_memory=True):
+    """
+    Times ``repeat`` runs of ``func(*args)``, then (optionally) one more run
+    under tracemalloc, so tracing overhead does not distort the timings.
+    Returns:
+        dict: median/min wall time in seconds and peak traced memory in bytes.
+    """
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - started)
+
+    peak = 0
+    if trace_memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func(*args)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {'median': median(timings), 'min': min(timings), 'peak_memory': peak}
+
+
+def format_bytes(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f'{size:.1f}{unit}'
+        size /= 1024
+
+
+def percentile(samples, q):
+    """The ``q``-th percentile (0-100) of ``samples``, interpolating between ranks."""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def compare_to_baseline(results, baseline, threshold=0.1, metric='p95_ms'):
+    """
+    Compares two benchmark result dicts ({name: {metric: value, 'queries': n}}).
+    A scenario regresses when ``metric`` grew by more than ``threshold``
+    (a fraction) or it runs more queries than before.
+    Returns:
+        list: (name, baseline value, current value, relative change, regressed)
+        for every scenario present in both.
+    """
+    rows = []
+    for name, current in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        change = (current[metric] - before[metric]) / before[metric] if before[metric] else 0.0
+        regressed = change > threshold or current['queries'] > before['queries']
+        rows.append((name, before[metric], current[metric], change, regressed))
+    return rows
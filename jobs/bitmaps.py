@@ -0,0 +1,445 @@
+"""
+In-process bitmap index over the low-cardinality job filters.
+
+Every job gets a slot, in feed order (created_at, id), and every value of
+``is_active``, ``job_type``, ``category`` and salary band (jobs/facets.py)
+a bitset over the slots: one uint64 word per 64 jobs, about 125KB per value
+for a million jobs. A feed filter is then a few word-wise ORs and ANDs, its
+size a popcount and a page the highest set bits past an offset, so the home
+page fetches only the rows it shows, by primary key. Facet counts are one
+popcount per value. Exact ``location`` has thousands of values, too many
+for a bitset each; it is kept as one value code per slot (4 bytes a job),
+filtered and counted with a pass over those codes.
+
+Nothing is built at startup: the first request that could use the index
+starts building it in a background thread and is served from SQL, as are
+requests until the build finishes. From then on the Job signals of this
+process (jobs/signals.py) keep it current. Every committed Job change, in
+any process, bumps the feed generation row in the database (jobs/counts.py)
+and logs the job it was for (JobChange); the index remembers the generation
+it has applied, and views compare it with the one they read for the
+request. An index behind on other processes' changes catches up by
+re-reading just the logged jobs, for up to MAX_CATCH_UP changes. Further
+behind, past a gap in the log (bulk writes log none) or older than
+JOB_BITMAP_INDEX_MAX_AGE seconds, it is rebuilt in the background, at most
+once every JOB_BITMAP_INDEX_MIN_REBUILD_SECONDS; views use SQL meanwhile.
+Needs NumPy.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from . import counts
+from .facets import salary_band, salary_band_of
+from .metrics import registry as metrics
+from .search import SearchResults
+
+try:
+    import numpy as np
+except ImportError:  # Optional: views filter in SQL without it
+    np = None
+
+# Indexed job fields, named like the facets they answer (see facets.FACETS)
+FIELDS = ('is_active', 'job_type', 'category', 'locations', 'salary')
+# Fields with too many values for a bitset each: only the value code of every slot is kept
+SPARSE_FIELDS = ('locations',)
+# Logged changes a stale index applies itself before it asks for a rebuild
+MAX_CATCH_UP = 1000
+# Slots are added in blocks of this many (a multiple of 64)
+_GROWTH = 4096
+
+logger = logging.getLogger(__name__)
+
+
+def available():
+    return np is not None and getattr(settings, 'JOB_BITMAP_INDEX', True)
+
+
+def _popcount(words):
+    """Set bits in each uint64 word."""
+    if hasattr(np, 'bitwise_count'):  # NumPy 2.0+
+        return np.bitwise_count(words)
+    return np.unpackbits(words.view(np.uint8)).reshape(*words.shape, 64).sum(axis=-1)
+
+
+def _set_bits(words, positions):
+    np.bitwise_or.at(words, positions >> 6, np.uint64(1) << (positions & 63).astype(np.uint64))
+
+
+def _job_values(job):
+    return (job.is_active, job.job_type, job.category_id, job.location,
+            salary_band_of(job.salary_min, job.salary_max))
+
+
+def _job_rows(jobs):
+    """(pk, *_job_values()) for each of ``jobs``, in feed order."""
+    return list(
+        jobs.order_by('created_at', 'id').annotate(salary_band=salary_band())
+        .values_list('pk', 'is_active', 'job_type', 'category_id', 'location', 'salary_band')
+    )
+
+
+class BitmapIndex:
+    """
+    Bitsets per value of each of ``FIELDS``, over job slots. Use through
+    ``get_index()``; every method takes the index lock.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.rebuilding = threading.Lock()
+        self.rebuild_started = None
+        self.generation = None
+        self.built_at = None
+        self.build_seconds = 0.0
+        self._reset(0)
+
+    def _reset(self, capacity):
+        self.size = 0
+        self.slot_pks = np.zeros(capacity, dtype=np.int64)
+        self.pk_slots = np.full(0, -1, dtype=np.int64)
+        self.values = {field: [] for field in FIELDS}
+        self.lookup = {field: {} for field in FIELDS}
+        # field -> (values x words) bit matrix, and the value code of every slot (-1: none)
+        self.bits = {field: np.zeros((0, capacity // 64), dtype='<u8')
+                     for field in FIELDS if field not in SPARSE_FIELDS}
+        self.codes = {field: np.full(capacity, -1, dtype=np.int32) for field in FIELDS}
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def nbytes(self):
+        arrays = [self.slot_pks, self.pk_slots, *self.bits.values(), *self.codes.values()]
+        return sum(array.nbytes for array in arrays)
+
+    def _code(self, field, value):
+        """Row of ``value`` in the field's bit matrix, added when new."""
+        code = self.lookup[field].get(value)
+        if code is None:
+            code = self.lookup[field][value] = len(self.values[field])
+            self.values[field].append(value)
+            if field in self.bits:
+                # Rare outside _load(), which sizes the matrices up front
+                bits = self.bits[field]
+                self.bits[field] = np.vstack([bits, np.zeros((1, bits.shape[1]), dtype=bits.dtype)])
+        return code
+
+    def _grow(self, capacity):
+        old = len(self.slot_pks)
+        if capacity <= old:
+            return
+        self.slot_pks = np.concatenate([self.slot_pks, np.zeros(capacity - old, dtype=np.int64)])
+        for field in FIELDS:
+            self.codes[field] = np.concatenate([self.codes[field], np.full(capacity - old, -1, dtype=np.int32)])
+        for field, bits in self.bits.items():
+            self.bits[field] = np.hstack([bits, np.zeros((bits.shape[0], (capacity - old) // 64), dtype=bits.dtype)])
+
+    def _publish(self):
+        metrics.set_gauge('jobs_bitmap_index_bytes', self.nbytes)
+        metrics.set_gauge('jobs_bitmap_index_jobs', self.size)
+
+    # Building and maintenance
+
+    def rebuild(self):
+        """Reloads every job from the database."""
+        from .models import Job
+
+        started = time.perf_counter()
+        # Read first: changes made while loading leave the index stale, not wrong
+        generation = counts.generation()
+        rows = _job_rows(Job.objects.all())
+        # Loaded aside, so requests keep using the old bitsets meanwhile
+        fresh = BitmapIndex()
+        fresh._load(rows)
+        with self.lock:
+            for name in ('size', 'slot_pks', 'pk_slots', 'values', 'lookup', 'bits', 'codes'):
+                setattr(self, name, getattr(fresh, name))
+            self.generation = generation
+            self.built_at = time.monotonic()
+            self.build_seconds = time.perf_counter() - started
+        metrics.set_gauge('jobs_bitmap_index_rebuild_seconds', round(self.build_seconds, 6))
+        self._publish()
+
+    def _load(self, rows):
+        capacity = -(-max(len(rows), 1) // 64) * 64
+        self._reset(capacity)
+        if rows:
+            columns = list(zip(*rows))
+            self.size = len(rows)
+            self.slot_pks[:self.size] = columns[0]
+            self.pk_slots = np.full(max(columns[0]) + 1, -1, dtype=np.int64)
+            self.pk_slots[self.slot_pks[:self.size]] = np.arange(self.size)
+            slots = np.arange(self.size, dtype=np.int64)
+            for field, column in zip(FIELDS, columns[1:]):
+                # Code every value first, so each bit matrix is allocated once, at its final size
+                lookup = self.lookup[field]
+                codes = np.fromiter((lookup.setdefault(value, len(lookup)) for value in column),
+                                    dtype=np.int32, count=self.size)
+                self.values[field] = list(lookup)
+                self.codes[field][:self.size] = codes
+                if field in self.bits:
+                    words = capacity // 64
+                    self.bits[field] = np.zeros((len(lookup), words), dtype='<u8')
+                    _set_bits(self.bits[field].reshape(-1), codes.astype(np.int64) * words * 64 + slots)
+
+    def schedule_rebuild(self):
+        """
+        Starts ``rebuild()`` in a background thread, unless one is running or
+        the last one started less than JOB_BITMAP_INDEX_MIN_REBUILD_SECONDS ago.
+        """
+        min_interval = getattr(settings, 'JOB_BITMAP_INDEX_MIN_REBUILD_SECONDS', 30)
+        if self.rebuild_started is not None and time.monotonic() - self.rebuild_started < min_interval:
+            return
+        if not self.rebuilding.acquire(blocking=False):
+            return
+        self.rebuild_started = time.monotonic()
+        threading.Thread(target=self._rebuild_in_background, name='job-bitmap-index', daemon=True).start()
+
+    def _rebuild_in_background(self):
+        try:
+            self.rebuild()
+        except Exception:
+            # Requests keep using SQL; the next stale request tries again
+            logger.exception('Could not build the job bitmap index')
+        finally:
+            self.rebuilding.release()
+            # This thread's own database connection
+            connection.close()
+
+    def catch_up(self, feed_generation):
+        """
+        Applies the changes logged in JobChange since the index's generation,
+        re-reading only those jobs.
+        Returns:
+            bool: Whether the index is now at ``feed_generation``; False when
+            it needs a rebuild (never built, expired, too far behind, or the
+            log has a gap).
+        """
+        from .models import Job, JobChange
+
+        start = self.generation
+        if start is None or self.expired() or not 0 < feed_generation - start <= MAX_CATCH_UP:
+            return False
+        changes = dict(
+            JobChange.objects.filter(generation__gt=start, generation__lte=feed_generation)
+            .values_list('generation', 'job_id')
+        )
+        if len(changes) != feed_generation - start:
+            return False
+        job_ids = set(changes.values())
+        # Read after the log: any later change to these rows is logged past feed_generation
+        rows = {row[0]: row[1:] for row in _job_rows(Job.objects.filter(pk__in=job_ids))}
+        with self.lock:
+            if self.generation is None or self.generation < start:
+                # Replaced by a rebuild from before ``start`` meanwhile
+                return False
+            for job_id in job_ids - rows.keys():
+                self._remove(job_id)
+            # In feed order, so new jobs get slots oldest first
+            for job_id, values in rows.items():
+                self._place(job_id, values)
+            self.generation = max(self.generation, feed_generation)
+        self._publish()
+        return True
+
+    def _absorb(self, generation):
+        # The change that moved the shared generation to ``generation`` is now applied
+        if generation is not None and self.generation is not None and generation == self.generation + 1:
+            self.generation = generation
+
+    def update_job(self, job, generation=None):
+        """Applies a saved job; ``generation`` is the feed generation its commit produced."""
+        with self.lock:
+            # Nothing to apply before the first build, which reads it from the database
+            if self.generation is None:
+                return
+            self._place(job.pk, _job_values(job))
+            self._absorb(generation)
+        self._publish()
+
+    def remove_job(self, job_id, generation=None):
+        with self.lock:
+            if self.generation is None:
+                return
+            self._remove(job_id)
+            self._absorb(generation)
+
+    def _place(self, job_id, values):
+        slot = self.pk_slots[job_id] if job_id < len(self.pk_slots) else -1
+        if slot < 0:
+            # New jobs are the newest: they go after every existing slot
+            slot = self.size
+            self.size += 1
+            self._grow(-(-self.size // _GROWTH) * _GROWTH)
+            if job_id >= len(self.pk_slots):
+                self.pk_slots = np.concatenate([self.pk_slots, np.full(job_id + 1 - len(self.pk_slots), -1,
+                                                                       dtype=np.int64)])
+            self.pk_slots[job_id] = slot
+            self.slot_pks[slot] = job_id
+        for field, value in zip(FIELDS, values):
+            self._assign(field, slot, self._code(field, value))
+
+    def _remove(self, job_id):
+        if job_id < len(self.pk_slots) and self.pk_slots[job_id] >= 0:
+            for field in FIELDS:
+                self._assign(field, self.pk_slots[job_id], -1)
+            self.pk_slots[job_id] = -1
+
+    def _assign(self, field, slot, code):
+        old = self.codes[field][slot]
+        self.codes[field][slot] = code
+        if field not in self.bits:
+            return
+        word, bit = slot >> 6, np.uint64(1) << np.uint64(slot & 63)
+        if old >= 0:
+            self.bits[field][old, word] &= ~bit
+        if code >= 0:
+            self.bits[field][code, word] |= bit
+
+    # Queries
+
+    def expired(self):
+        """Never built, or built more than JOB_BITMAP_INDEX_MAX_AGE seconds ago."""
+        max_age = getattr(settings, 'JOB_BITMAP_INDEX_MAX_AGE', 300)
+        return self.built_at is None or time.monotonic() - self.built_at >= max_age
+
+    def is_current(self, feed_generation=None):
+        if self.expired():
+            return False
+        return self.generation == (counts.generation() if feed_generation is None else feed_generation)
+
+    @staticmethod
+    def supports(filters):
+        """Whether the index alone can answer ``filters`` (no text, free-text location or salary range)."""
+        return not (filters.query.strip() or filters.location.strip()
+                    or filters.salary_min is not None or filters.salary_max is not None)
+
+    def _any(self, field, values):
+        rows = [self.lookup[field][value] for value in values if value in self.lookup[field]]
+        if field not in self.bits:
+            return np.packbits(np.isin(self.codes[field], rows), bitorder='little').view('<u8')
+        if not rows:
+            return np.zeros(self.bits[field].shape[1], dtype='<u8')
+        return np.bitwise_or.reduce(self.bits[field][rows], axis=0)
+
+    def mask(self, selections, skip=None):
+        """Slots of active jobs matching ``selections`` (facet -> stored values), ignoring facet ``skip``."""
+        with self.lock:
+            mask = self._any('is_active', [True])
+            for field, values in selections.items():
+                if values and field != skip:
+                    mask &= self._any(field, values)
+            return mask
+
+    def count(self, selections):
+        """Facet counts like ``FacetTable.count``: each facet ignores its own selection."""
+        with self.lock:
+            result = {}
+            for field in FIELDS[1:]:
+                mask = self.mask(selections, skip=field)
+                if field in self.bits:
+                    totals = _popcount(self.bits[field] & mask).sum(axis=1)
+                else:
+                    codes = self.codes[field][np.unpackbits(mask.view(np.uint8), bitorder='little').view(bool)]
+                    totals = np.bincount(codes[codes >= 0], minlength=len(self.values[field]))
+                result[field] = {self.values[field][code]: int(totals[code]) for code in np.flatnonzero(totals)}
+            return result
+
+    def page(self, mask, offset, limit):
+        """Job ids of the set slots in ``mask``, newest first, from ``offset`` on."""
+        with self.lock:
+            # Set bits in the newest 1, 2, ... words
+            seen = np.cumsum(_popcount(mask)[::-1], dtype=np.int64)
+            total = int(seen[-1]) if len(seen) else 0
+            end = total if limit is None else min(total, offset + limit)
+            if offset >= end:
+                return []
+            first = int(np.searchsorted(seen, offset, side='right'))
+            last = int(np.searchsorted(seen, end - 1, side='right'))
+            start_word = len(mask) - 1 - last
+            bits = np.unpackbits(mask[start_word:len(mask) - first].view(np.uint8), bitorder='little')
+            slots = np.flatnonzero(bits)[::-1] + start_word * 64
+            skip = offset - (int(seen[first - 1]) if first else 0)
+            return self.slot_pks[slots[skip:skip + end - offset]].tolist()
+
+    def search(self, selections, queryset):
+        return BitmapResults(self, selections, queryset)
+
+
+class BitmapResults(SearchResults):
+    """
+    The feed for filters the index answers, newest first. Like
+    SearchResults, only the requested page of Job rows is loaded;
+    ``queryset`` repeats the filters, so rows the index still lists but the
+    database no longer matches are dropped.
+    """
+
+    def __init__(self, index, selections, queryset):
+        super().__init__(None, [], queryset)
+        self.index = index
+        self.mask = index.mask(selections)
+
+    def count(self):
+        if self._count is None:
+            self._count = int(_popcount(self.mask).sum())
+        return self._count
+
+    def ranked_ids(self, offset, limit):
+        return self.index.page(self.mask, offset, limit)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _get_or_create():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = BitmapIndex()
+        return _index
+
+
+def start():
+    """
+    Builds this process's index now, in the calling thread, unless it was
+    built already. Returns it, or None when disabled. Requests never wait
+    for a build (see ``get_index()``); this is for benchmarks and tests.
+    """
+    if not available():
+        return None
+    index = _get_or_create()
+    if index.built_at is None:
+        index.rebuild()
+    return index
+
+
+def get_index(refresh=True, feed_generation=None):
+    """
+    This process's index if it is current, or could catch up on the logged
+    changes; otherwise None (filter in SQL), after starting a background
+    build. ``refresh=False`` returns the index as is, even unbuilt or stale,
+    for maintenance. ``feed_generation`` is ``counts.generation()``, when the
+    caller already read it.
+    """
+    if not available():
+        return None
+    if not refresh:
+        return _index
+    index = _index or _get_or_create()
+    if feed_generation is None:
+        feed_generation = counts.generation()
+    if index.is_current(feed_generation) or index.catch_up(feed_generation):
+        return index
+    index.schedule_rebuild()
+    return None
+
+
+def reset_index():
+    """Drops the index; ``start()`` builds a new one."""
+    global _index
+    _index = None
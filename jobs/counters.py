@@ -0,0 +1,82 @@
+"""
+Denormalized job counters on Category and employer User rows.
+
+``open_jobs`` (active) and ``total_jobs`` are adjusted with F() expressions
+from the Job save/delete signals in jobs/signals.py, inside the same
+transaction as the Job write; a save locks the job's row while it reads the
+state it is replacing, so concurrent saves of one job apply their deltas in
+turn. ``reconcile`` recomputes them in bulk for
+writes that bypass signals (``QuerySet.update``, raw SQL, fixtures); see
+``manage.py reconcile_job_counts``.
+"""
+from collections import defaultdict
+
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Category, Job, User
+
+# Job foreign key -> model holding the counters
+COUNTED_RELATIONS = (('category', Category), ('employer', User))
+
+
+def job_state(job):
+    """The parts of a job the counters depend on."""
+    return {'category': job.category_id, 'employer': job.employer_id, 'is_active': job.is_active}
+
+
+def apply_job_change(previous, current):
+    """
+    Adjusts the counters for a job going from ``previous`` to ``current``
+    (job_state() dicts; None for a job being created or deleted).
+    """
+    deltas = defaultdict(lambda: [0, 0])
+    for state, sign in ((previous, -1), (current, 1)):
+        if state is None:
+            continue
+        for field, model in COUNTED_RELATIONS:
+            if state[field] is not None:
+                delta = deltas[model, state[field]]
+                delta[0] += sign
+                delta[1] += sign if state['is_active'] else 0
+
+    for (model, pk), (total, active) in deltas.items():
+        if total or active:
+            model.objects.filter(pk=pk).update(
+                total_jobs=F('total_jobs') + total, open_jobs=F('open_jobs') + active,
+            )
+
+
+def _count_subquery(job_model, field, **filters):
+    counts = (
+        job_model.objects.filter(**{field: OuterRef('pk')}, **filters).order_by()
+        .values(field).annotate(count=Count('pk')).values('count')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def reconcile_model(model, field, job_model=Job, dry_run=False):
+    """
+    Recomputes ``model``'s counters from ``job_model`` rows related through
+    ``field``. Works with historical models, for data migrations.
+    Returns:
+        int: The number of rows whose counters were wrong.
+    """
+    total = _count_subquery(job_model, field)
+    active = _count_subquery(job_model, field, is_active=True)
+    drifted = (
+        model.objects.annotate(actual_total=total, actual_open=active)
+        .filter(~Q(total_jobs=F('actual_total')) | ~Q(open_jobs=F('actual_open')))
+    )
+    count = drifted.count()
+    if count and not dry_run:
+        model.objects.filter(pk__in=drifted.values('pk')).update(total_jobs=total, open_jobs=active)
+    return count
+
+
+def reconcile(dry_run=False):
+    """Returns {model name: rows fixed} for every counted model."""
+    return {
+        model._meta.verbose_name_plural: reconcile_model(model, field, dry_run=dry_run)
+        for field, model in COUNTED_RELATIONS
+    }
@@ -0,0 +1,152 @@
+"""
+Cached, optionally approximate, result counts for the job feed.
+
+The "N jobs found" line used to run an exact ``COUNT(*)`` over the filtered
+feed on every request. ``feed_count`` caches counts per normalized filter
+set (see ``facets.FeedFilters.key``) for JOB_FEED_COUNT_CACHE_SECONDS under
+the current feed generation: a counter row in the database (FeedGeneration)
+that every Job save or delete bumps once it has committed (see
+jobs/signals.py), so stale counts never outlive a change, whichever process
+made it. Bumping after the commit keeps the row lock out of Job writes, which
+would otherwise queue behind each other on it, and skips rolled-back changes. Reading it is one primary-key query; views read it once per request.
+The cached counts themselves can live in any cache, even a per-process one.
+
+On PostgreSQL, feeds the planner expects to hold at least
+JOB_COUNT_ESTIMATE_THRESHOLD rows are not counted at all: the planner's row
+estimate is shown instead (``reltuples`` for a bare table, ``EXPLAIN``
+otherwise). Smaller feeds, and other databases, are counted exactly.
+"""
+import hashlib
+import json
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F, QuerySet
+
+from .search import tokenize
+
+
+def normalize_filters(query='', location='', category=''):
+    """Returns the cache identity of a feed: equivalent searches share a count."""
+    return (
+        ' '.join(tokenize(query)),
+        ' '.join((location or '').lower().split()),
+        (category or '').strip().lower(),
+    )
+
+
+# JobChange keeps about the last CHANGE_LOG_SIZE generations, trimmed every
+# CHANGE_LOG_PRUNE_EVERY bumps
+CHANGE_LOG_SIZE = 10000
+CHANGE_LOG_PRUNE_EVERY = 1000
+
+
+def _first_generation():
+    # Random, so a recreated row (e.g. after a flush) never repeats a
+    # generation that an in-process index (jobs/bitmaps.py) has already seen
+    return random.randrange(1, 1 << 31)
+
+
+def generation():
+    """The current feed generation: one query."""
+    from .models import FeedGeneration
+
+    value = FeedGeneration.objects.filter(pk=1).values_list('value', flat=True).first()
+    if value is None:
+        value = _create_generation()
+    return value
+
+
+def invalidate(job_id=None):
+    """
+    Makes every cached count stale and returns the new generation. Called
+    after every committed Job change, with the job's id, which is logged in
+    JobChange for indexes catching up on changes (jobs/bitmaps.py).
+    """
+    from .models import FeedGeneration, JobChange
+
+    # The row stays locked until this short transaction ends, so the value
+    # read back is the one this bump produced, and its log entry commits with it
+    with transaction.atomic():
+        if FeedGeneration.objects.filter(pk=1).update(value=F('value') + 1):
+            value = FeedGeneration.objects.filter(pk=1).values_list('value', flat=True).get()
+        else:
+            value = _create_generation()
+        if job_id is not None:
+            JobChange.objects.create(generation=value, job_id=job_id)
+            if value % CHANGE_LOG_PRUNE_EVERY == 0:
+                JobChange.objects.filter(generation__lte=value - CHANGE_LOG_SIZE).delete()
+    return value
+
+
+def _create_generation():
+    from .models import FeedGeneration
+
+    value = _first_generation()
+    try:
+        # Savepoint, so losing the race does not break an outer transaction
+        with transaction.atomic():
+            FeedGeneration.objects.create(pk=1, value=value)
+    except IntegrityError:
+        value = FeedGeneration.objects.filter(pk=1).values_list('value', flat=True).get()
+    return value
+
+
+def estimate_count(queryset):
+    """The planner's row estimate for ``queryset`` on PostgreSQL, else None."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    queryset = queryset.order_by()
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            # -1 means the table was never analyzed
+            return row[0] if row and row[0] >= 0 else None
+        sql, params = queryset.query.sql_with_params()
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def count_feed(results):
+    """
+    Counts a feed, estimating when that is allowed and the feed is large.
+    Returns:
+        tuple: (count, is_estimate)
+    """
+    threshold = getattr(settings, 'JOB_COUNT_ESTIMATE_THRESHOLD', 0)
+    if threshold and isinstance(results, QuerySet):
+        estimate = estimate_count(results)
+        if estimate is not None and estimate >= threshold:
+            return estimate, True
+    return results.count(), False
+
+
+def feed_count(results, filters, feed_generation=None):
+    """
+    Cached ``count_feed(results)``.
+    Args:
+        results: The feed's QuerySet, or SearchResults for a text search.
+        filters: A hashable identity of the feed, built with normalize_filters().
+        feed_generation: ``generation()``, when the caller already read it.
+    Returns:
+        tuple: (count, is_estimate)
+    """
+    if feed_generation is None:
+        feed_generation = generation()
+    digest = hashlib.md5(repr(filters).encode()).hexdigest()
+    key = f'jobs:count:{feed_generation}:{digest}'
+    cached = cache.get(key)
+    if cached is None:
+        cached = count_feed(results)
+        cache.set(key, cached, getattr(settings, 'JOB_FEED_COUNT_CACHE_SECONDS', 60))
+    return tuple(cached)
@@ -0,0 +1,437 @@
+"""
+Facet counts and multi-select filters for the job feed.
+
+The home page can be narrowed by job type, category, location and salary
+band, several values per facet (``?job_type=FT&job_type=CT``), and by a
+salary range (``salary_min``/``salary_max``, matched against each job's
+advertised range). Next to every facet value it shows how many jobs
+selecting it would give.
+
+All counts come from one table: the feed without any facet selection,
+grouped by (job_type, category, location, salary band), with every count
+summed from it in Python, applying the selections of the *other* facets
+only, so checking a second job type shows what it adds rather than zero.
+The table has a row per combination in use, about ten thousand for the
+load generator's data, so it is cached per normalized search like the feed
+count and toggling facets does not touch the database again until a Job
+changes. For the unfiltered feed, the usual landing page, the table is kept
+in the database (JobFacetCount) and adjusted by the Job signals in the
+change's transaction, so reloading it after a change reads those rows
+instead of grouping every job; ``reconcile_facet_counts`` recomputes it
+after writes that bypass signals. Searches are grouped on demand.
+"""
+import hashlib
+from array import array
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Case, CharField, Count, F, Q, Value, When
+from django.db.models.functions import NullIf
+
+from .counts import generation, normalize_filters
+from .search import get_backend, tokenize
+
+try:
+    import numpy as np
+except ImportError:  # Optional: facet tables are counted in pure Python without it
+    np = None
+
+# key, label, upper bound (exclusive) of the advertised minimum salary
+SALARY_BANDS = [
+    ('lt50', 'Under $50k', 50000),
+    ('50-80', '$50k - $80k', 80000),
+    ('80-120', '$80k - $120k', 120000),
+    ('120-160', '$120k - $160k', 160000),
+    ('160+', '$160k+', None),
+]
+NO_SALARY = 'none'
+
+# Facets in display order: (GET parameter, heading)
+FACETS = [
+    ('job_type', 'Job Type'),
+    ('category', 'Category'),
+    ('locations', 'Location'),
+    ('salary', 'Salary'),
+]
+# Most common locations listed; selected ones are always shown
+LOCATION_FACET_SIZE = 8
+# JobFacetCount fields, in FacetTable.COLUMNS order
+STORED_COLUMNS = ('job_type', 'category_id', 'location', 'salary_band')
+# Job fields read by job_state()
+STATE_FIELDS = ('is_active', 'job_type', 'category', 'location', 'salary_min', 'salary_max')
+
+
+def salary_band():
+    """Expression for a job's salary band key, from its minimum (else maximum) salary."""
+    whens = [When(salary_min__isnull=True, salary_max__isnull=True, then=Value(NO_SALARY))]
+    for key, _, upper in SALARY_BANDS[:-1]:
+        whens.append(When(Q(salary_min__lt=upper) | Q(salary_min__isnull=True, salary_max__lt=upper),
+                          then=Value(key)))
+    return Case(*whens, default=Value(SALARY_BANDS[-1][0]), output_field=CharField())
+
+
+def salary_band_of(salary_min, salary_max):
+    """``salary_band()`` for one job, in Python."""
+    salary = salary_min if salary_min is not None else salary_max
+    if salary is None:
+        return NO_SALARY
+    for key, _, upper in SALARY_BANDS[:-1]:
+        if salary < upper:
+            return key
+    return SALARY_BANDS[-1][0]
+
+
+def _decimal(value):
+    try:
+        value = Decimal(value)
+    except (InvalidOperation, TypeError, ValueError):
+        return None
+    return value if value.is_finite() and value >= 0 else None
+
+
+@dataclass(frozen=True)
+class FeedFilters:
+    """The home page filters of one request."""
+    query: str = ''
+    location: str = ''
+    job_types: tuple = ()
+    categories: tuple = ()
+    locations: tuple = ()
+    salary_bands: tuple = ()
+    salary_min: Decimal = None
+    salary_max: Decimal = None
+
+    @classmethod
+    def from_query_dict(cls, params):
+        """Reads and validates ``request.GET``; unknown facet values are dropped."""
+        from .models import Job
+
+        job_types = {key for key, _ in Job.JOB_TYPES}
+        bands = {key for key, _, _ in SALARY_BANDS} | {NO_SALARY}
+
+        def values(name, allowed=None, lower=False):
+            found = []
+            for value in params.getlist(name):
+                value = value.strip().lower() if lower else value.strip()
+                if value and value not in found and (allowed is None or value in allowed):
+                    found.append(value)
+            return tuple(sorted(found))
+
+        return cls(
+            query=params.get('query', ''),
+            location=params.get('location', ''),
+            job_types=values('job_type', job_types),
+            categories=values('category', lower=True),
+            locations=values('locations'),
+            salary_bands=values('salary', bands),
+            salary_min=_decimal(params.get('salary_min') or None),
+            salary_max=_decimal(params.get('salary_max') or None),
+        )
+
+    def selections(self):
+        """Selected values per facet, keyed like FACETS."""
+        return {
+            'job_type': self.job_types,
+            'category': self.categories,
+            'locations': self.locations,
+            'salary': self.salary_bands,
+        }
+
+    def stored_selections(self, categories):
+        """``selections()`` with category slugs replaced by the ids that jobs store."""
+        ids = {category.slug: category.pk for category in categories}
+        # -1 matches no job, so an unknown slug still selects nothing
+        return dict(self.selections(), category=[ids.get(slug, -1) for slug in self.categories])
+
+    def base_key(self):
+        """Cache identity of the feed before facet selections."""
+        return normalize_filters(self.query, self.location) + (str(self.salary_min), str(self.salary_max))
+
+    def key(self):
+        """Cache identity of the filtered feed (see counts.feed_count)."""
+        return (
+            normalize_filters(self.query, self.location, ','.join(self.categories)),
+            self.job_types, self.locations, self.salary_bands, str(self.salary_min), str(self.salary_max),
+        )
+
+    def apply_base(self, queryset):
+        """The free-text location and salary range filters."""
+        if self.location:
+            queryset = queryset.filter(location__icontains=self.location)
+        if self.salary_min is not None:
+            # The job's range reaches the requested minimum
+            queryset = queryset.filter(Q(salary_max__gte=self.salary_min)
+                                       | Q(salary_max__isnull=True, salary_min__gte=self.salary_min))
+        if self.salary_max is not None:
+            queryset = queryset.filter(Q(salary_min__lte=self.salary_max)
+                                       | Q(salary_min__isnull=True, salary_max__lte=self.salary_max))
+        return queryset
+
+    def apply(self, queryset):
+        """Every filter except the text query, which is ranked by the search backend."""
+        queryset = self.apply_base(queryset)
+        if self.job_types:
+            queryset = queryset.filter(job_type__in=self.job_types)
+        if len(self.categories) == 1:
+            queryset = queryset.filter(category__slug=self.categories[0])
+        elif self.categories:
+            queryset = queryset.filter(category__slug__in=self.categories)
+        if self.locations:
+            queryset = queryset.filter(location__in=self.locations)
+        if self.salary_bands:
+            queryset = queryset.alias(salary_band=salary_band()).filter(salary_band__in=self.salary_bands)
+        return queryset
+
+
+UNFILTERED = FeedFilters().base_key()
+
+
+@dataclass
+class FacetValue:
+    value: str
+    label: str
+    count: int
+    selected: bool
+    url: str = ''
+
+
+class FacetTable:
+    """
+    Job counts per (job_type, category_id, location, salary band)
+    combination, stored column-wise: each facet column holds small integer
+    codes into its list of distinct values, so the table pickles compactly
+    into the cache and is counted with ``numpy.bincount`` when available.
+    """
+    # Facet -> column of the grouped query
+    COLUMNS = {'job_type': 'job_type', 'category': 'category_id', 'locations': 'location', 'salary': 'salary_band'}
+
+    def __init__(self, rows):
+        self.values = {name: [] for name in self.COLUMNS}
+        self.codes = {name: array('i') for name in self.COLUMNS}
+        self.counts = array('q')
+        lookup = {name: {} for name in self.COLUMNS}
+        for *row, count in rows:
+            for name, value in zip(self.COLUMNS, row):
+                code = lookup[name].get(value)
+                if code is None:
+                    code = lookup[name][value] = len(self.values[name])
+                    self.values[name].append(value)
+                self.codes[name].append(code)
+            self.counts.append(count)
+
+    def __len__(self):
+        return len(self.counts)
+
+    def total(self):
+        return sum(self.counts)
+
+    def count(self, selections):
+        """
+        Per-facet value counts. A combination counts towards a facet when it
+        matches the selections of every *other* facet.
+        Args:
+            selections: Facet -> selected values (as stored in the table).
+        Returns:
+            dict: facet -> {value: count}, zero counts omitted.
+        """
+        chosen = {name: {code for code, value in enumerate(self.values[name]) if value in selections.get(name, ())}
+                  for name in self.COLUMNS if selections.get(name)}
+        if np is not None:
+            return self._count_numpy(chosen)
+        result = {name: {} for name in self.COLUMNS}
+        columns = [(name, self.codes[name], chosen.get(name)) for name in self.COLUMNS]
+        for i, count in enumerate(self.counts):
+            misses = [name for name, codes, selected in columns if selected is not None and codes[i] not in selected]
+            if len(misses) > 1:
+                continue
+            for name, codes, _ in columns:
+                if not misses or misses[0] == name:
+                    value = self.values[name][codes[i]]
+                    result[name][value] = result[name].get(value, 0) + count
+        return result
+
+    def _count_numpy(self, chosen):
+        counts = np.frombuffer(self.counts, dtype=np.int64)
+        codes = {name: np.frombuffer(self.codes[name], dtype=np.int32) for name in self.COLUMNS}
+        masks = {name: np.isin(codes[name], list(selected)) for name, selected in chosen.items()}
+        result = {}
+        for name in self.COLUMNS:
+            weights = counts
+            others = [mask for other, mask in masks.items() if other != name]
+            if others:
+                weights = counts * np.logical_and.reduce(others)
+            totals = np.bincount(codes[name], weights=weights, minlength=len(self.values[name]))
+            result[name] = {self.values[name][code]: int(totals[code]) for code in np.flatnonzero(totals)}
+        return result
+
+
+def facet_table(filters, queryset):
+    """
+    Groups ``queryset`` (the unfiltered feed), after the base filters and
+    the text query, by every facet: one query.
+    """
+    queryset = filters.apply_base(queryset)
+    if filters.query:
+        queryset = get_backend().filter(tokenize(filters.query), queryset)
+    rows = (
+        queryset.order_by()
+        .annotate(salary_band=salary_band())
+        .values_list(*FacetTable.COLUMNS.values())
+        .annotate(count=Count('pk'))
+    )
+    return FacetTable(rows)
+
+
+def stored_facet_table():
+    """The facet table of the unfiltered feed, from JobFacetCount: one query."""
+    from .models import JobFacetCount
+
+    rows = (
+        JobFacetCount.objects.filter(count__gt=0)
+        .values_list('job_type', NullIf('category_id', Value(0)), 'location', 'salary_band', 'count')
+    )
+    return FacetTable(rows)
+
+
+def cached_facet_table(filters, queryset, feed_generation=None):
+    """``facet_table`` cached per base search until the next Job change (see counts.feed_count)."""
+    if feed_generation is None:
+        feed_generation = generation()
+    digest = hashlib.md5(repr(filters.base_key()).encode()).hexdigest()
+    key = f'jobs:facets:{feed_generation}:{digest}'
+    table = cache.get(key)
+    if table is None:
+        # ``queryset`` is the unfiltered feed, so without base filters the stored table matches it
+        table = stored_facet_table() if filters.base_key() == UNFILTERED else facet_table(filters, queryset)
+        cache.set(key, table, getattr(settings, 'JOB_FEED_COUNT_CACHE_SECONDS', 60))
+    return table
+
+
+def job_state(job):
+    """The parts of a job its facet counts depend on (keyed like ``Job.objects.values(*STATE_FIELDS)``)."""
+    return {'is_active': job.is_active, 'job_type': job.job_type, 'category': job.category_id,
+            'location': job.location, 'salary_min': job.salary_min, 'salary_max': job.salary_max}
+
+
+def facet_key(state):
+    """The JobFacetCount row counting a job_state(), as a tuple of its fields; None for inactive jobs."""
+    if state is None or not state['is_active']:
+        return None
+    return (state['job_type'], state['category'] or 0, state['location'],
+            salary_band_of(state['salary_min'], state['salary_max']))
+
+
+def apply_job_change(previous, current):
+    """
+    Adjusts JobFacetCount for a job going from ``previous`` to ``current``
+    (facet_key() tuples; None for a job being created, deleted or inactive).
+    """
+    from .models import JobFacetCount
+
+    if previous == current:
+        return
+    for key, delta in ((previous, -1), (current, 1)):
+        if key is None:
+            continue
+        fields = dict(zip(STORED_COLUMNS, key))
+        if JobFacetCount.objects.filter(**fields).update(count=F('count') + delta):
+            continue
+        try:
+            # Savepoint, so losing the race to create the row does not break the job's transaction
+            with transaction.atomic():
+                JobFacetCount.objects.create(count=delta, **fields)
+        except IntegrityError:
+            JobFacetCount.objects.filter(**fields).update(count=F('count') + delta)
+
+
+def reconcile_facet_counts():
+    """
+    Recomputes JobFacetCount from the active jobs, for writes that bypass
+    signals.
+    Returns:
+        int: The number of rows written.
+    """
+    from .models import Job, JobFacetCount
+
+    rows = (
+        Job.objects.filter(is_active=True).order_by()
+        .annotate(salary_band=salary_band())
+        .values_list(*FacetTable.COLUMNS.values())
+        .annotate(count=Count('pk'))
+    )
+    counts = [JobFacetCount(job_type=job_type, category_id=category_id or 0, location=location,
+                          salary_band=band, count=count)
+              for job_type, category_id, location, band, count in rows.iterator()]
+    with transaction.atomic():
+        JobFacetCount.objects.all().delete()
+        JobFacetCount.objects.bulk_create(counts, batch_size=1000)
+    return len(counts)
+
+
+def facet_panel(filters, queryset, categories, url_for, table=None, feed_generation=None):
+    """
+    The facet panel of the home page.
+    Args:
+        filters: The request's FeedFilters.
+        queryset: The unfiltered feed.
+        categories: Every Category (already loaded for the page).
+        url_for: Callable (facet, value) -> URL toggling that value.
+        table: Anything with FacetTable's ``count()`` that covers ``filters``,
+            e.g. the bitmap index (jobs/bitmaps.py); default: the cached table.
+        feed_generation: ``counts.generation()``, when the caller already read it.
+    Returns:
+        list: (heading, [FacetValue, ...]) pairs for facets with any values.
+    """
+    from .models import Job
+
+    selections = filters.selections()
+    if table is None:
+        table = cached_facet_table(filters, queryset, feed_generation)
+    counts = table.count(filters.stored_selections(categories))
+    # Tables hold category ids; the page works with slugs
+    slugs = {category.pk: category.slug for category in categories}
+    counts['category'] = {slugs[pk]: count for pk, count in counts['category'].items() if pk in slugs}
+    labels = {
+        'job_type': dict(Job.JOB_TYPES),
+        'category': {category.slug: category.name for category in categories},
+        'salary': dict([(key, label) for key, label, _ in SALARY_BANDS] + [(NO_SALARY, 'Not listed')]),
+    }
+    orders = {
+        'job_type': [key for key, _ in Job.JOB_TYPES],
+        'category': [category.slug for category in categories],
+        'salary': [key for key, _, _ in SALARY_BANDS] + [NO_SALARY],
+    }
+    panel = []
+    for name, heading in FACETS:
+        found = counts[name]
+        selected = set(selections[name])
+        if name == 'locations':
+            top = sorted(found, key=lambda value: (-found[value], value))[:LOCATION_FACET_SIZE]
+            order = top + sorted(selected - set(top))
+        else:
+            order = orders[name]
+        values = [
+            FacetValue(value, labels.get(name, {}).get(value, value), found.get(value, 0), value in selected,
+                       url_for(name, value))
+            for value in order if found.get(value) or value in selected
+        ]
+        if values:
+            panel.append((heading, values))
+    return panel
+
+
+def toggle_url(params, name, value):
+    """Query string for ``params`` (a QueryDict) with ``value`` added to or removed from facet ``name``."""
+    params = params.copy()
+    for key in ('page', 'cursor'):
+        params.pop(key, None)
+    values = params.getlist(name)
+    if value in values:
+        values.remove(value)
+    else:
+        values.append(value)
+    params.setlist(name, values)
+    return f'?{params.urlencode()}'
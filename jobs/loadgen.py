@@ -0,0 +1,270 @@
+"""
+Bulk generation of production-sized, realistically skewed job board data.
+
+Used by ``manage.py generate_load_data`` to build fixtures for the
+``benchmark_*`` commands. Rows are written with ``bulk_create`` in batches,
+slugs are precomputed instead of allocated one query at a time, and at most
+one password hash is computed for the whole run. Employers (jobs per
+company), locations and jobs (applications per job) follow Zipf
+distributions, so a few companies, cities and postings dominate, as they do
+on a real board.
+
+``bulk_create`` sends no signals, so ``refresh_derived_data`` brings the
+counters, facet counts, search index, autocomplete snapshot and cached
+counts up to date afterwards.
+"""
+import random
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from . import autocomplete, bitmaps, counters, counts, facets, minhash, recommendations, search
+from .matching import term_vector
+from .models import Application, Category, Job, User
+
+CATEGORIES = [
+    'Development', 'Design', 'Marketing', 'Sales', 'Finance', 'Human Resources',
+    'Data Science', 'Operations', 'Customer Support', 'Legal', 'Product', 'Healthcare',
+]
+
+# Most common first: Zipf ranks follow list order
+LOCATIONS = [
+    'Remote', 'New York, NY', 'San Francisco, CA', 'London, UK', 'Berlin, DE', 'Austin, TX',
+    'Seattle, WA', 'Toronto, CA', 'Boston, MA', 'Amsterdam, NL', 'Chicago, IL', 'Paris, FR',
+    'Los Angeles, CA', 'Dublin, IE', 'Bangalore, IN', 'Singapore, SG', 'Sydney, AU', 'Denver, CO',
+    'Stockholm, SE', 'Lisbon, PT', 'Warsaw, PL', 'Madrid, ES', 'Zurich, CH', 'Atlanta, GA',
+    'Tokyo, JP', 'Sao Paulo, BR', 'Mexico City, MX', 'Tel Aviv, IL', 'Vancouver, CA', 'Munich, DE',
+]
+
+SENIORITY = ['', 'Junior', 'Senior', 'Lead', 'Staff', 'Principal']
+ROLES = [
+    'Python Developer', 'Frontend Engineer', 'Backend Engineer', 'DevOps Engineer', 'Data Scientist',
+    'Data Engineer', 'Product Manager', 'UX Designer', 'UI Designer', 'Marketing Specialist',
+    'Sales Representative', 'Account Executive', 'Financial Analyst', 'Recruiter', 'Support Engineer',
+    'QA Engineer', 'Mobile Developer', 'Machine Learning Engineer', 'Security Engineer', 'Technical Writer',
+]
+WORDS = (
+    'team product customers build design scale reliable cloud data platform api services python django '
+    'react kubernetes analytics growth ownership mentor collaborate remote hybrid benefits equity '
+    'experience communication roadmap quality testing performance security startup enterprise'
+).split()
+
+# Relative frequencies
+JOB_TYPE_WEIGHTS = {'FT': 70, 'PT': 8, 'CT': 12, 'FL': 6, 'IN': 4}
+APPLICATION_STATUS_WEIGHTS = {'Pending': 60, 'Reviewed': 25, 'Accepted': 5, 'Rejected': 10}
+
+
+def zipf_cum_weights(n, s):
+    """Cumulative Zipf(s) weights for ranks 1..n, for ``random.choices``."""
+    return list(accumulate(1 / rank ** s for rank in range(1, n + 1)))
+
+
+@contextmanager
+def explicit_timestamps(model, *names):
+    """Lets bulk_create store given auto_now/auto_now_add values instead of now()."""
+    fields = [model._meta.get_field(name) for name in names]
+    saved = [(f.auto_now, f.auto_now_add) for f in fields]
+    for f in fields:
+        f.auto_now = f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, (auto_now, auto_now_add) in zip(fields, saved):
+            f.auto_now, f.auto_now_add = auto_now, auto_now_add
+
+
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+@dataclass
+class LoadProfile:
+    employers: int = 1000
+    seekers: int = 10000
+    jobs: int = 100000
+    applications: int = 200000
+    zipf: float = 1.1
+    days: int = 365
+    active_ratio: float = 0.8
+    prefix: str = 'load'
+    password: str = None
+    seed: int = 42
+    batch_size: int = 5000
+    # Filled in by the generator: model name -> rows written
+    created: dict = field(default_factory=dict)
+
+
+class LoadGenerator:
+    """
+    Writes one LoadProfile's rows. Usernames and slugs embed the profile's
+    prefix, so runs with different prefixes can share a database.
+    """
+
+    def __init__(self, profile, progress=None):
+        self.profile = profile
+        self.rng = random.Random(profile.seed)
+        self.now = timezone.now()
+        self.progress = progress or (lambda label, done, total: None)
+        # Hashing is deliberately slow; do it once and share the result
+        self.password = make_password(profile.password)
+        self._descriptions = [self._paragraph(6) for _ in range(256)]
+        # Resume text and its match vector (bulk_create skips the signal that derives it)
+        self._resumes = [self._paragraph(12) for _ in range(256)]
+        self._resume_terms = {text: term_vector(text) for text in self._resumes}
+
+    def existing(self):
+        return User.objects.filter(username__startswith=f'{self.profile.prefix}-').exists()
+
+    def run(self):
+        categories = self.create_categories()
+        employers = self.create_users('employer', self.profile.employers, is_employer=True)
+        seekers = self.create_users('seeker', self.profile.seekers, is_seeker=True)
+        job_ids = self.create_jobs(employers, categories)
+        self.create_applications(job_ids, seekers)
+        return self.profile.created
+
+    def _write(self, label, model, rows, total, **options):
+        written = 0
+        for batch in batched(rows, self.profile.batch_size):
+            with transaction.atomic():
+                model.objects.bulk_create(batch, **options)
+            written += len(batch)
+            self.progress(label, written, total)
+        self.profile.created[label] = written
+
+    def _ids(self, queryset):
+        return list(queryset.order_by('pk').values_list('pk', flat=True))
+
+    def create_categories(self):
+        existing = set(Category.objects.values_list('slug', flat=True))
+        missing = [Category(name=name, slug=slugify(name)) for name in CATEGORIES if slugify(name) not in existing]
+        self._write('categories', Category, missing, len(missing))
+        return self._ids(Category.objects.filter(slug__in=[slugify(name) for name in CATEGORIES]))
+
+    def create_users(self, kind, count, **flags):
+        prefix = f'{self.profile.prefix}-{kind}-'
+        rows = (
+            User(
+                username=f'{prefix}{n}', email=f'{kind}{n}@{self.profile.prefix}.example.com',
+                password=self.password, company_name=f'Company {n}' if flags.get('is_employer') else '',
+                date_joined=self.now - timedelta(days=self.rng.uniform(0, self.profile.days)),
+                **flags,
+            )
+            for n in range(1, count + 1)
+        )
+        self._write(f'{kind}s', User, rows, count)
+        return self._ids(User.objects.filter(username__startswith=prefix))
+
+    def create_jobs(self, employers, categories):
+        profile, rng = self.profile, self.rng
+        if not employers:
+            return []
+        employer_weights = zipf_cum_weights(len(employers), profile.zipf)
+        location_weights = zipf_cum_weights(len(LOCATIONS), profile.zipf)
+        job_types, type_weights = zip(*JOB_TYPE_WEIGHTS.items())
+
+        def rows():
+            for n in range(1, profile.jobs + 1):
+                title = ' '.join(filter(None, (rng.choice(SENIORITY), rng.choice(ROLES))))
+                created = self.now - timedelta(seconds=rng.uniform(0, profile.days * 86400))
+                salary = rng.randrange(30, 250) * 1000
+                yield Job(
+                    employer_id=rng.choices(employers, cum_weights=employer_weights)[0],
+                    category_id=rng.choice(categories) if categories else None,
+                    title=title,
+                    # Unique without a lookup: the run prefix and sequence number are
+                    slug=f'{slugify(title)}-{profile.prefix}-{n}',
+                    description=rng.choice(self._descriptions),
+                    location=rng.choices(LOCATIONS, cum_weights=location_weights)[0],
+                    job_type=rng.choices(job_types, weights=type_weights)[0],
+                    salary_min=Decimal(salary) if rng.random() < 0.85 else None,
+                    salary_max=Decimal(salary + rng.randrange(10, 60) * 1000),
+                    is_active=rng.random() < profile.active_ratio,
+                    created_at=created,
+                    updated_at=created,
+                )
+
+        with explicit_timestamps(Job, 'created_at', 'updated_at'):
+            self._write('jobs', Job, rows(), profile.jobs)
+        return self._ids(Job.objects.filter(employer__username__startswith=f'{profile.prefix}-employer-'))
+
+    def create_applications(self, job_ids, seekers):
+        profile, rng = self.profile, self.rng
+        # Each (job, seeker) pair can apply once; cap at what is possible
+        total = min(profile.applications, len(job_ids) * len(seekers))
+        if not total:
+            self.profile.created['applications'] = 0
+            return
+        # Popular postings attract most applicants; shuffle so they are not all the oldest
+        popularity = job_ids[:]
+        rng.shuffle(popularity)
+        job_weights = zipf_cum_weights(len(popularity), profile.zipf)
+        statuses, status_weights = zip(*APPLICATION_STATUS_WEIGHTS.items())
+
+        def rows():
+            seen = set()
+            while len(seen) < total:
+                pair = (rng.choices(popularity, cum_weights=job_weights)[0], rng.choice(seekers))
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                resume_text = rng.choice(self._resumes)
+                yield Application(
+                    job_id=pair[0], applicant_id=pair[1], resume='resumes/load-test.pdf',
+                    cover_letter=rng.choice(self._descriptions)[:200], parse_status='parsed',
+                    parsed_text=resume_text, resume_terms=self._resume_terms[resume_text],
+                    status=rng.choices(statuses, weights=status_weights)[0],
+                    applied_at=self.now - timedelta(seconds=rng.uniform(0, profile.days * 86400)),
+                )
+
+        with explicit_timestamps(Application, 'applied_at'):
+            self._write('applications', Application, rows(), total)
+
+    def _paragraph(self, sentences):
+        return ' '.join(
+            ' '.join(self.rng.choices(WORDS, k=self.rng.randint(8, 16))).capitalize() + '.'
+            for _ in range(sentences)
+        )
+
+
+def refresh_derived_data(jobs=None, index=True):
+    """
+    Brings signal-maintained data up to date after bulk writes.
+    Args:
+        jobs: The QuerySet of jobs to (re)index (default: all).
+        index: False to skip the search, autocomplete, recommendation,
+            near-duplicate and bitmap indexes.
+    """
+    counters.reconcile()
+    facets.reconcile_facet_counts()
+    counts.invalidate()
+    if not index:
+        return
+    backend = search.get_backend()
+    jobs = (jobs if jobs is not None else Job.objects.all()).select_related('employer').only(
+        'title', 'location', 'description', 'employer__company_name'
+    )
+    with transaction.atomic():
+        for job in jobs.iterator(chunk_size=2000):
+            backend.index_job(job)
+    autocomplete.get_service().rebuild()
+    minhash.rebuild(jobs)
+    if recommendations.available():
+        recommendations.get_index().rebuild()
+    bitmap_index = bitmaps.get_index(refresh=False)
+    if bitmap_index is not None:
+        bitmap_index.rebuild()
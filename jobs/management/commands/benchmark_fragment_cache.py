@@ -0,0 +1,71 @@
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.template.loader import get_template
+from django.test.utils import override_settings
+from django.utils import timezone
+from jobs.benchmarking import measure
+from jobs.models import Category, Job, User
+
+LOREM = 'python django api cloud data team remote senior lead product design'.split()
+
+
+def build_jobs(count, seed):
+    """Unsaved jobs with their employer and category attached, like select_related."""
+    rng = random.Random(seed)
+    now = timezone.now()
+    employers = [User(pk=n, username=f'employer{n}', company_name=f'Company {n}') for n in range(1, 51)]
+    categories = [Category(pk=n, name=f'Category {n}', slug=f'category-{n}') for n in range(1, 11)]
+    jobs = []
+    for n in range(1, count + 1):
+        salary = rng.randrange(30, 200) * 1000
+        jobs.append(Job(
+            pk=n, slug=f'job-{n}', title=' '.join(rng.choices(LOREM, k=3)).title(),
+            employer=rng.choice(employers), category=rng.choice(categories + [None]),
+            location=rng.choice(['Remote', 'Berlin', 'London', 'New York']),
+            job_type=rng.choice(Job.JOB_TYPES)[0],
+            salary_min=Decimal(salary), salary_max=Decimal(salary + 20000),
+            created_at=now - timedelta(hours=n), updated_at=now - timedelta(hours=n),
+        ))
+    return jobs
+
+
+class Command(BaseCommand):
+    help = 'Times rendering job cards without the fragment cache, with a cold cache and with a warm cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=10000, help='Job cards to render')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per warm/uncached measurement')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        jobs = build_jobs(options['count'], options['seed'])
+        fragments = caches['template_fragments']
+
+        def render_all():
+            template = get_template('jobs/includes/job_card.html')
+            for job in jobs:
+                template.render({'job': job})
+
+        def render_cold():
+            fragments.clear()
+            render_all()
+
+        with override_settings(CACHES={**settings.CACHES, 'template_fragments': {
+                'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}):
+            uncached = measure(render_all, repeat=options['repeat'], trace_memory=False)['median']
+        fragments = caches['template_fragments']
+        cold = measure(render_cold, repeat=1, trace_memory=False)['median']
+        warm = measure(render_all, repeat=options['repeat'], trace_memory=False)['median']
+
+        backend = settings.CACHES['template_fragments']['BACKEND'].rsplit('.', 1)[-1]
+        self.stdout.write(f"Rendering {len(jobs)} job cards ({backend})")
+        self.stdout.write(f"{'cache':<10} {'total':>9} {'per card':>10} {'speedup':>8}")
+        for label, seconds in (('none', uncached), ('cold', cold), ('warm', warm)):
+            self.stdout.write(
+                f"{label:<10} {seconds:>8.2f}s {seconds / len(jobs) * 1e6:>8.1f}us {uncached / seconds:>7.1f}x"
+            )
@@ -0,0 +1,73 @@
+import json
+import random
+
+from django.core.management.base import BaseCommand
+from jobs.benchmarking import format_bytes, make_pdf, measure
+from jobs.utils import PDF_PROFILES, parse_pdf_text_with_pages
+
+WORDS = (
+    'python django postgresql developer senior engineer team lead cloud aws docker '
+    'kubernetes api design data analytics machine learning product delivery agile '
+    'experience university bachelor skills communication project managed built scaled'
+).split()
+
+
+def generate_corpus(page_counts, lines_per_page, seed):
+    """Returns [(label, pdf_bytes)] of resume-like PDFs with the given page counts."""
+    rng = random.Random(seed)
+    corpus = []
+    for count in page_counts:
+        pages = [
+            [' '.join(rng.choice(WORDS) for _ in range(rng.randint(6, 14))) for _ in range(lines_per_page)]
+            for _ in range(count)
+        ]
+        corpus.append((f'{count}-page', make_pdf(pages)))
+    return corpus
+
+
+class Command(BaseCommand):
+    help = 'Compares wall time and memory of the PDF extraction profiles on generated resumes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', default='1,3,10,30',
+                            help='Comma-separated page counts of the generated PDFs')
+        parser.add_argument('--lines-per-page', type=int, default=45)
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per PDF and profile')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--json', dest='json_path', help='Also write the results to this file')
+
+    def handle(self, *args, **options):
+        page_counts = [int(n) for n in options['pages'].split(',')]
+        corpus = generate_corpus(page_counts, options['lines_per_page'], options['seed'])
+
+        results = []
+        self.stdout.write(f"{'PDF':<10} {'profile':<10} {'median':>10} {'pages/s':>9} {'peak mem':>10} {'chars':>8}")
+        for label, pdf in corpus:
+            baseline = None
+            for name, profile in PDF_PROFILES.items():
+                # Untimed warm-up run, which also gives the page and character counts
+                text, pages = parse_pdf_text_with_pages(pdf, profile)
+                timing = measure(parse_pdf_text_with_pages, pdf, profile, repeat=options['repeat'])
+                row = {
+                    'pdf': label,
+                    'profile': name,
+                    'bytes': len(pdf),
+                    'pages_parsed': pages,
+                    'chars': len(text),
+                    'median_seconds': timing['median'],
+                    'min_seconds': timing['min'],
+                    'peak_memory_bytes': timing['peak_memory'],
+                }
+                results.append(row)
+                baseline = baseline or row
+                speedup = baseline['median_seconds'] / timing['median'] if timing['median'] else 0
+                self.stdout.write(
+                    f"{label:<10} {name:<10} {timing['median'] * 1000:>8.1f}ms "
+                    f"{pages / timing['median']:>9.1f} {format_bytes(timing['peak_memory']):>10} "
+                    f"{len(text):>8}" + (f"  ({speedup:.1f}x)" if row is not baseline else '')
+                )
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['json_path']}"))
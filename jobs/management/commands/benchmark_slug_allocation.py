@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils.text import slugify
+from jobs.models import Job, User
+
+
+def legacy_slug(title):
+    """The original allocator: one exists() query per taken suffix."""
+    base_slug = slugify(title)
+    slug = base_slug
+    counter = 1
+    while Job.objects.filter(slug=slug).exists():
+        slug = f"{base_slug}-{counter}"
+        counter += 1
+    return slug
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = 'Times creating many jobs with the same title (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=10000, help='Jobs to create with the current allocator')
+        parser.add_argument('--legacy-count', type=int, default=1000,
+                            help='Jobs to create with the original allocator (quadratic, keep it small; 0 to skip)')
+        parser.add_argument('--title', default='Senior Python Developer')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'allocator':<10} {'jobs':>7} {'total':>9} {'per job':>9} {'queries/job':>12} {'last slug'}")
+        self.run('current', options['count'], options['title'], legacy=False)
+        if options['legacy_count']:
+            self.run('legacy', options['legacy_count'], options['title'], legacy=True)
+
+    def run(self, label, count, title, legacy):
+        counter = QueryCounter()
+        with transaction.atomic():
+            employer = User.objects.create(username='__benchmark_slug_employer', is_employer=True)
+            with connection.execute_wrapper(counter):
+                started = time.perf_counter()
+                for _ in range(count):
+                    job = Job(employer=employer, title=title, description='Benchmark', location='Remote')
+                    if legacy:
+                        job.slug = legacy_slug(title)
+                    job.save()
+                elapsed = time.perf_counter() - started
+            # Leave the database as it was
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            f"{label:<10} {count:>7} {elapsed:>8.2f}s {elapsed / count * 1000:>7.2f}ms "
+            f"{counter.count / count:>12.1f} {job.slug}"
+        )
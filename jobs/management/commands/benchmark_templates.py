@@ -0,0 +1,82 @@
+import copy
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from jobs.benchmarking import percentile
+from jobs.loadgen import LoadGenerator, LoadProfile, refresh_derived_data
+from jobs.models import Job
+from jobs.startup import compile_templates
+
+LOADERS = settings.TEMPLATE_LOADERS
+
+
+def template_settings(cached):
+    templates = copy.deepcopy(settings.TEMPLATES)
+    templates[0]['OPTIONS']['loaders'] = (
+        [('django.template.loaders.cached.Loader', LOADERS)] if cached else LOADERS
+    )
+    return templates
+
+
+class Command(BaseCommand):
+    help = ('Times first-request and steady-state page renders with uncached template loaders, the cached '
+            'loader, and the cached loader warmed at startup (rolled back afterwards)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='Steady-state requests per page')
+        parser.add_argument('--jobs', type=int, default=200)
+
+    def handle(self, *args, **options):
+        # Full renders only: no cached fragments
+        with transaction.atomic(), override_settings(
+            ALLOWED_HOSTS=['testserver'],
+            CACHES={**settings.CACHES, 'template_fragments': {
+                'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+        ):
+            generator = LoadGenerator(LoadProfile(employers=10, seekers=10, jobs=options['jobs'],
+                                                  applications=0, prefix='tplbench'))
+            generator.run()
+            refresh_derived_data(Job.objects.filter(employer__username__startswith='tplbench-'))
+            job = Job.objects.filter(is_active=True, employer__username__startswith='tplbench-').first()
+            pages = {
+                'home': reverse('home'),
+                'job_detail': reverse('job_detail', args=[job.slug]),
+                'account_login': reverse('account_login'),
+            }
+            client = Client()
+            # Middleware, URLconf and template tag libraries load once per process, whatever the mode
+            client.get(reverse('health_check'))
+            with override_settings(TEMPLATES=template_settings(cached=True)):
+                compile_templates()
+
+            self.stdout.write(f"{'mode':<16} {'page':<14} {'warmup':>9} {'first':>9} {'p50':>9} {'p95':>9}")
+            for mode in ('uncached', 'cached', 'cached+warmup'):
+                with override_settings(TEMPLATES=template_settings(cached=mode != 'uncached')):
+                    warmup = 0.0
+                    if mode == 'cached+warmup':
+                        started = time.perf_counter()
+                        compile_templates()
+                        warmup = time.perf_counter() - started
+                    for name, url in pages.items():
+                        self.report(mode, name, warmup, *self.measure(client, url, options['requests']))
+                        warmup = 0.0
+            transaction.set_rollback(True)
+
+    def measure(self, client, url, requests):
+        timings = []
+        for _ in range(requests + 1):
+            started = time.perf_counter()
+            response = client.get(url)
+            timings.append(time.perf_counter() - started)
+            assert response.status_code == 200, f'{url} returned {response.status_code}'
+        steady = [t * 1000 for t in timings[1:]]
+        return timings[0] * 1000, percentile(steady, 50), percentile(steady, 95)
+
+    def report(self, mode, page, warmup, first, p50, p95):
+        warmup_ms = f'{warmup * 1000:.2f}ms' if warmup else ''
+        self.stdout.write(f"{mode:<16} {page:<14} {warmup_ms:>9} {first:>7.2f}ms {p50:>7.2f}ms {p95:>7.2f}ms")
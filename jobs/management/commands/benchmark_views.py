@@ -0,0 +1,101 @@
+import json
+import platform
+from pathlib import Path
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from jobs.benchmark_suite import SCENARIOS, run_suite
+from jobs.benchmarking import compare_to_baseline, format_bytes
+from jobs.loadgen import LoadProfile
+
+
+class Command(BaseCommand):
+    help = ('Seeds a load-test data set and benchmarks every jobs URL through the test client '
+            '(rolled back afterwards); saves JSON results and compares them with a baseline')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=20000)
+        parser.add_argument('--employers', type=int, default=200)
+        parser.add_argument('--seekers', type=int, default=2000)
+        parser.add_argument('--applications', type=int, default=40000)
+        parser.add_argument('--prefix', default='bench',
+                            help='Data set prefix; an existing generate_load_data set with this prefix is reused')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--requests', type=int, default=100, help='Timed requests per scenario')
+        parser.add_argument('--warmup', type=int, default=5, help='Untimed requests per scenario')
+        parser.add_argument('--traced', type=int, default=5, help='Requests per scenario run under tracemalloc')
+        parser.add_argument('--scenario', action='append', dest='scenarios', metavar='NAME',
+                            help='Only run this scenario (repeatable)')
+        parser.add_argument('--output', help='Write the results to this JSON file')
+        parser.add_argument('--baseline', help='Compare with a JSON file written by an earlier --output')
+        parser.add_argument('--threshold', type=float, default=0.1,
+                            help='Relative p95 increase that counts as a regression')
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def handle(self, *args, **options):
+        scenarios = SCENARIOS
+        if options['scenarios']:
+            known = {scenario.name for scenario in SCENARIOS}
+            unknown = set(options['scenarios']) - known
+            if unknown:
+                raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}. Known: {', '.join(sorted(known))}")
+            scenarios = [scenario for scenario in SCENARIOS if scenario.name in options['scenarios']]
+        baseline = self.load_baseline(options['baseline']) if options['baseline'] else None
+
+        profile = LoadProfile(
+            employers=options['employers'], seekers=options['seekers'], jobs=options['jobs'],
+            applications=options['applications'], prefix=options['prefix'], seed=options['seed'],
+        )
+        self.stdout.write(f"Seeding {profile.jobs} jobs / {profile.applications} applications...")
+        self.stdout.write(
+            f"{'scenario':<20} {'p50':>9} {'p95':>9} {'p99':>9} {'queries':>8} {'peak alloc':>11}"
+        )
+        volumes, results = run_suite(
+            profile, scenarios, requests=options['requests'], warmup=options['warmup'],
+            traced=options['traced'], report=self.report,
+        )
+
+        if options['output']:
+            document = {
+                'meta': {
+                    'created_at': timezone.now().isoformat(),
+                    'python': platform.python_version(),
+                    'django': django.get_version(),
+                    'database': connection.vendor,
+                    'data': volumes,
+                    'requests': options['requests'],
+                },
+                'results': results,
+            }
+            Path(options['output']).write_text(json.dumps(document, indent=2))
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if baseline is not None:
+            regressions = self.compare(results, baseline, options['threshold'])
+            if regressions and options['fail_on_regression']:
+                raise CommandError(f"Regressed: {', '.join(regressions)}")
+
+    def report(self, name, result):
+        self.stdout.write(
+            f"{name:<20} {result['p50_ms']:>7.2f}ms {result['p95_ms']:>7.2f}ms {result['p99_ms']:>7.2f}ms "
+            f"{result['queries']:>8} {format_bytes(result['peak_alloc_bytes']):>11}"
+        )
+
+    def load_baseline(self, path):
+        try:
+            return json.loads(Path(path).read_text())['results']
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f'Cannot read baseline {path}: {e}')
+
+    def compare(self, results, baseline, threshold):
+        self.stdout.write(f"\nAgainst baseline (p95, regression above +{threshold:.0%} or more queries):")
+        regressions = []
+        for name, before, after, change, regressed in compare_to_baseline(results, baseline, threshold):
+            queries = f"{baseline[name]['queries']} -> {results[name]['queries']} queries"
+            flag = self.style.ERROR('REGRESSION') if regressed else ''
+            self.stdout.write(f"{name:<20} {before:>7.2f}ms -> {after:>7.2f}ms {change:>+7.1%}  {queries}  {flag}")
+            if regressed:
+                regressions.append(name)
+        return regressions
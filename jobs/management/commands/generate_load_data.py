@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.text import slugify
+from jobs.loadgen import LoadGenerator, LoadProfile, refresh_derived_data
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = ('Bulk-creates large, Zipf-skewed sets of employers, seekers, jobs and applications '
+            'for load testing and the benchmark_* commands')
+
+    def add_arguments(self, parser):
+        defaults = LoadProfile()
+        parser.add_argument('--employers', type=int, default=defaults.employers)
+        parser.add_argument('--seekers', type=int, default=defaults.seekers)
+        parser.add_argument('--jobs', type=int, default=defaults.jobs)
+        parser.add_argument('--applications', type=int, default=defaults.applications)
+        parser.add_argument('--zipf', type=float, default=defaults.zipf,
+                            help='Skew of jobs per employer, jobs per location and applications per job')
+        parser.add_argument('--days', type=int, default=defaults.days, help='Spread creation dates over this many days')
+        parser.add_argument('--active-ratio', type=float, default=defaults.active_ratio)
+        parser.add_argument('--prefix', default=defaults.prefix,
+                            help='Namespace for usernames and slugs (lowercase letters, digits, '
+                                 '"-" and "_"); use a new one to add another data set')
+        parser.add_argument('--password', default=None,
+                            help='Password for every generated user (hashed once); default: unusable')
+        parser.add_argument('--seed', type=int, default=defaults.seed)
+        parser.add_argument('--batch-size', type=int, default=defaults.batch_size)
+        parser.add_argument('--no-index', action='store_true',
+                            help='Skip the search index and autocomplete snapshot (rebuild them later)')
+
+    def handle(self, *args, **options):
+        # Embedded verbatim in job slugs, usernames and email domains
+        if not options['prefix'] or slugify(options['prefix']) != options['prefix']:
+            raise CommandError(f"--prefix must be a slug (lowercase letters, digits, '-' and '_'), "
+                               f"not '{options['prefix']}'.")
+        profile = LoadProfile(**{
+            name: options[name] for name in (
+                'employers', 'seekers', 'jobs', 'applications', 'zipf', 'days', 'active_ratio',
+                'prefix', 'password', 'seed', 'batch_size',
+            )
+        })
+        self.verbosity = options['verbosity']
+        generator = LoadGenerator(profile, progress=self.progress)
+        if generator.existing():
+            raise CommandError(f"Data with prefix '{profile.prefix}' already exists; pass another --prefix.")
+
+        started = time.perf_counter()
+        created = generator.run()
+        self.stdout.write('Updating counters, search index and autocomplete...')
+        refresh_derived_data(
+            jobs=Job.objects.filter(employer__username__startswith=f'{profile.prefix}-employer-'),
+            index=not options['no_index'],
+        )
+        elapsed = time.perf_counter() - started
+
+        summary = ', '.join(f'{count} {label}' for label, count in created.items())
+        self.stdout.write(self.style.SUCCESS(f'Created {summary} in {elapsed:.1f}s.'))
+
+    def progress(self, label, done, total):
+        if self.verbosity >= 2 or done == total:
+            self.stdout.write(f'  {label}: {done}/{total}')
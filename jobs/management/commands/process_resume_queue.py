@@ -0,0 +1,101 @@
+import multiprocessing
+import os
+import time
+
+from django.core.management.base import BaseCommand
+from jobs import resume_cache
+from jobs.tasks import (
+    claim_tasks, complete_task, fail_task, parse_resume_source, resume_digest, resume_source,
+)
+from jobs.utils import PDF_PROFILES, get_pdf_profile
+
+class Command(BaseCommand):
+    help = 'Parses queued resumes in a pool of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Number of parser processes (default: CPU count)')
+        parser.add_argument('--timeout', type=float, default=60,
+                            help='Seconds allowed per resume before it is retried')
+        parser.add_argument('--max-attempts', type=int, default=3,
+                            help='Attempts before a task is marked as failed')
+        parser.add_argument('--backoff', type=float, default=30,
+                            help='Base retry delay in seconds, doubled per attempt')
+        parser.add_argument('--poll-interval', type=float, default=2,
+                            help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--once', action='store_true',
+                            help='Drain the queue and exit instead of polling forever')
+        parser.add_argument('--profile', choices=sorted(PDF_PROFILES),
+                            help='Extraction profile (default: RESUME_PARSE_PROFILE)')
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        self.timeout = options['timeout']
+        self.max_attempts = options['max_attempts']
+        self.backoff = options['backoff']
+        self.profile = get_pdf_profile(options['profile'])
+
+        self.stdout.write(f'Starting {self.profile.name} resume parser with {workers} processes...')
+        pool = multiprocessing.Pool(workers)
+        processed = 0
+        try:
+            while True:
+                # One task per process, so no task waits behind another for its timeout
+                tasks = claim_tasks(limit=workers, lease_seconds=self.timeout * 2)
+                if not tasks:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                timed_out = self.run_batch(pool, tasks)
+                processed += len(tasks)
+                if timed_out:
+                    # A hung parse can only be stopped by killing its process
+                    pool.terminate()
+                    pool.join()
+                    pool = multiprocessing.Pool(workers)
+        except KeyboardInterrupt:
+            self.stdout.write('Interrupted, shutting down...')
+        finally:
+            pool.terminate()
+            pool.join()
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} tasks.'))
+
+    def run_batch(self, pool, tasks):
+        pending = []
+        for task in tasks:
+            try:
+                digest = resume_digest(task.application)
+                cached = resume_cache.lookup(digest)
+                source = None if cached else resume_source(task.application)
+            except Exception as e:
+                self.fail(task, f'Could not read resume: {e}')
+                continue
+            if cached is not None:
+                complete_task(task, cached.text, digest)
+                self.stdout.write(f'Reused cached text for application {task.application_id}')
+                continue
+            pending.append((task, digest, pool.apply_async(parse_resume_source, (source, self.profile))))
+
+        timed_out = False
+        deadline = time.monotonic() + self.timeout
+        for task, digest, result in pending:
+            try:
+                text = result.get(max(0, deadline - time.monotonic()))
+            except multiprocessing.TimeoutError:
+                timed_out = True
+                self.fail(task, f'Timed out after {self.timeout:g}s')
+            except Exception as e:
+                self.fail(task, repr(e))
+            else:
+                complete_task(task, text, digest)
+                resume = task.application.resume
+                resume_cache.store(digest, text, size=resume.size, file_name=resume.name)
+                self.stdout.write(f'Parsed resume for application {task.application_id}')
+        return timed_out
+
+    def fail(self, task, error):
+        fail_task(task, error, self.max_attempts, self.backoff)
+        self.stderr.write(f'Application {task.application_id} attempt {task.attempts} failed: {error}')
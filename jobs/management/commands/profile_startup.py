@@ -0,0 +1,89 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from jobs.startup import parse_importtime
+
+# Run in a fresh interpreter, so nothing is imported yet
+BOOT_SCRIPT = """
+import importlib, json, sys, time
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+module = importlib.import_module({entry!r})
+elapsed = time.perf_counter() - started
+print(json.dumps({{'wall': elapsed, 'phases': getattr(module, 'startup_timings', {{}})}}))
+"""
+
+
+class Command(BaseCommand):
+    help = ('Cold-starts the serverless entry point in a fresh interpreter under -X importtime and '
+            'reports import time per module and package, plus the entry point\'s startup phases')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entry', default='api.index', help='Module to import cold (default: api.index)')
+        parser.add_argument('--top', type=int, default=20, help='Modules/packages to list')
+        parser.add_argument('--runs', type=int, default=1, help='Cold starts to run; the fastest is reported')
+        parser.add_argument('--output', help='Write the report as JSON, to track cold starts over time')
+
+    def handle(self, *args, **options):
+        best = None
+        for _ in range(options['runs']):
+            run = self.cold_start(options['entry'])
+            if best is None or run['wall'] < best['wall']:
+                best = run
+
+        rows = best['imports']
+        packages = defaultdict(int)
+        for module, self_us, _, _ in rows:
+            packages[module.split('.')[0]] += self_us
+        top_modules = sorted(rows, key=lambda row: row[1], reverse=True)[:options['top']]
+        top_packages = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:options['top']]
+
+        self.stdout.write(f"Cold start of {options['entry']}: {best['wall'] * 1000:.0f}ms "
+                          f"({len(rows)} modules imported)")
+        for phase, seconds in best['phases'].items():
+            self.stdout.write(f"  {phase:<12} {seconds * 1000:>8.1f}ms")
+        self.stdout.write(f"\n{'package':<30} {'self':>10}")
+        for package, self_us in top_packages:
+            self.stdout.write(f"{package:<30} {self_us / 1000:>8.1f}ms")
+        self.stdout.write(f"\n{'module':<50} {'self':>10} {'cumulative':>11}")
+        for module, self_us, cumulative_us, _ in top_modules:
+            self.stdout.write(f"{module:<50} {self_us / 1000:>8.1f}ms {cumulative_us / 1000:>9.1f}ms")
+
+        if options['output']:
+            report = {
+                'created_at': timezone.now().isoformat(),
+                'entry': options['entry'],
+                'python': sys.version.split()[0],
+                'wall_ms': round(best['wall'] * 1000, 1),
+                'phases_ms': {phase: round(seconds * 1000, 1) for phase, seconds in best['phases'].items()},
+                'packages_ms': {package: round(us / 1000, 2) for package, us in sorted(packages.items())},
+                'modules': [
+                    {'module': module, 'self_ms': round(self_us / 1000, 3), 'cumulative_ms': round(cum_us / 1000, 3)}
+                    for module, self_us, cum_us, _ in rows
+                ],
+            }
+            Path(options['output']).write_text(json.dumps(report, indent=2))
+            self.stdout.write(f"Report written to {options['output']}")
+
+    def cold_start(self, entry):
+        script = BOOT_SCRIPT.format(root=str(settings.BASE_DIR), entry=entry)
+        env = {**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'}
+        env.setdefault('DJANGO_SETTINGS_MODULE', os.environ.get('DJANGO_SETTINGS_MODULE', 'job_portal.settings'))
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', script],
+                                capture_output=True, text=True, env=env, cwd=settings.BASE_DIR)
+        if result.returncode != 0:
+            raise CommandError(f"Importing {entry} failed:\n{result.stderr[-2000:]}")
+        try:
+            summary = json.loads(result.stdout.strip().splitlines()[-1])
+        except (ValueError, IndexError):
+            summary = {'wall': time.perf_counter() - started, 'phases': {}}
+        return {**summary, 'imports': parse_importtime(result.stderr)}
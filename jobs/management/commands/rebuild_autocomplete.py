@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from jobs.autocomplete import get_service
+
+class Command(BaseCommand):
+    help = 'Rebuilds the autocomplete index and its shared snapshot file'
+
+    def handle(self, *args, **kwargs):
+        service = get_service()
+        count = service.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {count} active jobs '
+            f'({len(service.titles)} titles, {len(service.locations)} locations) '
+            f'into {service.snapshot_path}'
+        ))
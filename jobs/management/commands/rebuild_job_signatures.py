@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+from jobs import minhash
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the MinHash signatures used for similar jobs and the near-duplicate report'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--report', action='store_true', help='List near-duplicate groups afterwards')
+        parser.add_argument('--threshold', type=float, default=minhash.DUPLICATE_THRESHOLD)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = minhash.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Signed {count} jobs in {time.perf_counter() - started:.2f}s'
+        ))
+        if not options['report']:
+            return
+        groups = minhash.near_duplicate_groups(options['threshold'])
+        slugs = dict(Job.objects.filter(pk__in=[pk for group in groups for pk in group]).values_list('pk', 'slug'))
+        for group in groups:
+            self.stdout.write(', '.join(slugs[pk] for pk in group))
+        self.stdout.write(f'{len(groups)} near-duplicate groups')
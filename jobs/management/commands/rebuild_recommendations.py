@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from jobs import recommendations
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the recommended-jobs vector index (re-clustering it and dropping removed jobs)'
+
+    def handle(self, *args, **kwargs):
+        if not recommendations.available():
+            raise CommandError('NumPy is not installed')
+        index = recommendations.get_index()
+        started = time.perf_counter()
+        count = index.rebuild()
+        mode = 'clustered' if index.manifest['clustered'] else 'exact'
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {count} active jobs ({mode}) into {index.directory} '
+            f'in {time.perf_counter() - started:.2f}s'
+        ))
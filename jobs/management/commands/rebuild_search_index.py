@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from jobs.models import Job
+from jobs.search import get_backend
+
+class Command(BaseCommand):
+    help = 'Rebuilds the full-text search index for all jobs'
+
+    def handle(self, *args, **kwargs):
+        backend = get_backend()
+        self.stdout.write(f'Rebuilding search index with {type(backend).__name__}...')
+
+        jobs = Job.objects.select_related('employer').only(
+            'title', 'location', 'description', 'employer__company_name'
+        ).iterator(chunk_size=2000)
+        with transaction.atomic():
+            count = backend.rebuild(jobs)
+
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} jobs.'))
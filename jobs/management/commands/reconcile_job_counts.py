@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.text import capfirst
+from jobs.counters import reconcile
+from jobs.facets import reconcile_facet_counts
+
+class Command(BaseCommand):
+    help = 'Recomputes the denormalized open/total job counters on categories and employers, and the facet counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report how many rows have wrong counters')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            fixed = reconcile(dry_run=options['dry_run'])
+        verb = 'would be fixed' if options['dry_run'] else 'fixed'
+        for name, count in fixed.items():
+            self.stdout.write(f'{capfirst(name)}: {count} {verb}')
+        if not options['dry_run']:
+            with transaction.atomic():
+                rows = reconcile_facet_counts()
+            self.stdout.write(f'Facet counts: {rows} rows rebuilt')
+        self.stdout.write(self.style.SUCCESS('Job counters reconciled.'))
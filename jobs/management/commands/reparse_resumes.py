@@ -0,0 +1,122 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from jobs.matching import term_vector
+from jobs.models import Application
+from jobs.tasks import resume_source
+from jobs.utils import PDF_PROFILES, get_pdf_profile, parse_pdf_text_with_pages
+
+
+def _parse(source, profile):
+    """Runs in a pool process. Returns (text, pages, error) instead of raising."""
+    if source is None:
+        return '', 0, 'Resume file could not be read'
+    try:
+        text, pages = parse_pdf_text_with_pages(source, profile)
+        return text, pages, None
+    except Exception as e:
+        return '', 0, repr(e)
+
+
+def _read_source(application):
+    try:
+        return resume_source(application)
+    except Exception:
+        return None
+
+
+class Command(BaseCommand):
+    help = 'Re-extracts Application.parsed_text for existing resumes using all CPU cores'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Parser processes (default: CPU count)')
+        parser.add_argument('--chunk-size', type=int, default=200,
+                            help='Applications fetched and written back per batch')
+        parser.add_argument('--only-missing', action='store_true',
+                            help='Only parse applications without parsed text')
+        parser.add_argument('--checkpoint', default='reparse_resumes.checkpoint',
+                            help='File recording progress so an interrupted run can resume')
+        parser.add_argument('--restart', action='store_true',
+                            help='Ignore any existing checkpoint and start from the beginning')
+        parser.add_argument('--profile', choices=sorted(PDF_PROFILES),
+                            help='Extraction profile (default: RESUME_PARSE_PROFILE)')
+
+    def handle(self, *args, **options):
+        checkpoint_path = options['checkpoint']
+        state = {'last_pk': 0, 'files': 0, 'pages': 0, 'failed': 0}
+        if not options['restart'] and os.path.exists(checkpoint_path):
+            with open(checkpoint_path) as f:
+                state.update(json.load(f))
+            self.stdout.write(f"Resuming after application {state['last_pk']}...")
+
+        queryset = Application.objects.filter(resume__iendswith='.pdf').only('pk', 'resume')
+        if options['only_missing']:
+            queryset = queryset.filter(parsed_text='')
+
+        profile = get_pdf_profile(options['profile'])
+        chunk_size = options['chunk_size']
+        started = time.monotonic()
+        files = pages = failed = 0
+
+        workers = max(1, options['workers'])
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            while True:
+                # Keyset pagination: cost per chunk stays constant however far in we are
+                chunk = list(queryset.filter(pk__gt=state['last_pk']).order_by('pk')[:chunk_size])
+                if not chunk:
+                    break
+
+                sources = [_read_source(app) for app in chunk]
+                # A few map chunks per worker balances IPC overhead against stragglers
+                results = executor.map(_parse, sources, repeat(profile), chunksize=max(1, len(chunk) // (4 * workers)))
+                parsed, unparsed = [], []
+                for app, (text, page_count, error) in zip(chunk, results):
+                    if error is None:
+                        app.parsed_text = text
+                        app.resume_terms = term_vector(text)
+                        app.parse_status = 'parsed'
+                        parsed.append(app)
+                    else:
+                        app.parse_status = 'failed'
+                        unparsed.append(app)
+                        failed += 1
+                        self.stderr.write(f'Application {app.pk}: {error}')
+                    pages += page_count
+                files += len(chunk)
+
+                # Failed rows keep their text, which was never loaded: writing it
+                # back would fetch the deferred fields one query per row
+                with transaction.atomic():
+                    Application.objects.bulk_update(parsed, ['parsed_text', 'resume_terms', 'parse_status'])
+                    Application.objects.bulk_update(unparsed, ['parse_status'])
+
+                state['last_pk'] = chunk[-1].pk
+                self.save_checkpoint(checkpoint_path, state, files, pages, failed)
+                self.report(files, pages, failed, started)
+
+        self.report(files, pages, failed, started, final=True)
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+    def save_checkpoint(self, path, state, files, pages, failed):
+        data = dict(state, files=state['files'] + files, pages=state['pages'] + pages,
+                    failed=state['failed'] + failed)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def report(self, files, pages, failed, started, final=False):
+        elapsed = max(time.monotonic() - started, 1e-9)
+        line = (f'{files} files, {pages} pages, {failed} failed in {elapsed:.1f}s '
+                f'({files / elapsed:.1f} files/sec, {pages / elapsed:.1f} pages/sec)')
+        if final:
+            self.stdout.write(self.style.SUCCESS(f'Done: {line}'))
+        else:
+            self.stdout.write(line)
@@ -78,7 +78,8 @@ class Command(BaseCommand):
             'DevOps Engineer', 'Sales Representative'
         ]
         
-        job_types = ['FT', 'PT', 'CT', 'RM', 'IN'] # Full-time, Part-time, Contract, Remote, Internship
+        job_types = [code for code, _ in Job.JOB_TYPES]
+        locations = ['Remote', 'New York, NY', 'San Francisco, CA', 'London, UK', 'Berlin, DE']
         
         created_jobs = []
         for title in job_titles:
@@ -90,7 +91,7 @@ class Command(BaseCommand):
                 employer=employer,
                 defaults={
                     'description': f'We are looking for a talented {title} to join our team usually...',
-                    'location': employer.location,
+                    'location': random.choice(locations),
                     'job_type': random.choice(job_types),
                     'category': category,
                     'salary_min': random.randint(50000, 80000),
@@ -113,7 +114,7 @@ class Command(BaseCommand):
                     applicant=applicant,
                     defaults={
                         'cover_letter': 'I am very interested in this role.',
-                        'status': random.choice(['pending', 'reviewed', 'accepted', 'rejected'])
+                        'status': random.choice([status for status, _ in Application.STATUS_CHOICES])
                     }
                 )
                 
@@ -0,0 +1,85 @@
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from jobs.outbox import build_message, claim_emails, mark_failed, mark_sent
+
+class Command(BaseCommand):
+    help = 'Delivers queued notification emails over a single reused mail connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50,
+                            help='Emails claimed per batch')
+        parser.add_argument('--rate', type=float, default=getattr(settings, 'EMAIL_OUTBOX_RATE_LIMIT', 0),
+                            help='Maximum emails per second, 0 for unlimited (default: EMAIL_OUTBOX_RATE_LIMIT)')
+        parser.add_argument('--max-attempts', type=int, default=5,
+                            help='Attempts before an email is marked as failed')
+        parser.add_argument('--backoff', type=float, default=60,
+                            help='Base retry delay in seconds, doubled per attempt')
+        parser.add_argument('--poll-interval', type=float, default=5,
+                            help='Seconds to sleep when the outbox is empty')
+        parser.add_argument('--once', action='store_true',
+                            help='Drain the outbox and exit instead of polling forever')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        self.max_attempts = options['max_attempts']
+        self.backoff = options['backoff']
+        self.interval = 1 / options['rate'] if options['rate'] > 0 else 0
+        self.next_send = time.monotonic()
+
+        connection = get_connection(fail_silently=False)
+        sent = failed = 0
+        self.stdout.write('Starting email outbox worker...')
+        try:
+            while True:
+                # Lease long enough for the whole batch at the configured rate
+                emails = claim_emails(limit=batch_size, lease_seconds=60 + batch_size * self.interval)
+                if not emails:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                batch_sent = self.deliver_batch(connection, emails)
+                sent += batch_sent
+                failed += len(emails) - batch_sent
+        except KeyboardInterrupt:
+            self.stdout.write('Interrupted, shutting down...')
+
+        self.stdout.write(self.style.SUCCESS(f'Sent {sent} emails, {failed} failed attempts.'))
+
+    def deliver_batch(self, connection, emails):
+        """
+        Sends ``emails`` over one SMTP session (TLS handshake and login once
+        per batch). The backend only keeps a session across send() calls
+        while it is explicitly open; otherwise it reconnects per message.
+        """
+        sent = 0
+        try:
+            for email in emails:
+                self.throttle()
+                try:
+                    # No-op while the session is up; reconnects after a failure
+                    connection.open()
+                    build_message(email, connection).send()
+                except Exception as e:
+                    # Start a fresh session for the next message in case this one is broken
+                    connection.close()
+                    mark_failed(email, repr(e), self.max_attempts, self.backoff)
+                    self.stderr.write(f'Email {email.pk} attempt {email.attempts} failed: {e!r}')
+                else:
+                    mark_sent(email)
+                    sent += 1
+        finally:
+            connection.close()
+        return sent
+
+    def throttle(self):
+        if not self.interval:
+            return
+        delay = self.next_send - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self.next_send = max(self.next_send, time.monotonic()) + self.interval
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.template import TemplateDoesNotExist, TemplateSyntaxError
+from jobs.startup import compile_templates
+
+
+class Command(BaseCommand):
+    help = ('Compiles every project template (or the named ones) and fails on the first that does not '
+            'compile; run at build time. At runtime STARTUP_WARMUP does the same in each process')
+
+    def add_arguments(self, parser):
+        parser.add_argument('templates', nargs='*', help='Template names (default: everything under jobs/templates)')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            compiled = compile_templates(options['templates'] or None)
+        except (TemplateSyntaxError, TemplateDoesNotExist) as e:
+            raise CommandError(f'Template error: {e}')
+        elapsed = time.perf_counter() - started
+        if options['verbosity'] >= 2:
+            for engine, name in compiled:
+                self.stdout.write(f'  {engine}: {name}')
+        self.stdout.write(self.style.SUCCESS(f'Compiled {len(compiled)} templates in {elapsed * 1000:.1f}ms.'))
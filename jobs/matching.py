@@ -0,0 +1,201 @@
+"""
+Resume-to-job matching: ranks a job's applicants by how well their resume
+text matches the job posting, with Okapi BM25.
+
+Every document is reduced to a sparse term-frequency vector over a hashed
+vocabulary (CRC32 of each token, folded to ``DIMENSIONS`` buckets), so
+vectors need no shared dictionary and each one can be computed on its own.
+An application's vector is stored in ``Application.resume_terms`` whenever
+``parsed_text`` changes (jobs/signals.py, jobs/tasks.py); applications
+parsed before the column existed get theirs on first use.
+
+``match_scores`` stacks a job's applicant vectors into one CSR-style set of
+arrays and scores all of them against the job's vector with a handful of
+NumPy operations, in effect one sparse matrix-vector product, with IDF
+computed over that applicant pool. Vector encoding is pure Python;
+only scoring needs NumPy, and without it ``available()`` is False and
+views fall back to their default order.
+"""
+import math
+import zlib
+from array import array
+from collections import Counter
+
+from django.core.cache import cache
+from django.db.models import BooleanField, ExpressionWrapper, Q
+
+from .search import tokenize
+
+try:
+    import numpy as np
+except ImportError:  # Optional: only needed for scoring
+    np = None
+
+DIMENSIONS = 1 << 20
+# BM25 term-frequency saturation and document-length normalization
+K1 = 1.2
+B = 0.75
+
+# Per-term counts are stored as uint16
+_MAX_TF = 0xFFFF
+
+
+def available():
+    return np is not None
+
+
+def term_vector(text):
+    """
+    Encodes ``text`` as a sparse hashed term-frequency vector: n native-endian
+    uint32 term ids (sorted) followed by their n uint16 counts. Empty text
+    gives b''.
+    """
+    counts = Counter(zlib.crc32(token.encode()) & (DIMENSIONS - 1) for token in tokenize(text))
+    if not counts:
+        return b''
+    ids = sorted(counts)
+    return array('I', ids).tobytes() + array('H', (min(counts[i], _MAX_TF) for i in ids)).tobytes()
+
+
+def decode(blob):
+    """Returns (term ids, counts) arrays for a term_vector() blob."""
+    blob = bytes(blob or b'')
+    n = len(blob) // 6
+    return (np.frombuffer(blob, dtype=np.uint32, count=n),
+            np.frombuffer(blob, dtype=np.uint16, count=n, offset=4 * n))
+
+
+def job_vector(job):
+    """The job's title and description vector, cached until the job changes."""
+    key = f'jobs:match:job:{job.pk}:{job.updated_at.timestamp() if job.updated_at else 0}'
+    vector = cache.get(key)
+    if vector is None:
+        vector = term_vector(f'{job.title}\n{job.description}')
+        cache.set(key, vector, 24 * 3600)
+    return vector
+
+
+def bm25_scores(query, documents):
+    """
+    Scores ``documents`` against ``query`` (term_vector() blobs).
+    Returns:
+        numpy.ndarray: One float64 score per document, in order.
+    """
+    n = len(documents)
+    if not n:
+        return np.zeros(0)
+    decoded = [decode(blob) for blob in documents]
+    lengths = np.fromiter((len(ids) for ids, _ in decoded), dtype=np.int64, count=n)
+    if not lengths.any():
+        return np.zeros(n)
+
+    # The stacked documents: term ids, counts and owning document per non-zero
+    term_ids = np.concatenate([ids for ids, _ in decoded])
+    tf = np.concatenate([counts for _, counts in decoded]).astype(np.float64)
+    owner = np.repeat(np.arange(n), lengths)
+
+    doc_length = np.bincount(owner, weights=tf, minlength=n)
+    norm = K1 * (1 - B + B * doc_length / doc_length.mean())
+
+    # IDF over this pool: terms every applicant has barely count
+    vocabulary, df = np.unique(term_ids, return_counts=True)
+    idf = np.log1p((n - df + 0.5) / (df + 0.5))
+
+    query_ids, query_tf = decode(query)
+    if not len(query_ids):
+        return np.zeros(n)
+    slot = np.minimum(np.searchsorted(query_ids, term_ids), len(query_ids) - 1)
+    hit = query_ids[slot] == term_ids
+    term_ids, tf, owner, slot = term_ids[hit], tf[hit], owner[hit], slot[hit]
+
+    # Repeated words in a long posting count, but sublinearly
+    query_weight = 1 + np.log(query_tf.astype(np.float64))
+    weights = (idf[np.searchsorted(vocabulary, term_ids)] * tf * (K1 + 1) / (tf + norm[owner])
+               * query_weight[slot])
+    return np.bincount(owner, weights=weights, minlength=n)
+
+
+def fill_missing_vectors(applications):
+    """
+    Computes and saves vectors for applications parsed before they were
+    stored. Only those with ``needs_terms`` set (see rank_applications) are
+    considered, and their parsed_text is loaded in one query per batch.
+    """
+    from .models import Application
+
+    missing = {app.pk: app for app in applications if getattr(app, 'needs_terms', True) and not app.resume_terms}
+    pks = list(missing)
+    for start in range(0, len(pks), 500):
+        batch = Application.objects.filter(pk__in=pks[start:start + 500]).exclude(parsed_text='')
+        updated = []
+        for pk, text in batch.values_list('pk', 'parsed_text'):
+            missing[pk].resume_terms = term_vector(text)
+            updated.append(missing[pk])
+        Application.objects.bulk_update(updated, ['resume_terms'])
+
+
+def match_scores(job, applications):
+    """
+    Scores ``applications`` (loaded with ``resume_terms``) against ``job``.
+    Returns:
+        dict: {application pk: score from 0 to 100, relative to the best match}
+    """
+    applications = list(applications)
+    if not applications:
+        return {}
+    scores = bm25_scores(job_vector(job), [bytes(app.resume_terms or b'') for app in applications])
+    best = scores.max()
+    scale = 100 / best if best > 0 else 0
+    return {app.pk: round(float(score) * scale, 1) for app, score in zip(applications, scores)}
+
+
+def rank_applications(job, applications):
+    """
+    Loads ``applications`` (a queryset) with their vectors but not their
+    text, and returns them as a list, best match first, each with a
+    ``match_score`` attribute.
+    """
+    applications = list(
+        applications.defer('parsed_text').annotate(needs_terms=ExpressionWrapper(
+            Q(resume_terms=b'') & ~Q(parsed_text=''), output_field=BooleanField(),
+        ))
+    )
+    fill_missing_vectors(applications)
+    scores = match_scores(job, applications)
+    for application in applications:
+        application.match_score = scores[application.pk]
+    # Stable: equal scores keep the queryset's order
+    applications.sort(key=lambda application: application.match_score, reverse=True)
+    return applications
+
+
+def pairwise_scores(query, documents):
+    """
+    bm25_scores() one document and one term at a time in pure Python; the
+    baseline for manage.py benchmark_matching and a reference in tests.
+    """
+    def parse(blob):
+        n = len(blob) // 6
+        ids, counts = array('I'), array('H')
+        ids.frombytes(blob[:4 * n])
+        counts.frombytes(blob[4 * n:])
+        return dict(zip(ids, counts))
+
+    docs = [parse(bytes(blob or b'')) for blob in documents]
+    if not docs:
+        return []
+    df = Counter(term for doc in docs for term in doc)
+    avgdl = sum(sum(doc.values()) for doc in docs) / len(docs) or 1
+    scores = []
+    for doc in docs:
+        length = sum(doc.values())
+        score = 0.0
+        for term, qtf in parse(bytes(query)).items():
+            tf = doc.get(term)
+            if tf:
+                idf = math.log1p((len(docs) - df[term] + 0.5) / (df[term] + 0.5))
+                norm = K1 * (1 - B + B * length / avgdl)
+                score += idf * tf * (K1 + 1) / (tf + norm) * (1 + math.log(qtf))
+        scores.append(score)
+    return scores
+
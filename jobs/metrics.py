@@ -0,0 +1,216 @@
+"""
+Per-request performance metrics, exposed in the Prometheus text format.
+
+``RequestMetricsMiddleware`` records, per resolved view name, the request's
+wall time, database query count and time, template render time and
+response size into fixed-bucket histograms held in process memory. Adding
+an observation is a bisect and an increment under a lock, so the cost per
+request is a few microseconds plus one ``perf_counter()`` pair per query.
+
+Components can also publish gauges (``GAUGES``, e.g. the size of the job
+bitmap index). ``GET /metrics/`` (``jobs.views.metrics``) renders them and
+the histograms for a Prometheus scrape. Each worker process keeps its own
+numbers; Prometheus sums them across scrape targets.
+
+With ``METRICS_SLOW_REQUEST_MS`` set, requests slower than that also have
+their SQL captured and written to the ``jobs.slow_requests`` logger.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('jobs.slow_requests')
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# name -> (help text, buckets)
+HISTOGRAMS = {
+    'jobs_request_duration_seconds': ('Wall time spent handling a request.', DURATION_BUCKETS),
+    'jobs_request_db_queries': ('Database queries run by a request.', QUERY_BUCKETS),
+    'jobs_request_db_duration_seconds': ('Time a request spent waiting on database queries.', DURATION_BUCKETS),
+    'jobs_request_template_seconds': ('Time spent rendering a TemplateResponse.', DURATION_BUCKETS),
+    'jobs_response_size_bytes': ('Size of non-streaming response bodies.', SIZE_BUCKETS),
+}
+
+# name -> help text; set by the components they describe
+GAUGES = {
+    'jobs_bitmap_index_bytes': 'Memory held by the in-process job bitmap index.',
+    'jobs_bitmap_index_jobs': 'Jobs in the in-process job bitmap index.',
+    'jobs_bitmap_index_rebuild_seconds': 'Duration of the last bitmap index rebuild.',
+}
+
+# Captured statements listed per slow request
+SLOW_REQUEST_MAX_QUERIES = 50
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense; not thread-safe on its own."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            yield bound, total
+
+
+class Registry:
+    def __init__(self):
+        self._histograms = {}
+        self._responses = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    def observe(self, view, status, values):
+        """Records one request: ``values`` maps histogram names to observations."""
+        with self._lock:
+            for name, value in values.items():
+                histogram = self._histograms.get((name, view))
+                if histogram is None:
+                    histogram = self._histograms[name, view] = Histogram(HISTOGRAMS[name][1])
+                histogram.observe(value)
+            key = (view, f'{status // 100}xx')
+            self._responses[key] = self._responses.get(key, 0) + 1
+
+    def set_gauge(self, name, value):
+        with self._lock:
+            self._gauges[name] = value
+
+    def histogram(self, name, view):
+        return self._histograms.get((name, view))
+
+    def gauge(self, name):
+        return self._gauges.get(name)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._responses.clear()
+            self._gauges.clear()
+
+    def render(self):
+        """The registry in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            lines = [
+                '# HELP jobs_http_responses_total Responses by view and status class.',
+                '# TYPE jobs_http_responses_total counter',
+            ]
+            for (view, status), count in sorted(self._responses.items()):
+                lines.append(f'jobs_http_responses_total{{view="{_escape(view)}",status="{status}"}} {count}')
+            for name, (help_text, _) in HISTOGRAMS.items():
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+                for (metric, view), histogram in sorted(self._histograms.items()):
+                    if metric != name:
+                        continue
+                    label = f'view="{_escape(view)}"'
+                    for bound, count in histogram.cumulative():
+                        le = '+Inf' if bound == float('inf') else repr(float(bound))
+                        lines.append(f'{name}_bucket{{{label},le="{le}"}} {count}')
+                    lines.append(f'{name}_sum{{{label}}} {histogram.sum:.6f}')
+                    lines.append(f'{name}_count{{{label}}} {histogram.count}')
+            for name, help_text in GAUGES.items():
+                if name in self._gauges:
+                    lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge', f'{name} {self._gauges[name]}']
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = Registry()
+
+
+class _QueryRecorder:
+    """Execute wrapper timing every query; keeps the SQL only when asked to."""
+
+    def __init__(self, keep_sql):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = [] if keep_sql else None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            if self.statements is not None:
+                self.statements.append((elapsed, sql))
+
+
+class RequestMetricsMiddleware:
+    """Put first in MIDDLEWARE so the timings include every other middleware."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            return self.get_response(request)
+
+        slow_ms = getattr(settings, 'METRICS_SLOW_REQUEST_MS', None)
+        recorder = _QueryRecorder(keep_sql=bool(slow_ms))
+        request._metrics_template_seconds = None
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else '<unresolved>'
+        values = {
+            'jobs_request_duration_seconds': duration,
+            'jobs_request_db_queries': recorder.count,
+            'jobs_request_db_duration_seconds': recorder.duration,
+        }
+        if request._metrics_template_seconds is not None:
+            values['jobs_request_template_seconds'] = request._metrics_template_seconds
+        if not response.streaming:
+            values['jobs_response_size_bytes'] = len(response.content)
+        registry.observe(view, response.status_code, values)
+
+        if slow_ms and duration * 1000 >= slow_ms:
+            _log_slow_request(request, view, response, duration, recorder)
+        return response
+
+    def process_template_response(self, request, response):
+        # The outermost middleware's hook runs last, right before render()
+        started = time.perf_counter()
+
+        def rendered(response):
+            request._metrics_template_seconds = time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+def _log_slow_request(request, view, response, duration, recorder):
+    slowest = sorted(recorder.statements, key=lambda statement: statement[0], reverse=True)
+    sql = '\n'.join(f'  {elapsed * 1000:8.2f}ms  {statement}' for elapsed, statement in slowest[:SLOW_REQUEST_MAX_QUERIES])
+    logger.warning(
+        'Slow request: %s %s (%s) -> %s in %.0fms, %d queries in %.0fms\n%s',
+        request.method, request.get_full_path(), view, response.status_code, duration * 1000,
+        recorder.count, recorder.duration * 1000, sql,
+    )
@@ -0,0 +1,58 @@
+# Generated by Django 6.0.1 on 2026-02-08 10:12
+
+from django.db import migrations
+
+
+def sqlite_has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return any(row[0] == 'ENABLE_FTS5' for row in cursor.fetchall())
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE TABLE IF NOT EXISTS jobs_job_search ("
+            "job_id bigint PRIMARY KEY, document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_job_search_document_gin "
+            "ON jobs_job_search USING GIN (document)"
+        )
+        schema_editor.execute(
+            "INSERT INTO jobs_job_search (job_id, document) "
+            "SELECT j.id, "
+            "setweight(to_tsvector('english', coalesce(j.title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(u.company_name, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(j.location, '')), 'C') || "
+            "setweight(to_tsvector('english', coalesce(j.description, '')), 'D') "
+            "FROM jobs_job j JOIN jobs_user u ON u.id = j.employer_id "
+            "ON CONFLICT (job_id) DO NOTHING"
+        )
+    elif connection.vendor == 'sqlite' and sqlite_has_fts5(connection):
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_job_search USING fts5("
+            "title, company, location, description, tokenize='porter unicode61')"
+        )
+        schema_editor.execute(
+            "INSERT INTO jobs_job_search (rowid, title, company, location, description) "
+            "SELECT j.id, j.title, u.company_name, j.location, j.description "
+            "FROM jobs_job j JOIN jobs_user u ON u.id = j.employer_id"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('postgresql', 'sqlite'):
+        schema_editor.execute("DROP TABLE IF EXISTS jobs_job_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_application_parsed_text'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 6.0.1 on 2026-02-15 14:27
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def set_existing_parse_status(apps, schema_editor):
+    # Rows created before the queue existed were parsed inline (or not at all)
+    Application = apps.get_model('jobs', 'Application')
+    Application.objects.exclude(parsed_text='').update(parse_status='parsed')
+    Application.objects.filter(parsed_text='').update(parse_status='skipped')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_job_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='parse_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('parsed', 'Parsed'), ('failed', 'Failed'), ('skipped', 'Skipped')], default='pending', max_length=10),
+        ),
+        migrations.RunPython(set_existing_parse_status, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='ResumeParseTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_until', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('application', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='parse_task', to='jobs.application')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'run_after'], name='jobs_resume_status_23e6b3_idx')],
+            },
+        ),
+    ]
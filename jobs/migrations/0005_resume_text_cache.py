@@ -0,0 +1,35 @@
+# Generated by Django 6.0.1 on 2026-02-21 11:03
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_resume_parse_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeTextCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('text', models.TextField(blank=True)),
+                ('size', models.PositiveIntegerField(default=0, help_text='PDF size in bytes')),
+                ('file_name', models.CharField(blank=True, help_text='Stored copy of this PDF, if any', max_length=255)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name_plural': 'Resume text cache',
+            },
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='resume_sha256',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 6.0.1 on 2026-02-24 10:12
+
+from django.db import migrations, models
+
+
+def fill_counters(apps, schema_editor):
+    from jobs.counters import reconcile_model
+
+    Job = apps.get_model('jobs', 'Job')
+    reconcile_model(apps.get_model('jobs', 'Category'), 'category', job_model=Job)
+    reconcile_model(apps.get_model('jobs', 'User'), 'employer', job_model=Job)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_job_feed_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='open_jobs',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Open jobs'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='total_jobs',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Total jobs'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='open_jobs',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Open jobs'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='total_jobs',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Total jobs'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
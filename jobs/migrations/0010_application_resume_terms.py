@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-02-26 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0009_job_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='resume_terms',
+            field=models.BinaryField(default=b''),
+        ),
+    ]
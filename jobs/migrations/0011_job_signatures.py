@@ -0,0 +1,47 @@
+# Generated by Django 6.0.1 on 2026-02-27 09:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_signatures(apps, schema_editor):
+    from jobs.minhash import bands, signature
+
+    Job = apps.get_model('jobs', 'Job')
+    JobSignature = apps.get_model('jobs', 'JobSignature')
+    JobSignatureBand = apps.get_model('jobs', 'JobSignatureBand')
+    for pk, description in Job.objects.values_list('pk', 'description').iterator(chunk_size=1000):
+        sig = signature(description)
+        JobSignature.objects.create(job_id=pk, minhash=sig)
+        JobSignatureBand.objects.bulk_create(
+            JobSignatureBand(job_id=pk, band=band, bucket=bucket) for band, bucket in bands(sig)
+        )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0010_application_resume_terms'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobSignature',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='signature', serialize=False, to='jobs.job')),
+                ('minhash', models.BinaryField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='JobSignatureBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('bucket', models.IntegerField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='signature_bands', to='jobs.job')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['bucket'], name='job_signature_bucket_idx')],
+            },
+        ),
+        migrations.RunPython(fill_signatures, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 6.0.1 on 2026-10-18 03:49
+
+from django.db import migrations, models
+from django.db.models import Case, CharField, Count, Q, Value, When
+
+# Salary band keys and upper bounds as of this migration (jobs/facets.py)
+SALARY_BANDS = [('lt50', 50000), ('50-80', 80000), ('80-120', 120000), ('120-160', 160000)]
+
+
+def fill_facet_counts(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    JobFacetCount = apps.get_model('jobs', 'JobFacetCount')
+
+    whens = [When(salary_min__isnull=True, salary_max__isnull=True, then=Value('none'))]
+    for key, upper in SALARY_BANDS:
+        whens.append(When(Q(salary_min__lt=upper) | Q(salary_min__isnull=True, salary_max__lt=upper),
+                          then=Value(key)))
+    rows = (
+        Job.objects.filter(is_active=True).order_by()
+        .annotate(band=Case(*whens, default=Value('160+'), output_field=CharField()))
+        .values_list('job_type', 'category', 'location', 'band')
+        .annotate(count=Count('pk'))
+    )
+    JobFacetCount.objects.bulk_create(
+        [JobFacetCount(job_type=job_type, category_id=category_id or 0, location=location,
+                       salary_band=band, count=count)
+         for job_type, category_id, location, band, count in rows.iterator()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0012_feed_generation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobFacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_type', models.CharField(max_length=2)),
+                ('category_id', models.IntegerField(default=0)),
+                ('location', models.CharField(max_length=100)),
+                ('salary_band', models.CharField(max_length=10)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('job_type', 'category_id', 'location', 'salary_band'), name='job_facet_count_unique')],
+            },
+        ),
+        migrations.RunPython(fill_facet_counts, migrations.RunPython.noop),
+    ]
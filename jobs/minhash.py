@@ -0,0 +1,223 @@
+"""
+Near-duplicate detection for job descriptions with MinHash and LSH banding.
+
+A description is reduced to its set of word 3-grams ("shingles"). Its
+MinHash signature keeps, for each of ``PERMUTATIONS`` random hash
+functions, the smallest hash of any shingle; the fraction of positions two
+signatures agree on estimates the Jaccard similarity of the two shingle
+sets. Signatures are stored in ``JobSignature`` (128 uint32, 512 bytes).
+
+For lookups the signature is cut into ``BANDS`` bands of ``ROWS`` values
+and each band hashed to a bucket; ``JobSignatureBand`` holds one row per
+band, indexed on the bucket. Jobs sharing at least one bucket are
+candidates, found through the index without looking at any other job, and
+the number of shared bands ranks them:
+two descriptions with Jaccard similarity s share about
+``BANDS * s ** ROWS`` bands.
+
+Signatures are maintained from Job signals (jobs/signals.py); bulk writes
+catch up with ``manage.py rebuild_job_signatures``.
+"""
+import random
+import zlib
+from collections import defaultdict
+from itertools import combinations
+
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef
+
+from .search import tokenize
+
+try:
+    import numpy as np
+except ImportError:  # Optional: signatures are computed in pure Python without it
+    np = None
+
+PERMUTATIONS = 128
+BANDS = 32
+ROWS = PERMUTATIONS // BANDS
+SHINGLE_SIZE = 3
+# Estimated Jaccard similarity above which the admin report calls two jobs duplicates
+DUPLICATE_THRESHOLD = 0.8
+# Buckets with more jobs than this are not compared pair by pair
+_MAX_BUCKET_PAIRS = 20
+
+# h(x) = (a * x + b) mod P, with a Mersenne prime P small enough that a * x fits in 64 bits
+_PRIME = (1 << 31) - 1
+_rng = random.Random(20240601)
+_A = [_rng.randrange(1, _PRIME) for _ in range(PERMUTATIONS)]
+_B = [_rng.randrange(0, _PRIME) for _ in range(PERMUTATIONS)]
+
+
+def shingles(text):
+    """The set of CRC32 hashes of the word 3-grams of ``text`` (the whole text when shorter)."""
+    tokens = tokenize(text)
+    if not tokens:
+        return set()
+    if len(tokens) < SHINGLE_SIZE:
+        return {zlib.crc32(' '.join(tokens).encode())}
+    return {
+        zlib.crc32(' '.join(tokens[i:i + SHINGLE_SIZE]).encode())
+        for i in range(len(tokens) - SHINGLE_SIZE + 1)
+    }
+
+
+def signature(text):
+    """
+    MinHash signature of ``text``.
+    Returns:
+        bytes: ``PERMUTATIONS`` little-endian uint32 values, or b'' for text without words.
+    """
+    values = shingles(text)
+    if not values:
+        return b''
+    if np is not None:
+        x = np.fromiter(values, dtype=np.uint64, count=len(values)) % np.uint64(_PRIME)
+        a = np.array(_A, dtype=np.uint64)[:, None]
+        b = np.array(_B, dtype=np.uint64)[:, None]
+        return ((a * x + b) % np.uint64(_PRIME)).min(axis=1).astype('<u4').tobytes()
+    x = [value % _PRIME for value in values]
+    return b''.join(
+        min((a * v + b) % _PRIME for v in x).to_bytes(4, 'little') for a, b in zip(_A, _B)
+    )
+
+
+def bands(sig):
+    """
+    (band, bucket) pairs for a signature. The band number is hashed into the
+    bucket, so equal buckets mean the same band; buckets fit a signed 32-bit column.
+    """
+    if not sig:
+        return []
+    width = ROWS * 4
+    return [
+        (band, zlib.crc32(sig[band * width:(band + 1) * width], band) & 0x7FFFFFFF)
+        for band in range(BANDS)
+    ]
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    if not sig_a or not sig_b:
+        return 0.0
+    sig_a, sig_b = bytes(sig_a), bytes(sig_b)
+    same = sum(sig_a[i:i + 4] == sig_b[i:i + 4] for i in range(0, len(sig_a), 4))
+    return same / PERMUTATIONS
+
+
+def similar_jobs(job, k=4):
+    """
+    Active jobs whose descriptions share LSH buckets with ``job``'s stored
+    signature, most shared bands first: one query, probing the bucket index
+    once per band. The QuerySet is lazy, so a cached template fragment can
+    skip it.
+    """
+    from .models import Job, JobSignatureBand
+
+    buckets = JobSignatureBand.objects.filter(job_id=job.pk).values('bucket')
+    return (
+        Job.objects.filter(signature_bands__bucket__in=buckets, is_active=True).exclude(pk=job.pk)
+        .annotate(shared_bands=Count('signature_bands'))
+        .select_related('employer', 'category')
+        .order_by('-shared_bands', '-created_at')[:k]
+    )
+
+
+def update_job(job):
+    """Stores ``job``'s signature and bands, unless they are already current."""
+    from .models import JobSignature, JobSignatureBand
+
+    sig = signature(job.description)
+    current = JobSignature.objects.filter(job_id=job.pk).values_list('minhash', flat=True).first()
+    if current is not None and bytes(current) == sig:
+        return
+    with transaction.atomic():
+        JobSignature.objects.update_or_create(job_id=job.pk, defaults={'minhash': sig})
+        JobSignatureBand.objects.filter(job_id=job.pk).delete()
+        JobSignatureBand.objects.bulk_create(
+            JobSignatureBand(job_id=job.pk, band=band, bucket=bucket) for band, bucket in bands(sig)
+        )
+
+
+def rebuild(jobs=None, batch_size=1000):
+    """
+    Recomputes the signatures of ``jobs`` (a Job QuerySet; default: all).
+    Returns the number of jobs processed.
+    """
+    from .models import Job, JobSignature, JobSignatureBand
+
+    jobs = (jobs if jobs is not None else Job.objects.all()).values_list('pk', 'description')
+    total = 0
+    batch = []
+
+    def flush():
+        ids = [pk for pk, _ in batch]
+        with transaction.atomic():
+            JobSignature.objects.filter(job_id__in=ids).delete()
+            JobSignatureBand.objects.filter(job_id__in=ids).delete()
+            JobSignature.objects.bulk_create(JobSignature(job_id=pk, minhash=sig) for pk, sig in batch)
+            JobSignatureBand.objects.bulk_create(
+                JobSignatureBand(job_id=pk, band=band, bucket=bucket)
+                for pk, sig in batch for band, bucket in bands(sig)
+            )
+        batch.clear()
+
+    for pk, description in jobs.iterator(chunk_size=batch_size):
+        batch.append((pk, signature(description)))
+        total += 1
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return total
+
+
+def near_duplicate_groups(threshold=DUPLICATE_THRESHOLD, active_only=True):
+    """
+    Groups of jobs whose descriptions are near-identical. Candidate pairs
+    come from buckets holding more than one job; each pair is then checked
+    against ``threshold`` with the full signatures.
+    Returns:
+        list: Lists of job ids (oldest first), largest groups first.
+    """
+    from .models import JobSignature, JobSignatureBand
+
+    rows = JobSignatureBand.objects.all()
+    if active_only:
+        rows = rows.filter(job__is_active=True)
+    # Only buckets holding another job: one bucket index probe per row
+    others = rows.filter(bucket=OuterRef('bucket')).exclude(job_id=OuterRef('job_id'))
+    members = defaultdict(list)
+    for bucket, job_id in rows.filter(Exists(others)).values_list('bucket', 'job_id'):
+        members[bucket].append(job_id)
+
+    pairs = set()
+    for ids in members.values():
+        ids.sort()
+        if len(ids) <= _MAX_BUCKET_PAIRS:
+            pairs.update(combinations(ids, 2))
+        else:
+            # A crowded bucket (many reposts of one text): link neighbours instead of every pair
+            pairs.update(zip(ids, ids[1:]))
+    if not pairs:
+        return []
+    candidates = {job_id for pair in pairs for job_id in pair}
+    signatures = dict(JobSignature.objects.filter(job_id__in=candidates).values_list('job_id', 'minhash'))
+
+    # Union-find over the confirmed pairs
+    parent = {}
+
+    def root(job_id):
+        parent.setdefault(job_id, job_id)
+        while parent[job_id] != job_id:
+            parent[job_id] = parent[parent[job_id]]
+            job_id = parent[job_id]
+        return job_id
+
+    for a, b in pairs:
+        if similarity(signatures.get(a), signatures.get(b)) >= threshold:
+            parent[root(b)] = root(a)
+    groups = defaultdict(list)
+    for job_id in parent:
+        groups[root(job_id)].append(job_id)
+    return sorted((sorted(group) for group in groups.values() if len(group) > 1), key=lambda g: (-len(g), g[0]))
@@ -1,12 +1,38 @@
-from django.db import models
+import re
+
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import Q
+from django.db.models.functions import Length
 from django.contrib.auth.models import AbstractUser
+from django.utils import timezone
 from django.utils.text import slugify
 
+COUNTER_FIELDS = ('open_jobs', 'total_jobs')
+
+def _exclude_counters(instance, kwargs):
+    """
+    Leaves the job counters out of a plain save() of an existing row: they are
+    only changed by F() updates, which a stale in-memory copy must not undo.
+    """
+    if instance._state.adding or kwargs.get('force_insert') or kwargs.get('update_fields') is not None:
+        return kwargs
+    kwargs['update_fields'] = [
+        field.name for field in instance._meta.concrete_fields
+        if not field.primary_key and field.name not in COUNTER_FIELDS
+    ]
+    return kwargs
+
 class User(AbstractUser):
     is_employer = models.BooleanField(default=False)
     is_seeker = models.BooleanField(default=False)
     phone = models.CharField(max_length=20, blank=True)
     company_name = models.CharField(max_length=100, blank=True, help_text="Required for employers")
+    # Denormalized job counters, maintained by jobs/counters.py
+    open_jobs = models.PositiveIntegerField(default=0, editable=False, verbose_name="Open jobs")
+    total_jobs = models.PositiveIntegerField(default=0, editable=False, verbose_name="Total jobs")
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **_exclude_counters(self, kwargs))
 
     def __str__(self):
         return self.username
@@ -15,10 +41,16 @@ class Category(models.Model):
     name = models.CharField(max_length=100)
     slug = models.SlugField(unique=True)
     description = models.TextField(blank=True)
+    # Denormalized job counters, maintained by jobs/counters.py
+    open_jobs = models.PositiveIntegerField(default=0, editable=False, verbose_name="Open jobs")
+    total_jobs = models.PositiveIntegerField(default=0, editable=False, verbose_name="Total jobs")
 
     class Meta:
         verbose_name_plural = "Categories"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **_exclude_counters(self, kwargs))
+
     def __str__(self):
         return self.name
 
@@ -44,20 +76,117 @@ class Job(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # HomeView: newest active jobs, optionally within one category
+            models.Index(fields=['-created_at', '-id'], condition=Q(is_active=True), name='job_active_recent_idx'),
+            models.Index(fields=['category', '-created_at', '-id'], condition=Q(is_active=True),
+                         name='job_active_category_recent_idx'),
+            # Employer dashboard and company page: an employer's jobs, newest first
+            models.Index(fields=['employer', '-created_at'], name='job_employer_recent_idx'),
+        ]
+
+    # Attempts at inserting with a freshly allocated slug before giving up
+    SLUG_RETRIES = 5
+
     def save(self, *args, **kwargs):
-        if not self.slug:
-            base_slug = slugify(self.title)
-            slug = base_slug
-            counter = 1
-            while Job.objects.filter(slug=slug).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
-        super().save(*args, **kwargs)
+        if self.slug:
+            # Atomic with the counter updates made by the save signals
+            with transaction.atomic():
+                return super().save(*args, **kwargs)
+
+        base_slug = slugify(self.title)[:240] or 'job'
+        for attempt in range(self.SLUG_RETRIES):
+            self.slug = self._next_free_slug(base_slug)
+            try:
+                # Savepoint, so a lost race does not break an outer transaction;
+                # also keeps the insert atomic with the counter updates
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                # A concurrent insert took the same slug; anything else is a real error
+                if attempt + 1 == self.SLUG_RETRIES or not Job.objects.filter(slug=self.slug).exists():
+                    self.slug = ''
+                    raise
+
+    @classmethod
+    def _next_free_slug(cls, base_slug):
+        """
+        Returns base_slug when it is free (one index lookup), else
+        base_slug-N with N one past the highest suffix in use, in a second
+        query: the highest numeric suffix is the longest matching slug, then
+        the lexicographically greatest.
+        """
+        if not cls.objects.filter(slug=base_slug).exists():
+            return base_slug
+        taken = cls.objects.filter(slug__startswith=base_slug, slug__regex=rf'^{re.escape(base_slug)}(-[0-9]+)?$')
+        if connection.vendor == 'sqlite':
+            # LIKE is case-insensitive there, so it cannot bound an index scan;
+            # under its bytewise collation base_slug[-N] sorts between these
+            taken = taken.filter(slug__gte=base_slug, slug__lt=f'{base_slug}.')
+        last = taken.order_by(Length('slug').desc(), '-slug').values_list('slug', flat=True).first()
+        if last is None:
+            # Deleted in the meantime
+            return base_slug
+        suffix = last[len(base_slug) + 1:]
+        return f"{base_slug}-{int(suffix) + 1 if suffix else 1}"
 
     def __str__(self):
         return self.title
 
+class FeedGeneration(models.Model):
+    """
+    Single row counting Job changes, bumped after each change commits, so
+    every process sees when caches keyed on it went stale (see jobs/counts.py).
+    """
+    value = models.BigIntegerField(default=0)
+
+class JobChange(models.Model):
+    """
+    Log of recent FeedGeneration bumps and the job each one was for, so an
+    in-process index can catch up on other processes' changes by re-reading
+    only those jobs (see jobs/bitmaps.py).
+    """
+    generation = models.BigIntegerField(db_index=True)
+    # A plain integer: deleted jobs stay logged
+    job_id = models.IntegerField()
+
+class JobFacetCount(models.Model):
+    """
+    Active jobs per (job_type, category, location, salary band): the home
+    page's facet table for the unfiltered feed, adjusted by the Job signals
+    (see jobs/facets.py).
+    """
+    job_type = models.CharField(max_length=2)
+    # 0: no category (a plain integer, so the unique constraint covers it)
+    category_id = models.IntegerField(default=0)
+    location = models.CharField(max_length=100)
+    salary_band = models.CharField(max_length=10)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['job_type', 'category_id', 'location', 'salary_band'],
+                                    name='job_facet_count_unique'),
+        ]
+
+class JobSignature(models.Model):
+    """MinHash signature of a job's description (see jobs/minhash.py)."""
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, primary_key=True, related_name='signature')
+    # 128 little-endian uint32 values
+    minhash = models.BinaryField()
+
+class JobSignatureBand(models.Model):
+    """One LSH band of a JobSignature: jobs sharing a (band, bucket) are near-duplicate candidates."""
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='signature_bands')
+    band = models.PositiveSmallIntegerField()
+    bucket = models.IntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['bucket'], name='job_signature_bucket_idx'),
+        ]
+
 class Application(models.Model):
     STATUS_CHOICES = [
         ('Pending', 'Pending'),
@@ -66,16 +195,105 @@ class Application(models.Model):
         ('Rejected', 'Rejected'),
     ]
 
+    PARSE_STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('parsed', 'Parsed'),
+        ('failed', 'Failed'),
+        ('skipped', 'Skipped'),
+    ]
+
     job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='applications')
     applicant = models.ForeignKey(User, on_delete=models.CASCADE, related_name='applications')
     resume = models.FileField(upload_to='resumes/')
     cover_letter = models.TextField(blank=True)
     parsed_text = models.TextField(blank=True, help_text="AI Extracted text from resume")
+    parse_status = models.CharField(max_length=10, choices=PARSE_STATUS_CHOICES, default='pending')
+    resume_sha256 = models.CharField(max_length=64, blank=True, db_index=True)
+    # Hashed term vector of parsed_text, for ranking applicants (see jobs/matching.py)
+    resume_terms = models.BinaryField(default=b'', editable=False)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Pending')
     applied_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         unique_together = ('job', 'applicant')
+        indexes = [
+            # JobApplicationsView: a job's applications, newest first
+            models.Index(fields=['job', '-applied_at'], name='application_job_recent_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # resume_terms is derived from parsed_text (jobs/signals.py); save them together
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'parsed_text' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'resume_terms'}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.applicant.username} - {self.job.title}"
+
+class ResumeParseTask(models.Model):
+    """Queued background extraction of an application's resume text."""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    application = models.OneToOneField(Application, on_delete=models.CASCADE, related_name='parse_task')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'run_after'])]
+
+    def __str__(self):
+        return f"Parse {self.application} ({self.status})"
+
+class ResumeTextCache(models.Model):
+    """Extracted resume text keyed by the SHA-256 of the PDF bytes."""
+    sha256 = models.CharField(max_length=64, unique=True)
+    text = models.TextField(blank=True)
+    size = models.PositiveIntegerField(default=0, help_text="PDF size in bytes")
+    file_name = models.CharField(max_length=255, blank=True, help_text="Stored copy of this PDF, if any")
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        verbose_name_plural = "Resume text cache"
+
+    def __str__(self):
+        return self.sha256[:12]
+
+class OutboundEmail(models.Model):
+    """Notification email waiting to be delivered by the send_queued_emails worker."""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255, blank=True)
+    recipients = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'run_after'])]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)} ({self.status})"
@@ -0,0 +1,90 @@
+"""
+Persistent outbox for notification emails.
+
+Views call ``queue_email`` instead of ``send_mail``, so a request never waits
+on SMTP. The ``send_queued_emails`` management command claims queued rows and
+delivers them in batches over a single reused mail connection.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+MAX_ERROR_LENGTH = 2000
+
+
+def queue_email(subject, message, recipient_list, from_email=None):
+    """Stores an email for the outbox worker; blank recipients are dropped."""
+    recipients = [address for address in recipient_list if address]
+    if not recipients:
+        return None
+    return OutboundEmail.objects.create(
+        subject=subject[:255],
+        body=message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=recipients,
+    )
+
+
+def claim_emails(limit, lease_seconds):
+    """
+    Atomically marks up to ``limit`` deliverable emails as sending and returns them.
+
+    Emails whose lease expired (their worker died mid-batch) are deliverable
+    again. On PostgreSQL, concurrent workers skip each other's locked rows.
+    """
+    now = timezone.now()
+    deliverable = (
+        Q(status='queued', run_after__lte=now)
+        | Q(status='sending', locked_until__lt=now)
+    )
+    with transaction.atomic():
+        ids = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(deliverable)
+            .order_by('run_after', 'pk')
+            .values_list('pk', flat=True)[:limit]
+        )
+        OutboundEmail.objects.filter(pk__in=ids).update(
+            status='sending',
+            attempts=F('attempts') + 1,
+            locked_until=now + timedelta(seconds=lease_seconds),
+        )
+    return list(OutboundEmail.objects.filter(pk__in=ids).order_by('run_after', 'pk'))
+
+
+def build_message(email, connection):
+    return EmailMessage(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email or None,
+        to=email.recipients,
+        connection=connection,
+    )
+
+
+def mark_sent(email):
+    OutboundEmail.objects.filter(pk=email.pk).update(
+        status='sent', locked_until=None, last_error='', sent_at=timezone.now()
+    )
+
+
+def mark_failed(email, error, max_attempts, backoff_seconds):
+    """Schedules a retry with exponential backoff, or gives up after ``max_attempts``."""
+    now = timezone.now()
+    error = str(error)[:MAX_ERROR_LENGTH]
+    if email.attempts < max_attempts:
+        delay = backoff_seconds * 2 ** (email.attempts - 1)
+        OutboundEmail.objects.filter(pk=email.pk).update(
+            status='queued', locked_until=None, last_error=error,
+            run_after=now + timedelta(seconds=delay),
+        )
+    else:
+        OutboundEmail.objects.filter(pk=email.pk).update(
+            status='failed', locked_until=None, last_error=error,
+        )
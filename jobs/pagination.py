@@ -0,0 +1,176 @@
+"""
+Keyset (cursor) pagination for the job feed.
+
+Offset pagination runs ``COUNT(*)`` on every request and reads and throws
+away ``OFFSET`` rows for deep pages. ``CursorPaginator`` instead remembers
+the ``(created_at, id)`` of the last row shown and asks for the rows right
+after it, so every page costs the same index range read as the first.
+
+Pages expose the parts of Django's ``Page`` API that templates use
+(``has_next``, ``has_previous``, ``number``, ``paginator.count``) plus the
+opaque ``next_cursor`` / ``previous_cursor`` tokens.
+
+Both paginators here take the total from a ``count`` callable returning
+``(count, is_estimate)``, such as jobs.counts.feed_count, instead of running
+``COUNT(*)`` themselves.
+"""
+import base64
+import json
+
+from django.core.paginator import InvalidPage, PageNotAnInteger, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+
+def encode_cursor(created_at, pk, direction, number):
+    payload = json.dumps([created_at.isoformat(), pk, direction, number], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Returns (created_at, pk, direction, number), or None for a missing or garbled token."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        created_at, pk, direction, number = json.loads(raw)
+        created_at = parse_datetime(created_at)
+        if created_at is None or direction not in ('next', 'prev'):
+            return None
+        return created_at, int(pk), direction, max(1, int(number))
+    except (ValueError, TypeError):
+        return None
+
+
+class CountedPaginator(Paginator):
+    """
+    Django's offset Paginator with the total supplied by ``count``. As the
+    total may be an estimate, page numbers past its end are not rejected;
+    they just come back empty.
+    """
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._count_func = count
+
+    @cached_property
+    def _counted(self):
+        return self._count_func()
+
+    @cached_property
+    def count(self):
+        return self._counted[0]
+
+    @property
+    def count_is_estimate(self):
+        return self._counted[1]
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise InvalidPage('That page number is less than 1')
+        return number
+
+    def page(self, number):
+        # Slice without clamping to the (possibly estimated) total
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(self.object_list[bottom:bottom + self.per_page], number, self)
+
+
+class CursorPage:
+    def __init__(self, object_list, paginator, number, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.number = number
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Pages a queryset newest first on (created_at, id). The queryset's own
+    ordering is replaced; filters, select_related etc. are kept.
+    """
+
+    def __init__(self, queryset, per_page, count=None):
+        self.queryset = queryset
+        self.per_page = per_page
+        self._count_func = count or (lambda: (queryset.count(), False))
+
+    @cached_property
+    def _counted(self):
+        return self._count_func()
+
+    @property
+    def count(self):
+        return self._counted[0]
+
+    @property
+    def count_is_estimate(self):
+        return self._counted[1]
+
+    def keyset_queryset(self, created_at, pk, direction):
+        """Rows after ('next') or before ('prev') the given row, nearest first."""
+        # (created_at, id) < (c, i), spelled out so the created_at range can use the index
+        if direction == 'next':
+            return (
+                self.queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+                .filter(created_at__lte=created_at)
+                .order_by('-created_at', '-id')
+            )
+        return (
+            self.queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+            .filter(created_at__gte=created_at)
+            .order_by('created_at', 'id')
+        )
+
+    def page(self, cursor=None):
+        position = decode_cursor(cursor)
+        if position is None:
+            rows = list(self.queryset.order_by('-created_at', '-id')[:self.per_page + 1])
+            more, number, direction = len(rows) > self.per_page, 1, 'next'
+        else:
+            created_at, pk, direction, number = position
+            rows = list(self.keyset_queryset(created_at, pk, direction)[:self.per_page + 1])
+            more = len(rows) > self.per_page
+
+        rows = rows[:self.per_page]
+        if position is None:
+            has_prev, has_next = False, more
+        elif direction == 'next':
+            # The cursor row itself comes before this page
+            has_prev, has_next = True, more
+        else:
+            rows.reverse()
+            has_prev, has_next = more, True
+            if not has_prev:
+                number = 1
+
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            last = rows[-1]
+            next_cursor = encode_cursor(last.created_at, last.pk, 'next', number + 1)
+        if rows and has_prev:
+            first = rows[0]
+            previous_cursor = encode_cursor(first.created_at, first.pk, 'prev', number - 1)
+        return CursorPage(rows, self, number, next_cursor, previous_cursor)
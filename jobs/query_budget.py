@@ -0,0 +1,55 @@
+"""
+Query budget assertions for view tests.
+
+``QueryBudgetMixin`` adds two assertions to a TestCase:
+
+* ``assertQueryBudget(budget, url)`` fails when rendering ``url`` issues more
+  than ``budget`` queries, listing the SQL that ran.
+* ``assertConstantQueries(url, grow)`` renders ``url``, calls ``grow()`` to
+  add rows, renders again and fails if the query count went up, which is how
+  an N+1 (one query per listed row) shows itself.
+"""
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def count_queries(func, *args, **kwargs):
+    """Calls ``func`` and returns ``(result, captured_queries)``."""
+    with CaptureQueriesContext(connection) as ctx:
+        result = func(*args, **kwargs)
+        # Lazy responses (e.g. TemplateResponse) only query once rendered
+        if hasattr(result, 'render') and not getattr(result, 'is_rendered', True):
+            result.render()
+    return result, ctx.captured_queries
+
+
+def format_queries(queries):
+    return '\n'.join(f"{n}. {query['sql']}" for n, query in enumerate(queries, 1))
+
+
+class QueryBudgetMixin:
+    """Mix into a django.test.TestCase; requests go through ``self.client``."""
+
+    def fetch(self, url, data=None):
+        response, queries = count_queries(self.client.get, url, data or {})
+        self.assertLess(response.status_code, 400, f'GET {url} returned {response.status_code}')
+        return queries
+
+    def assertQueryBudget(self, budget, url, data=None):
+        queries = self.fetch(url, data)
+        self.assertLessEqual(
+            len(queries), budget,
+            f'GET {url} ran {len(queries)} queries, budget is {budget}:\n{format_queries(queries)}',
+        )
+        return queries
+
+    def assertConstantQueries(self, url, grow, data=None):
+        before = self.fetch(url, data)
+        grow()
+        after = self.fetch(url, data)
+        self.assertEqual(
+            len(after), len(before),
+            f'GET {url} went from {len(before)} to {len(after)} queries as rows were added '
+            f'(N+1?):\n{format_queries(after)}',
+        )
+        return after
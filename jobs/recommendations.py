@@ -0,0 +1,418 @@
+"""
+"Recommended jobs for you": nearest-neighbour search over job embeddings.
+
+Every active job is embedded as a dense ``DIMENSIONS``-wide float32 vector:
+its title and description tokens are hashed into signed buckets (the
+hashing trick, so no vocabulary is kept), log-scaled and L2-normalized,
+making the dot product of two vectors their cosine similarity. A seeker is
+embedded the same way from the jobs they applied to and their latest
+parsed resume.
+
+The vectors are stored in a file under ``settings.RECOMMENDATIONS_INDEX_DIR``
+that every worker maps read-only with ``numpy.memmap``, so the page cache
+holds one copy for all of them. Next to it are the job id of each row and,
+for indexes over ``RECOMMENDATIONS_EXACT_MAX`` rows, an IVF (inverted file)
+clustering: rows are grouped around k-means centroids and a query scans
+only the ``RECOMMENDATIONS_NPROBE`` groups nearest to it. Smaller indexes
+are searched exactly, with one matrix-vector product over all rows.
+
+Job signals overwrite or append rows in place; removed jobs leave a
+tombstone row (job id 0) until the next full rebuild
+(``manage.py rebuild_recommendations``), which also re-clusters. A small
+JSON manifest names the current files; workers ``stat()`` it per query and
+remap when another process changed the index.
+
+Recommendations need NumPy; without it ``available()`` is False and the
+signals and views skip them.
+"""
+import json
+import math
+import os
+import tempfile
+import threading
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from .autocomplete import _FileLock
+from .search import tokenize
+
+try:
+    import numpy as np
+except ImportError:  # Optional: recommendations are disabled without it
+    np = None
+
+DIMENSIONS = 256
+TITLE_WEIGHT = 2.0
+
+# Too common in postings and resumes to say anything about a job
+STOP_WORDS = frozenset(
+    'a an and are as at be by for from has have in is it its of on or our that the their this to we will '
+    'with you your'.split()
+)
+
+# Rows reserved past the current size, so appends rarely need a new file
+_MIN_CAPACITY = 1024
+_KMEANS_ITERATIONS = 10
+_KMEANS_SAMPLE = 50000
+_CHUNK_ROWS = 65536
+
+
+def available():
+    return np is not None
+
+
+def embed(fields):
+    """
+    Embeds weighted text.
+    Args:
+        fields: (text, weight) pairs.
+    Returns:
+        numpy.ndarray: A unit-length float32 vector, or all zeros for text
+        without any meaningful token.
+    """
+    counts = Counter()
+    for text, weight in fields:
+        for token in tokenize(text):
+            if token not in STOP_WORDS:
+                counts[token] += weight
+    vector = np.zeros(DIMENSIONS, dtype=np.float32)
+    if not counts:
+        return vector
+    hashes = np.fromiter((zlib.crc32(token.encode()) for token in counts), dtype=np.uint32, count=len(counts))
+    # The bit above the bucket picks the sign, so collisions tend to cancel out
+    signs = np.where(hashes & DIMENSIONS, -1.0, 1.0)
+    weights = np.fromiter((1 + math.log(n) for n in counts.values()), dtype=np.float64, count=len(counts))
+    np.add.at(vector, hashes % DIMENSIONS, (signs * weights).astype(np.float32))
+    return _normalize(vector)
+
+
+def embed_job(job):
+    return embed([(job.title, TITLE_WEIGHT), (job.description, 1.0)])
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def kmeans(vectors, clusters, seed=0):
+    """Spherical k-means (Lloyd's iterations) on a sample; returns unit-length centroids."""
+    rng = np.random.default_rng(seed)
+    if len(vectors) > _KMEANS_SAMPLE:
+        vectors = vectors[rng.choice(len(vectors), _KMEANS_SAMPLE, replace=False)]
+    centroids = np.array(vectors[rng.choice(len(vectors), clusters, replace=False)])
+    for _ in range(_KMEANS_ITERATIONS):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        # An emptied cluster keeps its old centroid
+        filled = np.bincount(assignment, minlength=clusters) > 0
+        centroids[filled] = _normalize(sums[filled])
+    return centroids
+
+
+class RecommendationIndex:
+    """
+    The job vectors of one index directory, mapped from disk. Files are
+    named after a generation number, bumped by every rebuild or resize.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, 'manifest.json')
+        self.manifest = None
+        self._manifest_mtime = None
+        self._lock = threading.RLock()
+        self._exclusive_held = False
+
+    # Queries
+
+    def search(self, vector, k=10, exclude=()):
+        """
+        Returns up to ``k`` (job id, cosine similarity) pairs nearest to
+        ``vector``, best first, leaving out job ids in ``exclude``.
+        """
+        self._refresh()
+        with self._lock:
+            rows = self.manifest['rows']
+            if self.centroids is None:
+                # Exact: one product straight over the mapped rows, without copying them
+                ids, scores = self.ids[:rows], self.vectors[:rows] @ vector
+            else:
+                candidates = self._probe(vector)
+                ids, scores = self.ids[candidates], self.vectors[candidates] @ vector
+            keep = ids != 0
+            if exclude:
+                keep &= ~np.isin(ids, np.fromiter(exclude, dtype=np.int64))
+            ids, scores = ids[keep], scores[keep]
+            if len(ids) > k:
+                top = np.argpartition(-scores, k - 1)[:k]
+                ids, scores = ids[top], scores[top]
+            order = np.argsort(-scores, kind='stable')
+            return [(int(ids[i]), float(scores[i])) for i in order]
+
+    def _probe(self, vector):
+        """Row numbers in the clusters nearest to ``vector``."""
+        nprobe = min(getattr(settings, 'RECOMMENDATIONS_NPROBE', 8), len(self.centroids))
+        probes = np.argpartition(-(self.centroids @ vector), nprobe - 1)[:nprobe]
+        return np.concatenate([self.members[self.bounds[c]:self.bounds[c + 1]] for c in probes])
+
+    def __len__(self):
+        self._refresh()
+        return len(self.row_of)
+
+    # Updates
+
+    def update_job(self, job):
+        vector = embed_job(job) if job.is_active else None
+        self._update(job.pk, vector)
+
+    def remove_job(self, job_id):
+        self._update(job_id, None)
+
+    def rebuild(self):
+        """Embeds every active job from the database into a new generation of files."""
+        from .models import Job
+
+        with self._exclusive():
+            rows = Job.objects.filter(is_active=True).values_list('pk', 'title', 'description')
+            ids, vectors = [], []
+            for pk, title, description in rows.iterator(chunk_size=2000):
+                ids.append(pk)
+                vectors.append(embed([(title, TITLE_WEIGHT), (description, 1.0)]))
+            self._write_generation(
+                np.array(ids, dtype=np.int64),
+                np.array(vectors, dtype=np.float32).reshape(len(ids), DIMENSIONS),
+            )
+        return len(ids)
+
+    def _update(self, job_id, vector):
+        with self._exclusive():
+            self._refresh()
+            row = self.row_of.get(job_id)
+            if row is None and vector is None:
+                return
+            if row is None:
+                if self.manifest['rows'] == self.manifest['capacity']:
+                    # Out of room: copy the live rows into a larger generation, then append to it
+                    live = np.flatnonzero(self.ids[:self.manifest['rows']])
+                    self._write_generation(np.array(self.ids[live]), np.array(self.vectors[live]),
+                                           centroids=self.centroids, clusters=np.array(self.clusters[live]))
+                row = self.manifest['rows']
+            stored_id = job_id
+            if vector is None:
+                stored_id, vector = 0, np.zeros(DIMENSIONS, dtype=np.float32)
+            cluster = int(np.argmax(self.centroids @ vector)) if self.centroids is not None else -1
+
+            generation = self.manifest['generation']
+            self._write_row(f'ids-{generation}.i64', row, np.int64(stored_id).tobytes())
+            self._write_row(f'vectors-{generation}.f32', row, vector.astype(np.float32).tobytes())
+            self._write_row(f'clusters-{generation}.i32', row, np.int32(cluster).tobytes())
+            rows = max(self.manifest['rows'], row + 1)
+            self._write_manifest({**self.manifest, 'rows': rows, 'version': self.manifest['version'] + 1})
+
+            # The maps already cover the whole capacity; only the bookkeeping changes
+            if stored_id:
+                self.row_of[job_id] = row
+            else:
+                self.row_of.pop(job_id, None)
+            if self.centroids is not None:
+                self._group_clusters()
+
+    def _write_row(self, name, row, data):
+        # Plain writes land in the same page cache the workers' read-only maps see
+        with open(os.path.join(self.directory, name), 'r+b') as f:
+            f.seek(row * len(data))
+            f.write(data)
+
+    def _write_generation(self, ids, vectors, centroids=None, clusters=None):
+        """Writes ``vectors`` to new files (clustering them when large) and points the manifest at them."""
+        rows = len(ids)
+        capacity = max(_MIN_CAPACITY, rows * 2)
+        if centroids is None and rows > getattr(settings, 'RECOMMENDATIONS_EXACT_MAX', 20000):
+            centroids, clusters = kmeans(vectors, min(1024, int(math.sqrt(rows)))), None
+        if centroids is not None and clusters is None:
+            clusters = np.concatenate([
+                np.argmax(vectors[start:start + _CHUNK_ROWS] @ centroids.T, axis=1)
+                for start in range(0, rows, _CHUNK_ROWS)
+            ] or [np.zeros(0, dtype=np.int64)])
+        if clusters is None:
+            clusters = np.full(rows, -1)
+
+        previous = self.manifest['generation'] if self._read_manifest() else 0
+        generation = previous + 1
+        os.makedirs(self.directory, exist_ok=True)
+        for name, dtype, data, shape in (
+            (f'ids-{generation}.i64', np.int64, ids, (capacity,)),
+            (f'vectors-{generation}.f32', np.float32, vectors, (capacity, DIMENSIONS)),
+            (f'clusters-{generation}.i32', np.int32, clusters, (capacity,)),
+        ):
+            out = np.memmap(os.path.join(self.directory, name), dtype=dtype, mode='w+', shape=shape)
+            out[:rows] = data
+            out.flush()
+            del out
+        if centroids is not None:
+            np.save(os.path.join(self.directory, f'centroids-{generation}.npy'), centroids.astype(np.float32))
+
+        self._write_manifest({
+            'generation': generation, 'version': 0, 'rows': rows, 'capacity': capacity,
+            'dimensions': DIMENSIONS, 'clustered': centroids is not None,
+        })
+        self._remove_generation(previous)
+        self._load(self.manifest)
+
+    def _remove_generation(self, generation):
+        # Workers still mapping the old files keep them alive until they remap
+        for name in (f'ids-{generation}.i64', f'vectors-{generation}.f32', f'clusters-{generation}.i32',
+                     f'centroids-{generation}.npy'):
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    # Manifest and file mapping
+
+    def _stat_mtime(self):
+        try:
+            return os.stat(self.manifest_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _refresh(self):
+        """Maps the index on first use and remaps it when another worker changed the manifest."""
+        mtime = self._stat_mtime()
+        if self.manifest is not None and mtime == self._manifest_mtime:
+            return
+        with self._lock:
+            if self._read_manifest() and self.manifest.get('dimensions') == DIMENSIONS:
+                try:
+                    self._load(self.manifest)
+                    return
+                except (OSError, ValueError):
+                    pass
+            self.rebuild()
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                mtime = os.fstat(f.fileno()).st_mtime_ns
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return False
+        self.manifest, self._manifest_mtime = manifest, mtime
+        return True
+
+    def _write_manifest(self, manifest):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+        self.manifest, self._manifest_mtime = manifest, self._stat_mtime()
+
+    def _load(self, manifest):
+        generation, capacity, rows = manifest['generation'], manifest['capacity'], manifest['rows']
+
+        def mapped(name, dtype, shape):
+            return np.memmap(os.path.join(self.directory, name), dtype=dtype, mode='r', shape=shape)
+
+        self.ids = mapped(f'ids-{generation}.i64', np.int64, (capacity,))
+        self.vectors = mapped(f'vectors-{generation}.f32', np.float32, (capacity, DIMENSIONS))
+        self.clusters = mapped(f'clusters-{generation}.i32', np.int32, (capacity,))
+        live = np.flatnonzero(self.ids[:rows])
+        self.row_of = dict(zip(self.ids[live].tolist(), live.tolist()))
+
+        self.centroids = self.members = self.bounds = None
+        if manifest['clustered']:
+            self.centroids = np.load(os.path.join(self.directory, f'centroids-{generation}.npy'), mmap_mode='r')
+            self._group_clusters()
+
+    def _group_clusters(self):
+        # Row numbers grouped by cluster; cluster c's are members[bounds[c]:bounds[c + 1]]
+        clusters = self.clusters[:self.manifest['rows']]
+        self.members = np.argsort(clusters, kind='stable')
+        self.bounds = np.searchsorted(clusters[self.members], np.arange(len(self.centroids) + 1))
+
+    @contextmanager
+    def _exclusive(self):
+        """This worker's lock, then the lock shared with other processes; reentrant."""
+        with self._lock:
+            if self._exclusive_held:
+                yield
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            with _FileLock(os.path.join(self.directory, 'index.lock')):
+                self._exclusive_held = True
+                try:
+                    yield
+                finally:
+                    self._exclusive_held = False
+
+
+def seeker_profile(user, applications=20):
+    """
+    Embeds a seeker from the jobs of their latest ``applications`` and the
+    newest parsed resume among them.
+    Returns:
+        tuple: (unit vector or None when there is nothing to go on, ids of those jobs)
+    """
+    from .models import Application
+
+    recent = list(
+        Application.objects.filter(applicant=user).order_by('-applied_at')
+        .values_list('job_id', 'job__title', 'job__description', 'parsed_text')[:applications]
+    )
+    if not recent:
+        return None, []
+    profile = np.zeros(DIMENSIONS, dtype=np.float32)
+    for _, title, description, _ in recent:
+        profile += embed([(title, TITLE_WEIGHT), (description, 1.0)])
+    resume = next((text for *_, text in recent if text), '')
+    if resume:
+        # The resume counts as much as all the applied jobs together
+        profile = _normalize(profile) + embed([(resume, 1.0)])
+    if not profile.any():
+        return None, []
+    return _normalize(profile), [job_id for job_id, *_ in recent]
+
+
+def recommend_jobs(user, k=10):
+    """The ``k`` active jobs most similar to ``user``'s applications and resume, best first."""
+    from .models import Job
+
+    if not available():
+        return []
+    profile, applied = seeker_profile(user)
+    if profile is None:
+        return []
+    # Older applications are not in the profile query; ask for spares to filter them out
+    matches = get_index().search(profile, k=k * 2, exclude=applied)
+    scores = dict(matches)
+    jobs = (
+        Job.objects.filter(pk__in=scores, is_active=True).exclude(applications__applicant=user)
+        .select_related('employer', 'category')
+    )
+    ranked = sorted(jobs, key=lambda job: scores[job.pk], reverse=True)[:k]
+    for job in ranked:
+        job.similarity = scores[job.pk]
+    return ranked
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = RecommendationIndex(settings.RECOMMENDATIONS_INDEX_DIR)
+    return _index
+
+
+def reset_index():
+    global _index
+    _index = None
@@ -0,0 +1,118 @@
+"""
+Content-addressed cache of extracted resume text.
+
+Seekers upload the same PDF to many jobs, so extracted text is stored by the
+SHA-256 of the file bytes and a repeat upload skips pdfminer entirely. The
+table is bounded by entry count and total text size; the least recently used
+entries are evicted first. Checking the bounds counts and sums the whole
+table, so each process does it once every RESUME_TEXT_CACHE_EVICT_EVERY
+stores, and the table may briefly run over by that many entries per worker.
+"""
+import hashlib
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import F, Sum
+from django.db.models.functions import Length
+from django.utils import timezone
+
+from .models import ResumeTextCache
+
+_counters = {'hits': 0, 'misses': 0, 'stores': 0}
+_counters_lock = threading.Lock()
+
+
+def _count(name):
+    with _counters_lock:
+        _counters[name] += 1
+        return _counters[name]
+
+
+def file_sha256(f):
+    """Hashes a Django File/UploadedFile chunk by chunk and rewinds it."""
+    digest = hashlib.sha256()
+    for chunk in f.chunks():
+        digest.update(chunk)
+    f.seek(0)
+    return digest.hexdigest()
+
+
+def lookup(sha256):
+    """Returns the cache entry for ``sha256`` (recording a hit), or None."""
+    if not sha256:
+        return None
+    entry = ResumeTextCache.objects.filter(sha256=sha256).first()
+    if entry is None:
+        _count('misses')
+        return None
+    _count('hits')
+    ResumeTextCache.objects.filter(pk=entry.pk).update(
+        hits=F('hits') + 1, last_used_at=timezone.now()
+    )
+    return entry
+
+
+def store(sha256, text, size=0, file_name=''):
+    """Saves extracted text for ``sha256``; every few stores, evicts old entries if over budget."""
+    if not sha256:
+        return
+    defaults = {'text': text, 'size': size, 'last_used_at': timezone.now()}
+    if file_name:
+        defaults['file_name'] = file_name
+    try:
+        ResumeTextCache.objects.update_or_create(sha256=sha256, defaults=defaults)
+    except IntegrityError:
+        # Another worker stored the same file concurrently
+        return
+    if _count('stores') % max(1, settings.RESUME_TEXT_CACHE_EVICT_EVERY) == 0:
+        evict()
+
+
+def evict(max_entries=None, max_bytes=None):
+    """Deletes least recently used entries until both limits are met. Returns the number removed."""
+    if max_entries is None:
+        max_entries = settings.RESUME_TEXT_CACHE_MAX_ENTRIES
+    if max_bytes is None:
+        max_bytes = settings.RESUME_TEXT_CACHE_MAX_BYTES
+
+    removed = 0
+    total = ResumeTextCache.objects.count()
+    if total > max_entries:
+        stale = ResumeTextCache.objects.order_by('-last_used_at', '-pk').values_list('pk', flat=True)[max_entries:]
+        removed += ResumeTextCache.objects.filter(pk__in=list(stale)).delete()[0]
+
+    used = ResumeTextCache.objects.aggregate(total=Sum(Length('text')))['total'] or 0
+    if used > max_bytes:
+        doomed = []
+        rows = ResumeTextCache.objects.annotate(length=Length('text')).order_by('last_used_at', 'pk')
+        for pk, length in rows.values_list('pk', 'length').iterator():
+            if used <= max_bytes:
+                break
+            doomed.append(pk)
+            used -= length
+        removed += ResumeTextCache.objects.filter(pk__in=doomed).delete()[0]
+    return removed
+
+
+def stats():
+    """Hit/miss counters for this process plus totals for the whole cache table."""
+    totals = ResumeTextCache.objects.aggregate(
+        total_hits=Sum('hits'), total_bytes=Sum(Length('text'))
+    )
+    with _counters_lock:
+        hits, misses = _counters['hits'], _counters['misses']
+    lookups = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / lookups if lookups else 0.0,
+        'entries': ResumeTextCache.objects.count(),
+        'total_hits': totals['total_hits'] or 0,
+        'total_bytes': totals['total_bytes'] or 0,
+    }
+
+
+def reset_counters():
+    with _counters_lock:
+        _counters.update(hits=0, misses=0, stores=0)
@@ -0,0 +1,528 @@
+"""
+Full-text search over job postings.
+
+Jobs are indexed on title, company name, location and description. The
+storage depends on the database:
+
+* PostgreSQL: a ``tsvector`` side table with a GIN index, ranked with
+  ``ts_rank_cd``.
+* SQLite: an FTS5 virtual table, ranked with the built-in ``bm25()``.
+* Anything else (or ``SEARCH_BACKEND = 'memory'``): a pure-Python inverted
+  index held in process memory, ranked with BM25.
+
+The side tables are created by migration ``0003_job_search_index`` and kept
+up to date by the signal handlers in ``jobs.signals``.
+"""
+import math
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+SEARCH_TABLE = 'jobs_job_search'
+
+# Relative importance of each indexed field, in index column order.
+FIELD_WEIGHTS = {
+    'title': 10.0,
+    'company': 5.0,
+    'location': 2.0,
+    'description': 1.0,
+}
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Keep the IN (...) lists well under SQLite's bound-variable limit.
+_IN_CHUNK_SIZE = 500
+
+
+def tokenize(text):
+    """Lower-cases and splits text into word tokens."""
+    if not text:
+        return []
+    return _TOKEN_RE.findall(text.lower())
+
+
+def job_document(job):
+    """Returns the indexed fields of a job as a dict keyed like FIELD_WEIGHTS."""
+    return {
+        'title': job.title or '',
+        'company': job.employer.company_name or '',
+        'location': job.location or '',
+        'description': job.description or '',
+    }
+
+
+class SearchResults:
+    """
+    Ranked search hits that behave enough like a QuerySet for Django's
+    Paginator: ``count()`` for the total and slicing for a page of Jobs.
+    Only the requested page of Job rows is ever loaded.
+    """
+    ordered = True
+
+    def __init__(self, backend, tokens, queryset):
+        self.backend = backend
+        self.tokens = tokens
+        self.queryset = queryset
+        self.model = queryset.model
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            self._count = self.backend.count(self.tokens, self.queryset)
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def ranked_ids(self, offset, limit):
+        return self.backend.ranked_ids(self.tokens, self.queryset, offset, limit)
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            offset = k.start or 0
+            limit = None if k.stop is None else max(k.stop - offset, 0)
+        else:
+            offset, limit = k, 1
+        ids = self.ranked_ids(offset, limit)
+        jobs = self.queryset.select_related('employer', 'category').in_bulk(ids)
+        results = [jobs[pk] for pk in ids if pk in jobs]
+        if isinstance(k, slice):
+            return results
+        if not results:
+            raise IndexError('search result index out of range')
+        return results[0]
+
+    def __iter__(self):
+        return iter(self[:])
+
+
+class BaseSearchBackend:
+    """Interface shared by all search backends."""
+
+    def index_job(self, job):
+        raise NotImplementedError
+
+    def remove_job(self, job_id):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def count(self, tokens, queryset):
+        raise NotImplementedError
+
+    def ranked_ids(self, tokens, queryset, offset, limit):
+        raise NotImplementedError
+
+    def filter(self, tokens, queryset):
+        """Narrows ``queryset`` to the jobs matching ``tokens``, unranked (e.g. for facet counts)."""
+        raise NotImplementedError
+
+    def rebuild(self, jobs):
+        """Re-indexes every job in ``jobs``. Returns the number indexed."""
+        self.clear()
+        count = 0
+        for job in jobs:
+            self.index_job(job)
+            count += 1
+        return count
+
+    def search(self, query, queryset):
+        """Returns a lazy SearchResults for ``query`` restricted to ``queryset``."""
+        return SearchResults(self, tokenize(query), queryset)
+
+    @staticmethod
+    def _subquery(queryset):
+        return queryset.order_by().values('pk').query.sql_with_params()
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """Native PostgreSQL full-text search over a GIN-indexed tsvector table."""
+
+    DOCUMENT_SQL = (
+        "setweight(to_tsvector('english', %s), 'A') || "
+        "setweight(to_tsvector('english', %s), 'B') || "
+        "setweight(to_tsvector('english', %s), 'C') || "
+        "setweight(to_tsvector('english', %s), 'D')"
+    )
+
+    @staticmethod
+    def build_query(tokens):
+        # AND every token; the last one is a prefix so partial words still match.
+        terms = list(tokens[:-1]) + [tokens[-1] + ':*']
+        return ' & '.join(terms)
+
+    def index_job(self, job):
+        doc = job_document(job)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (job_id, document) VALUES (%s, {self.DOCUMENT_SQL}) "
+                f"ON CONFLICT (job_id) DO UPDATE SET document = EXCLUDED.document",
+                [job.pk, doc['title'], doc['company'], doc['location'], doc['description']],
+            )
+
+    def remove_job(self, job_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE job_id = %s", [job_id])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {SEARCH_TABLE}")
+
+    def count(self, tokens, queryset):
+        if not tokens:
+            return 0
+        sub_sql, sub_params = self._subquery(queryset)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT COUNT(*) FROM {SEARCH_TABLE} "
+                f"WHERE document @@ to_tsquery('english', %s) AND job_id IN ({sub_sql})",
+                [self.build_query(tokens), *sub_params],
+            )
+            return cursor.fetchone()[0]
+
+    def ranked_ids(self, tokens, queryset, offset, limit):
+        if not tokens or limit == 0:
+            return []
+        tsquery = self.build_query(tokens)
+        sub_sql, sub_params = self._subquery(queryset)
+        sql = (
+            f"SELECT job_id FROM {SEARCH_TABLE} "
+            f"WHERE document @@ to_tsquery('english', %s) AND job_id IN ({sub_sql}) "
+            f"ORDER BY ts_rank_cd(document, to_tsquery('english', %s), 32) DESC, job_id DESC"
+        )
+        params = [tsquery, *sub_params, tsquery]
+        if limit is not None:
+            sql += " LIMIT %s"
+            params.append(limit)
+        sql += " OFFSET %s"
+        params.append(offset)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
+
+    def filter(self, tokens, queryset):
+        if not tokens:
+            return queryset.none()
+        return queryset.filter(pk__in=RawSQL(
+            f"SELECT job_id FROM {SEARCH_TABLE} WHERE document @@ to_tsquery('english', %s)",
+            [self.build_query(tokens)],
+        ))
+
+
+class SQLiteFTSSearchBackend(BaseSearchBackend):
+    """SQLite FTS5 virtual table ranked with the built-in bm25() function."""
+
+    @staticmethod
+    def build_query(tokens):
+        phrases = [f'"{token}"' for token in tokens]
+        phrases[-1] += '*'
+        return ' '.join(phrases)
+
+    @property
+    def rank_sql(self):
+        weights = ', '.join(str(w) for w in FIELD_WEIGHTS.values())
+        return f"bm25({SEARCH_TABLE}, {weights})"
+
+    def index_job(self, job):
+        doc = job_document(job)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [job.pk])
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (rowid, title, company, location, description) "
+                f"VALUES (%s, %s, %s, %s, %s)",
+                [job.pk, doc['title'], doc['company'], doc['location'], doc['description']],
+            )
+
+    def remove_job(self, job_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [job_id])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+
+    def count(self, tokens, queryset):
+        if not tokens:
+            return 0
+        sub_sql, sub_params = self._subquery(queryset)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT COUNT(*) FROM {SEARCH_TABLE} "
+                f"WHERE {SEARCH_TABLE} MATCH %s AND rowid IN ({sub_sql})",
+                [self.build_query(tokens), *sub_params],
+            )
+            return cursor.fetchone()[0]
+
+    def ranked_ids(self, tokens, queryset, offset, limit):
+        if not tokens or limit == 0:
+            return []
+        sub_sql, sub_params = self._subquery(queryset)
+        sql = (
+            f"SELECT rowid FROM {SEARCH_TABLE} "
+            f"WHERE {SEARCH_TABLE} MATCH %s AND rowid IN ({sub_sql}) "
+            f"ORDER BY {self.rank_sql}, rowid DESC LIMIT %s OFFSET %s"
+        )
+        # SQLite needs a LIMIT clause before OFFSET; -1 means unbounded.
+        params = [self.build_query(tokens), *sub_params, -1 if limit is None else limit, offset]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
+
+    def filter(self, tokens, queryset):
+        if not tokens:
+            return queryset.none()
+        return queryset.filter(pk__in=RawSQL(
+            f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s", [self.build_query(tokens)],
+        ))
+
+
+class InvertedIndex:
+    """
+    In-memory inverted index with BM25 scoring.
+
+    Postings map each term to ``{job_id: weighted term frequency}``, where a
+    term's frequency is scaled by the weight of the field it appeared in.
+    """
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self.postings = defaultdict(dict)
+        self.doc_lengths = {}
+        self.doc_terms = {}
+        self.total_length = 0.0
+        self._sorted_terms = None
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    def add(self, doc_id, fields):
+        self.remove(doc_id)
+        frequencies = defaultdict(float)
+        for field, text in fields.items():
+            weight = FIELD_WEIGHTS.get(field, 1.0)
+            for token in tokenize(text):
+                frequencies[token] += weight
+        length = sum(frequencies.values())
+        for term, tf in frequencies.items():
+            if term not in self.postings:
+                self._sorted_terms = None
+            self.postings[term][doc_id] = tf
+        self.doc_lengths[doc_id] = length
+        self.doc_terms[doc_id] = tuple(frequencies)
+        self.total_length += length
+
+    def remove(self, doc_id):
+        terms = self.doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            posting = self.postings[term]
+            posting.pop(doc_id, None)
+            if not posting:
+                del self.postings[term]
+                self._sorted_terms = None
+        self.total_length -= self.doc_lengths.pop(doc_id)
+
+    def clear(self):
+        self.__init__()
+
+    def expand_prefix(self, prefix):
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self.postings)
+        terms = self._sorted_terms
+        start = bisect_left(terms, prefix)
+        end = start
+        while end < len(terms) and terms[end].startswith(prefix):
+            end += 1
+        return terms[start:end]
+
+    def search(self, tokens):
+        """Returns ``[(doc_id, score)]`` for docs matching every token, best first."""
+        if not tokens or not self.doc_lengths:
+            return []
+        # The last token matches as a prefix, the rest must match exactly.
+        groups = [[token] for token in tokens[:-1]]
+        groups.append(self.expand_prefix(tokens[-1]))
+
+        n_docs = len(self.doc_lengths)
+        avg_length = self.total_length / n_docs
+        scores = None
+        for terms in groups:
+            group_scores = defaultdict(float)
+            for term in terms:
+                posting = self.postings.get(term)
+                if not posting:
+                    continue
+                df = len(posting)
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                for doc_id, tf in posting.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                    group_scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+            if scores is None:
+                scores = group_scores
+            else:
+                scores = {doc_id: score + group_scores[doc_id]
+                          for doc_id, score in scores.items() if doc_id in group_scores}
+            if not scores:
+                return []
+        return sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+
+
+class MemorySearchResults(SearchResults):
+    """
+    SearchResults for the in-memory index: the ranked, filtered hit list is
+    computed once and shared by ``count()`` and every page slice.
+    """
+
+    def __init__(self, backend, tokens, queryset):
+        super().__init__(backend, tokens, queryset)
+        self._hits = None
+
+    def hits(self):
+        if self._hits is None:
+            self._hits = self.backend.filtered_hits(self.tokens, self.queryset)
+        return self._hits
+
+    def count(self):
+        return len(self.hits())
+
+    def ranked_ids(self, offset, limit):
+        return self.hits()[offset:None if limit is None else offset + limit]
+
+
+class MemorySearchBackend(BaseSearchBackend):
+    """
+    Pure-Python fallback for databases without native full-text search.
+
+    The index lives in the worker process; it is built from the database on
+    first use and then kept current by the Job signal handlers. Those
+    handlers only reach the process that saved the job, so this backend is
+    meant for single-process deployments (runserver, tests, one worker);
+    with several workers each index drifts until the process restarts.
+    """
+
+    def __init__(self):
+        self.index = InvertedIndex()
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            from .models import Job
+            jobs = Job.objects.select_related('employer').only(
+                'title', 'location', 'description', 'employer__company_name',
+            )
+            for job in jobs.iterator(chunk_size=2000):
+                self.index.add(job.pk, job_document(job))
+            self._loaded = True
+
+    def index_job(self, job):
+        with self._lock:
+            if self._loaded:
+                self.index.add(job.pk, job_document(job))
+
+    def remove_job(self, job_id):
+        with self._lock:
+            self.index.remove(job_id)
+
+    def clear(self):
+        with self._lock:
+            self.index.clear()
+            self._loaded = True
+
+    def search(self, query, queryset):
+        return MemorySearchResults(self, tokenize(query), queryset)
+
+    def filtered_hits(self, tokens, queryset):
+        """
+        Returns the ids matching ``tokens`` that are also in ``queryset``,
+        best first. Costs a single query: a ``pk IN (...)`` filter for small
+        hit lists, otherwise the queryset's pks intersected in Python.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            hits = self.index.search(tokens)
+        ids = [doc_id for doc_id, _ in hits]
+        if not ids:
+            return []
+        if len(ids) <= _IN_CHUNK_SIZE:
+            allowed = queryset.filter(pk__in=ids)
+        else:
+            allowed = queryset
+        allowed = set(allowed.order_by().values_list('pk', flat=True).iterator())
+        return [doc_id for doc_id in ids if doc_id in allowed]
+
+    def count(self, tokens, queryset):
+        return len(self.filtered_hits(tokens, queryset))
+
+    def ranked_ids(self, tokens, queryset, offset, limit):
+        ids = self.filtered_hits(tokens, queryset)
+        return ids[offset:None if limit is None else offset + limit]
+
+    def filter(self, tokens, queryset):
+        self._ensure_loaded()
+        with self._lock:
+            ids = [doc_id for doc_id, _ in self.index.search(tokens)]
+        return queryset.filter(pk__in=ids)
+
+
+def search_table_exists():
+    return SEARCH_TABLE in connection.introspection.table_names()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """
+    Returns the configured search backend (``settings.SEARCH_BACKEND``).
+
+    ``'auto'`` picks PostgreSQL or SQLite FTS5 when the side table exists and
+    falls back to the in-memory index otherwise.
+    """
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _create_backend(getattr(settings, 'SEARCH_BACKEND', 'auto'))
+    return _backend
+
+
+def _create_backend(name):
+    if name == 'postgresql':
+        return PostgresSearchBackend()
+    if name == 'sqlite':
+        return SQLiteFTSSearchBackend()
+    if name == 'memory':
+        return MemorySearchBackend()
+    if name != 'auto':
+        raise ValueError(f"Unknown SEARCH_BACKEND: {name!r}")
+    if search_table_exists():
+        if connection.vendor == 'postgresql':
+            return PostgresSearchBackend()
+        if connection.vendor == 'sqlite':
+            return SQLiteFTSSearchBackend()
+    return MemorySearchBackend()
+
+
+def reset_backend():
+    """Drops the cached backend so the next call re-reads settings."""
+    global _backend
+    _backend = None
+
+
+def search_jobs(query, queryset):
+    """Ranks the jobs in ``queryset`` against ``query``, best match first."""
+    return get_backend().search(query, queryset)
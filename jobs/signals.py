@@ -0,0 +1,153 @@
+"""
+Model signal handlers that keep derived job data in sync with the database.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Application, Job, User
+from . import autocomplete, bitmaps, counters, counts, facets, matching, minhash, recommendations, search
+
+
+@receiver(post_save, sender=Job)
+def index_job_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    search.get_backend().index_job(instance)
+
+
+@receiver(post_delete, sender=Job)
+def unindex_job_on_delete(sender, instance, **kwargs):
+    search.get_backend().remove_job(instance.pk)
+
+
+@receiver(post_save, sender=Job)
+def update_autocomplete_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(lambda: autocomplete.get_service().update_job(instance))
+
+
+@receiver(post_delete, sender=Job)
+def update_autocomplete_on_delete(sender, instance, **kwargs):
+    job_id = instance.pk
+    transaction.on_commit(lambda: autocomplete.get_service().remove_job(job_id))
+
+
+@receiver(post_save, sender=Job)
+def update_minhash_signature(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Part of the job's own transaction; bands of deleted jobs go with them (CASCADE)
+    if raw or (update_fields is not None and 'description' not in update_fields):
+        return
+    minhash.update_job(instance)
+
+
+@receiver(post_save, sender=Job)
+def update_recommendations_on_save(sender, instance, raw=False, **kwargs):
+    if raw or not recommendations.available():
+        return
+    transaction.on_commit(lambda: recommendations.get_index().update_job(instance))
+
+
+@receiver(post_delete, sender=Job)
+def update_recommendations_on_delete(sender, instance, **kwargs):
+    if not recommendations.available():
+        return
+    job_id = instance.pk
+    transaction.on_commit(lambda: recommendations.get_index().remove_job(job_id))
+
+
+def _bump_feed_generation(job_id, update_index):
+    # After the commit: the generation row is not held locked for the whole Job
+    # transaction, and rolled-back changes do not invalidate anything
+    generation = counts.invalidate(job_id)
+    index = bitmaps.get_index(refresh=False)
+    if index is not None:
+        update_index(index, generation)
+
+
+@receiver(post_save, sender=Job)
+def invalidate_feed_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(lambda: _bump_feed_generation(
+        instance.pk, lambda index, generation: index.update_job(instance, generation)))
+
+
+@receiver(post_delete, sender=Job)
+def invalidate_feed_on_delete(sender, instance, **kwargs):
+    job_id = instance.pk
+    transaction.on_commit(lambda: _bump_feed_generation(
+        job_id, lambda index, generation: index.remove_job(job_id, generation)))
+
+
+@receiver(pre_save, sender=Job)
+def remember_counted_state(sender, instance, raw=False, **kwargs):
+    instance._previous_counted_state = None
+    if raw or instance._state.adding:
+        return
+    # One read for the job counters and the facet counts. Job.save has opened a
+    # transaction; locking the row until it commits keeps a concurrent save of
+    # the same job from computing its deltas against the same old state
+    instance._previous_counted_state = (
+        sender.objects.select_for_update().filter(pk=instance.pk)
+        .values('employer', *facets.STATE_FIELDS).first()
+    )
+
+
+@receiver(post_save, sender=Job)
+def update_job_counters_on_save(sender, instance, raw=False, **kwargs):
+    # Job.save runs inside a transaction, so counters and job commit together
+    if raw:
+        return
+    counters.apply_job_change(getattr(instance, '_previous_counted_state', None), counters.job_state(instance))
+
+
+@receiver(post_delete, sender=Job)
+def update_job_counters_on_delete(sender, instance, **kwargs):
+    # Sent inside the deletion's transaction, also for cascades and bulk deletes
+    counters.apply_job_change(counters.job_state(instance), None)
+
+
+@receiver(post_save, sender=Job)
+def update_facet_counts_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_counted_state', None)
+    facets.apply_job_change(facets.facet_key(previous), facets.facet_key(facets.job_state(instance)))
+
+
+@receiver(post_delete, sender=Job)
+def update_facet_counts_on_delete(sender, instance, **kwargs):
+    facets.apply_job_change(facets.facet_key(facets.job_state(instance)), None)
+
+
+@receiver(pre_save, sender=User)
+def remember_company_name(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._previous_company_name = None
+    if raw or instance.pk is None or not instance.is_employer:
+        return
+    if update_fields is not None and 'company_name' not in update_fields:
+        return
+    instance._previous_company_name = (
+        sender.objects.filter(pk=instance.pk).values_list('company_name', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=User)
+def reindex_employer_jobs(sender, instance, raw=False, **kwargs):
+    # Company name is part of every job's search document.
+    previous = getattr(instance, '_previous_company_name', None)
+    if raw or previous is None or previous == instance.company_name:
+        return
+    backend = search.get_backend()
+    for job in instance.jobs.all():
+        job.employer = instance
+        backend.index_job(job)
+
+
+@receiver(pre_save, sender=Application)
+def update_resume_terms(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'parsed_text' not in update_fields):
+        return
+    instance.resume_terms = matching.term_vector(instance.parsed_text)
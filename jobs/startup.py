@@ -0,0 +1,180 @@
+"""
+Cold-start helpers for the serverless entry point (api/index.py).
+
+``ensure_migrated`` replaces running ``migrate`` on every boot. The on-disk
+migration names are listed from the migration directories (nothing is
+imported), hashed together with the database identity, and a marker file
+named after that fingerprint records that this database was already seen
+fully migrated. A warm container therefore skips the database entirely;
+a fresh one runs a single SELECT on ``django_migrations``; ``migrate`` only
+runs when migrations are actually pending.
+
+``warmup`` builds the URL resolver's lookup tables and compiles every
+project template (everything under the TEMPLATES ``DIRS``, i.e.
+jobs/templates) into the cached template loader during initialization
+rather than inside the first requests.
+
+``parse_importtime`` reads ``python -X importtime`` output for
+``manage.py profile_startup``.
+"""
+import hashlib
+import importlib.util
+import os
+import re
+import tempfile
+
+from django.apps import apps
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def disk_migrations():
+    """The (app label, migration name) pairs present on disk, found without importing them."""
+    from django.db.migrations.loader import MigrationLoader
+
+    found = set()
+    for app_config in apps.get_app_configs():
+        module_name, _ = MigrationLoader.migrations_module(app_config.label)
+        if module_name is None:
+            continue
+        try:
+            spec = importlib.util.find_spec(module_name)
+        except ImportError:
+            continue
+        if spec is None or not spec.submodule_search_locations:
+            continue
+        for directory in spec.submodule_search_locations:
+            for entry in os.scandir(directory):
+                name, ext = os.path.splitext(entry.name)
+                if ext == '.py' and name[0] not in '_~':
+                    found.add((app_config.label, name))
+    return found
+
+
+def migration_fingerprint(migrations, using=DEFAULT_DB_ALIAS):
+    """Identifies a set of migrations applied to one particular database."""
+    database = settings.DATABASES[using]
+    identity = [database.get('ENGINE'), str(database.get('NAME')), database.get('HOST'), str(database.get('PORT'))]
+    digest = hashlib.sha256(repr((identity, sorted(migrations))).encode())
+    return digest.hexdigest()[:20]
+
+
+def pending_migrations(migrations, using=DEFAULT_DB_ALIAS):
+    """Which of ``migrations`` the database has not recorded as applied."""
+    from django.db.migrations.recorder import MigrationRecorder
+
+    recorder = MigrationRecorder(connections[using])
+    if not recorder.has_table():
+        return set(migrations)
+    return set(migrations) - set(recorder.applied_migrations())
+
+
+def _marker_path(fingerprint):
+    state_dir = getattr(settings, 'STARTUP_STATE_DIR', None) or tempfile.gettempdir()
+    return os.path.join(state_dir, f'job_portal_migrated_{fingerprint}')
+
+
+def ensure_migrated(mode=None, using=DEFAULT_DB_ALIAS):
+    """
+    Applies pending migrations according to ``mode`` (default
+    settings.STARTUP_MIGRATIONS): 'check' migrates only when the fingerprint
+    check finds pending migrations, 'always' runs migrate unconditionally
+    (the old behaviour) and 'off' does nothing.
+    Returns:
+        str: 'off', 'cached' (marker hit, no database access), 'up-to-date'
+        or 'migrated'.
+    """
+    from django.core.management import call_command
+
+    mode = mode or getattr(settings, 'STARTUP_MIGRATIONS', 'check')
+    if mode == 'off':
+        return 'off'
+    if mode == 'always':
+        call_command('migrate', interactive=False, database=using, verbosity=0)
+        return 'migrated'
+
+    migrations = disk_migrations()
+    marker = _marker_path(migration_fingerprint(migrations, using))
+    if os.path.exists(marker):
+        return 'cached'
+
+    status = 'up-to-date'
+    if pending_migrations(migrations, using):
+        call_command('migrate', interactive=False, database=using, verbosity=0)
+        status = 'migrated'
+    try:
+        with open(marker, 'w'):
+            pass
+    except OSError:
+        # Read-only temp dir: checked again on the next boot, which is still cheap
+        pass
+    return status
+
+
+def project_templates(engine):
+    """Names of the templates under ``engine``'s DIRS, in a stable order."""
+    names = []
+    for directory in engine.dirs:
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                if filename.endswith(('.html', '.txt')):
+                    path = os.path.join(root, filename)
+                    names.append(os.path.relpath(path, directory).replace(os.sep, '/'))
+    return sorted(set(names))
+
+
+def compile_templates(names=None):
+    """
+    Loads (and so compiles and caches) templates in every Django template engine.
+    Args:
+        names: Template names; default: each engine's project_templates().
+    Returns:
+        list: (engine alias, template name) for every template compiled.
+    """
+    from django.template import engines
+    from django.template.backends.django import DjangoTemplates
+
+    compiled = []
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        for name in names if names is not None else project_templates(backend.engine):
+            backend.engine.get_template(name)
+            compiled.append((backend.name, name))
+    return compiled
+
+
+def warmup(templates=None):
+    """
+    Builds the URL resolver tables and compiles ``templates`` (default: all
+    project templates). Returns the number of templates compiled.
+    """
+    from django.urls import Resolver404, get_resolver
+
+    resolver = get_resolver()
+    # Importing every view module and building the reverse() tables happen lazily otherwise
+    resolver.reverse_dict
+    try:
+        resolver.resolve('/')
+    except Resolver404:
+        pass
+
+    return len(compile_templates(templates))
+
+
+def parse_importtime(output):
+    """
+    Parses ``python -X importtime`` stderr.
+    Returns:
+        list: (module, self microseconds, cumulative microseconds, depth) in
+        import-completion order.
+    """
+    rows = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
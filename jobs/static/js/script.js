@@ -4,24 +4,52 @@ document.addEventListener('DOMContentLoaded', function () {
     // Custom Scripts
 
     // Autocomplete Logic
+    // Responses are cached per term and requests are debounced, so typing
+    // a word sends one request instead of one per keystroke.
+    const AUTOCOMPLETE_DELAY = 150;
+    const autocompleteCache = new Map();
+
+    function fetchSuggestions(term) {
+        if (!autocompleteCache.has(term)) {
+            const request = fetch(`/api/autocomplete/?term=${encodeURIComponent(term)}`)
+                .then(response => response.json())
+                .catch(err => {
+                    autocompleteCache.delete(term);
+                    throw err;
+                });
+            autocompleteCache.set(term, request);
+        }
+        return autocompleteCache.get(term);
+    }
+
     function autocomplete(inp, type) {
         let currentFocus;
+        let debounceTimer;
         inp.addEventListener("input", function (e) {
-            let a, b, i, val = this.value;
+            const input = this;
+            clearTimeout(debounceTimer);
+            closeAllLists();
+            if (!input.value) { return false; }
+            debounceTimer = setTimeout(function () { showSuggestions(input); }, AUTOCOMPLETE_DELAY);
+        });
+
+        function showSuggestions(input) {
+            let a, b, val = input.value;
             closeAllLists();
             if (!val) { return false; }
             currentFocus = -1;
             a = document.createElement("DIV");
-            a.setAttribute("id", this.id + "autocomplete-list");
+            a.setAttribute("id", input.id + "autocomplete-list");
             a.setAttribute("class", "autocomplete-items");
 
             // Append to the parent div instead of form to handle positioning better relative to input
-            this.parentNode.parentNode.appendChild(a);
+            input.parentNode.parentNode.appendChild(a);
 
             // Fetch suggestions
-            fetch(`/api/autocomplete/?term=${val}`)
-                .then(response => response.json())
+            fetchSuggestions(val)
                 .then(data => {
+                    // Drop stale responses if the user kept typing
+                    if (input.value !== val) { return; }
                     const items = type === 'title' ? data.titles : data.locations;
                     a.innerHTML = ''; // Clear previous
                     if (items.length === 0) {
@@ -48,7 +76,7 @@ document.addEventListener('DOMContentLoaded', function () {
                     });
                 })
                 .catch(err => console.log('Autocomplete fetch error:', err));
-        });
+        }
 
         inp.addEventListener("keydown", function (e) {
             let x = document.getElementById(this.id + "autocomplete-list");
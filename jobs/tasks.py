@@ -0,0 +1,137 @@
+"""
+Database-backed queue for background resume parsing.
+
+``ApplyJobView`` saves the application and calls ``enqueue_resume_parse``;
+the ``process_resume_queue`` management command claims queued tasks, parses
+the PDFs in a process pool and writes ``Application.parsed_text`` back.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Application, ResumeParseTask
+from .matching import term_vector
+from .resume_cache import file_sha256
+from .utils import parse_pdf_text
+
+MAX_ERROR_LENGTH = 2000
+
+
+def is_pdf(resume):
+    if not resume or not resume.name.lower().endswith('.pdf'):
+        return False
+    # Uploads sniffed by HashingTemporaryFileUploadHandler must also look like a PDF
+    magic = getattr(resume, 'magic_bytes', None)
+    return magic is None or magic.startswith(b'%PDF-')
+
+
+def enqueue_resume_parse(application):
+    """Queues (or re-queues) text extraction for an application's resume."""
+    if not is_pdf(application.resume):
+        Application.objects.filter(pk=application.pk).update(parse_status='skipped')
+        application.parse_status = 'skipped'
+        return None
+
+    Application.objects.filter(pk=application.pk).update(parse_status='pending')
+    application.parse_status = 'pending'
+    task, _ = ResumeParseTask.objects.update_or_create(
+        application=application,
+        defaults={
+            'status': 'queued',
+            'attempts': 0,
+            'run_after': timezone.now(),
+            'locked_until': None,
+            'last_error': '',
+        },
+    )
+    return task
+
+
+def claim_tasks(limit, lease_seconds):
+    """
+    Atomically marks up to ``limit`` runnable tasks as running and returns them.
+
+    Tasks whose lease expired (their worker died mid-parse) are runnable
+    again. On PostgreSQL, concurrent workers skip each other's locked rows.
+    """
+    now = timezone.now()
+    runnable = (
+        Q(status='queued', run_after__lte=now)
+        | Q(status='running', locked_until__lt=now)
+    )
+    with transaction.atomic():
+        ids = list(
+            ResumeParseTask.objects.select_for_update(skip_locked=True)
+            .filter(runnable)
+            .order_by('run_after', 'pk')
+            .values_list('pk', flat=True)[:limit]
+        )
+        ResumeParseTask.objects.filter(pk__in=ids).update(
+            status='running',
+            attempts=F('attempts') + 1,
+            locked_until=now + timedelta(seconds=lease_seconds),
+            updated_at=now,
+        )
+    return list(
+        ResumeParseTask.objects.filter(pk__in=ids)
+        .select_related('application')
+        .order_by('run_after', 'pk')
+    )
+
+
+def resume_source(application):
+    """Returns something picklable a worker process can parse: a path, or the bytes."""
+    try:
+        return application.resume.path
+    except NotImplementedError:
+        # Remote storage backends have no local path
+        with application.resume.open('rb') as f:
+            return f.read()
+
+
+def parse_resume_source(source, profile):
+    """
+    Worker-process entry point; must stay importable at module level for
+    pickling. The profile is resolved by the parent, since spawned children
+    have no Django settings.
+    """
+    return parse_pdf_text(source, profile)
+
+
+def resume_digest(application):
+    """Returns the SHA-256 of the application's resume, hashing the file if it was not recorded."""
+    if application.resume_sha256:
+        return application.resume_sha256
+    with application.resume.open('rb') as f:
+        return file_sha256(f)
+
+
+def complete_task(task, text, sha256=''):
+    fields = {'parsed_text': text, 'parse_status': 'parsed', 'resume_terms': term_vector(text)}
+    if sha256:
+        fields['resume_sha256'] = sha256
+    with transaction.atomic():
+        Application.objects.filter(pk=task.application_id).update(**fields)
+        ResumeParseTask.objects.filter(pk=task.pk).update(
+            status='done', locked_until=None, last_error='', updated_at=timezone.now()
+        )
+
+
+def fail_task(task, error, max_attempts, backoff_seconds):
+    """Schedules a retry with exponential backoff, or gives up after ``max_attempts``."""
+    now = timezone.now()
+    error = str(error)[:MAX_ERROR_LENGTH]
+    with transaction.atomic():
+        if task.attempts < max_attempts:
+            delay = backoff_seconds * 2 ** (task.attempts - 1)
+            ResumeParseTask.objects.filter(pk=task.pk).update(
+                status='queued', locked_until=None, last_error=error,
+                run_after=now + timedelta(seconds=delay), updated_at=now,
+            )
+        else:
+            ResumeParseTask.objects.filter(pk=task.pk).update(
+                status='failed', locked_until=None, last_error=error, updated_at=now,
+            )
+            Application.objects.filter(pk=task.application_id).update(parse_status='failed')
@@ -0,0 +1,123 @@
+"""
+Tests for the in-memory autocomplete index.
+"""
+import os
+import tempfile
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from jobs import autocomplete
+from jobs.models import Job, User
+
+
+class PrefixIndexTest(TestCase):
+
+    def setUp(self):
+        self.index = autocomplete.PrefixIndex()
+        self.index.add('Senior Python Developer', 3)
+        self.index.add('Python Engineer', 5)
+        self.index.add('Product Manager')
+
+    def test_ranks_by_popularity(self):
+        self.assertEqual(self.index.complete('p'), ['Python Engineer', 'Senior Python Developer', 'Product Manager'])
+
+    def test_matches_word_starts(self):
+        self.assertEqual(self.index.complete('DEVEL'), ['Senior Python Developer'])
+        self.assertEqual(self.index.complete('ython'), [])
+
+    def test_top_k(self):
+        self.assertEqual(self.index.complete('p', k=1), ['Python Engineer'])
+
+    def test_bulk_load_matches_incremental_adds(self):
+        index = autocomplete.PrefixIndex.from_values(
+            ['Senior Python Developer'] * 3 + ['Python Engineer'] * 5 + ['Product Manager', ''])
+        self.assertEqual(index.keys, self.index.keys)
+        self.assertEqual(index.counts, self.index.counts)
+
+    def test_discard_removes_value_at_zero(self):
+        self.index.discard('Product Manager')
+        self.assertEqual(self.index.complete('prod'), [])
+        self.assertNotIn('Product Manager', self.index.counts)
+
+
+class AutocompleteServiceTest(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.snapshot = os.path.join(self.tmpdir.name, 'autocomplete.json')
+        self.override = override_settings(AUTOCOMPLETE_SNAPSHOT_PATH=self.snapshot)
+        self.override.enable()
+        autocomplete.reset_service()
+
+        self.employer = User.objects.create_user(username='acme', password='testpass123', is_employer=True)
+        self.job = Job.objects.create(employer=self.employer, title='Data Scientist',
+                                      description='Models', location='London')
+        Job.objects.create(employer=self.employer, title='Data Engineer',
+                           description='Pipelines', location='London', is_active=False)
+
+    def tearDown(self):
+        autocomplete.reset_service()
+        self.override.disable()
+        self.tmpdir.cleanup()
+
+    def test_endpoint_returns_active_titles_and_locations(self):
+        response = self.client.get(reverse('job_autocomplete'), {'term': 'lon'})
+        self.assertEqual(response.json(), {'titles': [], 'locations': ['London']})
+        response = self.client.get(reverse('job_autocomplete'), {'term': 'data'})
+        self.assertEqual(response.json()['titles'], ['Data Scientist'])
+
+    def test_endpoint_does_not_query_database_once_loaded(self):
+        autocomplete.get_service().rebuild()
+        with self.assertNumQueries(0):
+            self.client.get(reverse('job_autocomplete'), {'term': 'data'})
+
+    def test_signals_update_index(self):
+        service = autocomplete.get_service()
+        service.rebuild()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.title = 'Data Analyst'
+            self.job.save()
+        self.assertEqual(service.titles.complete('data'), ['Data Analyst'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.delete()
+        self.assertEqual(service.titles.complete('data'), [])
+
+    def test_other_workers_reload_snapshot(self):
+        writer = autocomplete.AutocompleteService(self.snapshot)
+        reader = autocomplete.AutocompleteService(self.snapshot)
+        writer.rebuild()
+        self.assertEqual(reader.complete('data')['titles'], ['Data Scientist'])
+
+        job = Job(pk=999, title='Data Wrangler', location='Paris', is_active=True)
+        writer.update_job(job)
+        self.assertEqual(reader.complete('data')['titles'], ['Data Scientist', 'Data Wrangler'])
+        writer.remove_job(self.job.pk)
+        self.assertEqual(reader.complete('data')['titles'], ['Data Wrangler'])
+
+    def test_updates_append_to_the_log_until_a_rebuild(self):
+        service = autocomplete.get_service()
+        service.rebuild()
+        with open(self.snapshot, 'rb') as f:
+            snapshot = f.read()
+        service.update_job(Job(pk=999, title='Data Wrangler', location='Paris', is_active=True))
+        with open(self.snapshot, 'rb') as f:
+            self.assertEqual(f.read(), snapshot)
+        with open(service.log_path) as f:
+            self.assertEqual(f.read(), '[999, "Data Wrangler", "Paris"]\n')
+
+        # Not in the database, so the rebuild drops it along with the log
+        service.rebuild()
+        self.assertFalse(os.path.exists(service.log_path))
+        fresh = autocomplete.AutocompleteService(self.snapshot)
+        self.assertEqual(fresh.complete('data')['titles'], ['Data Scientist'])
+
+    def test_snapshot_path_is_per_database(self):
+        with override_settings(AUTOCOMPLETE_SNAPSHOT_PATH='', AUTOCOMPLETE_SNAPSHOT_DIR=self.tmpdir.name):
+            path = autocomplete.snapshot_path()
+            self.assertEqual(os.path.dirname(path), self.tmpdir.name)
+            with mock.patch.dict(connection.settings_dict, NAME='other.sqlite3'):
+                self.assertNotEqual(autocomplete.snapshot_path(), path)
@@ -0,0 +1,82 @@
+"""
+Tests for the view benchmark suite and its baseline comparison.
+"""
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import Client, TestCase
+
+from jobs import counts, urls
+from jobs.benchmark_suite import SCENARIOS, Scenario, run_scenario
+from jobs.benchmarking import compare_to_baseline, percentile
+from jobs.models import Category, Job, User
+
+
+class BenchmarkSuiteTest(TestCase):
+
+    def run_command(self, **options):
+        options = {'jobs': 60, 'employers': 5, 'seekers': 20, 'applications': 80,
+                   'requests': 3, 'warmup': 1, 'traced': 1, **options}
+        out = StringIO()
+        call_command('benchmark_views', stdout=out, **options)
+        return out.getvalue()
+
+    def test_every_url_has_a_scenario(self):
+        names = {pattern.name for pattern in urls.urlpatterns}
+        self.assertEqual(names - {scenario.url_name for scenario in SCENARIOS}, set())
+
+    def test_runs_every_scenario_and_writes_json(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'results.json')
+            output = self.run_command(output=path)
+            with open(path) as f:
+                document = json.load(f)
+        self.assertEqual(set(document['results']), {scenario.name for scenario in SCENARIOS})
+        self.assertEqual(document['meta']['data']['jobs'], 60)
+        for name, result in document['results'].items():
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'], name)
+            self.assertIn(name, output)
+        self.assertGreater(document['results']['apply_job_submit']['queries'], 0)
+        self.assertEqual(document['results']['job_autocomplete']['queries'], 0)
+        # Rolled back
+        self.assertFalse(Job.objects.exists())
+
+    def test_commit_hooks_run_inside_each_request(self):
+        employer = User.objects.create_user(username='acme', password='testpass123', is_employer=True)
+        category = Category.objects.create(name='Data', slug='data')
+        client = Client()
+        client.force_login(employer)
+        scenario = Scenario('post_job_submit', 'post_job', user='employer', method='post', params={
+            'title': 'Analyst', 'description': 'Numbers', 'location': 'Remote', 'job_type': 'FT',
+            'category': category.pk,
+        })
+        generation = counts.generation()
+        result = run_scenario(scenario, None, {'employer': client}, requests=3, warmup=1, traced=1)
+        # One feed generation bump per job posted, from the save's on_commit hook
+        self.assertEqual(Job.objects.count(), 5)
+        self.assertEqual(counts.generation(), generation + 5)
+        self.assertGreater(result['queries'], 0)
+
+    def test_baseline_regressions(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'baseline.json')
+            fast = {'p95_ms': 0.001, 'queries': 0}
+            with open(path, 'w') as f:
+                json.dump({'results': {'health_check': fast}}, f)
+            output = self.run_command(scenario=['health_check'], baseline=path)
+            self.assertIn('REGRESSION', output)
+            with self.assertRaises(CommandError):
+                self.run_command(scenario=['health_check'], baseline=path, fail_on_regression=True)
+
+    def test_percentile_and_comparison(self):
+        self.assertEqual(percentile([1, 2, 3, 4, 5], 50), 3)
+        self.assertAlmostEqual(percentile(range(1, 101), 95), 95.05)
+        rows = compare_to_baseline(
+            {'a': {'p95_ms': 10.5, 'queries': 3}, 'b': {'p95_ms': 10, 'queries': 4}, 'c': {'p95_ms': 1, 'queries': 1}},
+            {'a': {'p95_ms': 10, 'queries': 3}, 'b': {'p95_ms': 10, 'queries': 3}},
+        )
+        self.assertEqual([(name, regressed) for name, *_, regressed in rows], [('a', False), ('b', True)])
@@ -0,0 +1,169 @@
+"""
+Tests for the in-process job bitmap index (jobs/bitmaps.py).
+"""
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs import bitmaps, counts, facets
+from jobs.metrics import registry
+from jobs.models import Category, Job, User
+
+
+@override_settings(JOB_BITMAP_INDEX=True, JOB_BITMAP_INDEX_MIN_REBUILD_SECONDS=0)
+class BitmapIndexTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        bitmaps.reset_index()
+        self.employer = User.objects.create_user(username='acme', password='testpass123', is_employer=True,
+                                                 company_name='Acme')
+        self.engineering = Category.objects.create(name='Engineering', slug='engineering')
+        self.design = Category.objects.create(name='Design', slug='design')
+        self.jobs = [
+            self.add_job('Python Developer', 'FT', self.engineering, 'Remote', 90000),
+            self.add_job('Go Developer', 'CT', self.engineering, 'London', 130000),
+            self.add_job('Product Designer', 'FT', self.design, 'Remote', None),
+            self.add_job('Old Role', 'FT', self.design, 'Remote', None, is_active=False),
+        ]
+
+    def tearDown(self):
+        bitmaps.reset_index()
+
+    def add_job(self, title, job_type, category, location, salary, **kwargs):
+        return Job.objects.create(employer=self.employer, title=title, description='Role', job_type=job_type,
+                                  category=category, location=location,
+                                  salary_min=salary and Decimal(salary), **kwargs)
+
+    def test_feed_pages_newest_first(self):
+        index = bitmaps.start()
+        mask = index.mask({'job_type': ['FT', 'CT']})
+        self.assertEqual(index.page(mask, 0, None), [job.pk for job in self.jobs[2::-1]])
+        self.assertEqual(index.page(mask, 1, 1), [self.jobs[1].pk])
+        self.assertEqual(index.page(mask, 3, 10), [])
+        self.assertEqual(index.page(index.mask({'category': [self.design.pk]}), 0, 10), [self.jobs[2].pk])
+
+    def test_counts_match_the_grouped_query(self):
+        index = bitmaps.start()
+        table = facets.facet_table(facets.FeedFilters(), Job.objects.filter(is_active=True))
+        for selections in ({}, {'job_type': ['FT'], 'locations': ['Remote']},
+                           {'category': [self.engineering.pk], 'salary': ['120-160', 'none']}):
+            self.assertEqual(index.count(selections), table.count(selections))
+
+    def test_pages_span_many_words(self):
+        index = bitmaps.start()
+        now = timezone.now()
+        created = Job.objects.bulk_create(
+            Job(employer=self.employer, title=f'Role {n}', slug=f'role-{n}', description='Role', location='Remote',
+                job_type='PT' if n % 3 else 'IN', created_at=now + timedelta(seconds=n))
+            for n in range(300)
+        )
+        index.rebuild()
+        interns = [job.pk for job in reversed(created) if job.job_type == 'IN']
+        mask = index.mask({'job_type': ['IN']})
+        self.assertEqual(index.page(mask, 0, None), interns)
+        self.assertEqual(index.page(mask, 37, 30), interns[37:67])
+
+    def test_signals_keep_the_index_current(self):
+        index = bitmaps.start()
+        with self.captureOnCommitCallbacks(execute=True):
+            job = self.add_job('Data Engineer', 'IN', self.engineering, 'Berlin', 60000)
+        self.assertTrue(index.is_current())
+        self.assertEqual(index.page(index.mask({'job_type': ['IN']}), 0, 10), [job.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            job.job_type = 'FT'
+            job.save()
+            self.jobs[0].delete()
+        self.assertTrue(index.is_current())
+        self.assertEqual(index.count({})['job_type'], {'FT': 2, 'CT': 1})
+
+    def test_first_use_builds_in_the_background(self):
+        with mock.patch.object(bitmaps.threading, 'Thread') as thread:
+            self.assertIsNone(bitmaps.get_index())
+            self.assertIsNone(bitmaps.get_index())
+        index = bitmaps.get_index(refresh=False)
+        thread.assert_called_once_with(target=index._rebuild_in_background, name='job-bitmap-index', daemon=True)
+        thread.return_value.start.assert_called_once_with()
+
+        # What the thread runs
+        index.rebuild()
+        index.rebuilding.release()
+        self.assertIs(bitmaps.get_index(), index)
+
+    def test_unlogged_changes_rebuild_in_the_background(self):
+        index = bitmaps.start()
+        # A bulk write: the generation moved without a JobChange entry
+        self.add_job('Data Engineer', 'IN', self.engineering, 'Berlin', 60000)
+        counts.invalidate()
+        self.assertFalse(index.is_current())
+        with mock.patch.object(bitmaps.threading, 'Thread') as thread:
+            self.assertIsNone(bitmaps.get_index())
+            with override_settings(JOB_BITMAP_INDEX_MIN_REBUILD_SECONDS=60):
+                index.rebuilding.release()
+                self.assertIsNone(bitmaps.get_index())
+        self.assertEqual(thread.call_count, 1)
+        index.rebuild()
+        self.assertIs(bitmaps.get_index(), index)
+        self.assertEqual(index.count({})['job_type']['IN'], 1)
+
+    def test_catches_up_on_changes_made_by_other_processes(self):
+        index = bitmaps.start()
+        # Another process: its writes and logged generation bumps are in the database, its signals ran elsewhere
+        other = Job.objects.bulk_create([Job(employer=self.employer, title='Rust Developer', slug='rust-developer',
+                                             description='Role', job_type='FT', location='Paris',
+                                             created_at=timezone.now() + timedelta(hours=1))])[0]
+        counts.invalidate(other.pk)
+        Job.objects.filter(pk=self.jobs[0].pk).update(is_active=False)
+        counts.invalidate(self.jobs[0].pk)
+        Job.objects.filter(pk=self.jobs[1].pk).delete()
+        counts.invalidate(self.jobs[1].pk)
+
+        with mock.patch.object(bitmaps.threading, 'Thread') as thread:
+            response = self.client.get(reverse('home'), {'job_type': ['FT', 'CT']})
+        thread.assert_not_called()
+        self.assertIs(response.context['view'].bitmap_index, index)
+        self.assertTrue(index.is_current())
+        self.assertEqual([job.pk for job in response.context['jobs']], [other.pk, self.jobs[2].pk])
+        self.assertEqual(response.context['paginator'].count, 2)
+        self.assertEqual(index.count({})['locations'], {'Remote': 1, 'Paris': 1})
+
+    def test_too_many_changes_fall_back_to_sql(self):
+        bitmaps.start()
+        counts.invalidate(self.jobs[0].pk)
+        Job.objects.filter(pk=self.jobs[0].pk).update(is_active=False)
+        with mock.patch.object(bitmaps, 'MAX_CATCH_UP', 0), mock.patch.object(bitmaps.threading, 'Thread') as thread:
+            response = self.client.get(reverse('home'), {'job_type': 'FT'})
+        self.assertEqual(thread.call_count, 1)
+        self.assertIsNone(response.context['view'].bitmap_index)
+        self.assertEqual([job.pk for job in response.context['jobs']], [self.jobs[2].pk])
+
+    def test_home_page_uses_the_index(self):
+        bitmaps.start()
+        # Feed generation, categories and the page of jobs; the count and facet counts come from the bitsets
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('home'), {'job_type': ['FT', 'CT'], 'category': 'engineering'})
+        self.assertEqual([job.title for job in response.context['jobs']], ['Go Developer', 'Python Developer'])
+        self.assertEqual(response.context['paginator'].count, 2)
+        panel = {heading: {facet.value: facet.count for facet in values}
+                 for heading, values in response.context['facets']}
+        self.assertEqual(panel['Category'], {'engineering': 2, 'design': 1})
+
+        # Text searches and salary ranges still go to the database
+        response = self.client.get(reverse('home'), {'query': 'developer', 'salary_min': '100000'})
+        self.assertEqual([job.title for job in response.context['jobs']], ['Go Developer'])
+
+    def test_metrics(self):
+        registry.reset()
+        index = bitmaps.start()
+        self.assertEqual(registry.gauge('jobs_bitmap_index_bytes'), index.nbytes)
+        self.assertEqual(registry.gauge('jobs_bitmap_index_jobs'), 4)
+        with override_settings(METRICS_TOKEN='s3cret'):
+            body = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer s3cret').content.decode()
+        self.assertIn('# TYPE jobs_bitmap_index_rebuild_seconds gauge', body)
+        self.assertIn(f'jobs_bitmap_index_bytes {index.nbytes}', body)
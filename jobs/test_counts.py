@@ -0,0 +1,120 @@
+"""
+Tests for cached and estimated job feed counts.
+"""
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from jobs import counts
+from jobs.models import FeedGeneration, Job, JobChange, User
+from jobs.pagination import CountedPaginator
+
+
+class FeedCountTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.employer = User.objects.create_user(username='acme', password='testpass123', is_employer=True)
+        for n in range(3):
+            self.add_job(f'Python Developer {n}')
+
+    def add_job(self, title, location='Remote'):
+        return Job.objects.create(employer=self.employer, title=title, description='Role', location=location)
+
+    def count_queries(self, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('home'), params)
+        return response, [q['sql'] for q in ctx.captured_queries if '__count' in q['sql'] or 'COUNT(*)' in q['sql']]
+
+    def test_equivalent_filters_share_a_cached_count(self):
+        response, queries = self.count_queries(location='Remote')
+        self.assertEqual(response.context['paginator'].count, 3)
+        self.assertEqual(len(queries), 1)
+
+        response, queries = self.count_queries(location='  remote ')
+        self.assertEqual(response.context['paginator'].count, 3)
+        self.assertEqual(queries, [])
+
+    def test_search_counts_are_cached(self):
+        self.count_queries(query='python')
+        response, queries = self.count_queries(query='Python')
+        self.assertEqual(response.context['paginator'].count, 3)
+        self.assertEqual(queries, [])
+
+    def test_job_changes_invalidate_counts(self):
+        self.count_queries()
+        with self.captureOnCommitCallbacks(execute=True):
+            job = self.add_job('Go Developer')
+        response, queries = self.count_queries()
+        self.assertEqual(response.context['paginator'].count, 4)
+        self.assertEqual(len(queries), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            job.delete()
+        response, _ = self.count_queries()
+        self.assertEqual(response.context['paginator'].count, 3)
+
+    def test_changes_made_elsewhere_invalidate_counts(self):
+        self.count_queries()
+        # Another process: its save bumps the generation in the database, not in this process's cache
+        Job.objects.bulk_create([Job(employer=self.employer, title='Go Developer', slug='go-developer',
+                                     description='Role', location='Remote')])
+        FeedGeneration.objects.update(value=F('value') + 1)
+        response, queries = self.count_queries()
+        self.assertEqual(response.context['paginator'].count, 4)
+        self.assertEqual(len(queries), 1)
+
+    def test_generation_moves_only_when_a_change_commits(self):
+        generation = counts.generation()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.add_job('Go Developer')
+        self.assertEqual(counts.generation(), generation)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(counts.generation(), generation + 1)
+
+    def test_changes_are_logged_and_trimmed(self):
+        job = self.add_job('Go Developer')
+        with mock.patch.multiple(counts, CHANGE_LOG_SIZE=3, CHANGE_LOG_PRUNE_EVERY=1):
+            generations = [counts.invalidate(job.pk) for _ in range(5)]
+        self.assertEqual(list(JobChange.objects.order_by('generation').values_list('generation', 'job_id')),
+                         [(generation, job.pk) for generation in generations[-3:]])
+        counts.invalidate()
+        self.assertEqual(JobChange.objects.count(), 3)
+
+    def test_generation_survives_a_cache_flush(self):
+        generation = counts.generation()
+        cache.clear()
+        self.assertEqual(counts.generation(), generation)
+        FeedGeneration.objects.all().delete()
+        self.assertNotEqual(counts.generation(), generation)
+
+    @override_settings(JOB_COUNT_ESTIMATE_THRESHOLD=1000)
+    def test_large_feeds_show_the_planner_estimate(self):
+        with mock.patch('jobs.counts.estimate_count', return_value=25000) as estimate:
+            response, queries = self.count_queries(location='Remote')
+        estimate.assert_called_once()
+        self.assertEqual(queries, [])
+        self.assertContains(response, 'About 25000 jobs found')
+
+    @override_settings(JOB_COUNT_ESTIMATE_THRESHOLD=1000)
+    def test_small_feeds_are_counted_exactly(self):
+        with mock.patch('jobs.counts.estimate_count', return_value=40):
+            response, _ = self.count_queries()
+        self.assertContains(response, '3 jobs found')
+        self.assertNotContains(response, 'About')
+
+    def test_estimates_need_postgresql(self):
+        if connection.vendor == 'postgresql':
+            self.skipTest('Planner estimates are available')
+        self.assertIsNone(counts.estimate_count(Job.objects.filter(is_active=True)))
+
+    def test_pages_past_an_underestimate_still_load(self):
+        jobs = Job.objects.order_by('pk')
+        paginator = CountedPaginator(jobs, 2, count=lambda: (2, True))
+        self.assertEqual(len(paginator.page(2).object_list), 1)
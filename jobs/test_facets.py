@@ -0,0 +1,143 @@
+"""
+Tests for facet counts and multi-select filters on the home page (jobs/facets.py).
+"""
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.http import QueryDict
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from jobs import facets
+from jobs.models import Category, Job, User
+
+
+class FacetTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.employer = User.objects.create_user(username='acme', password='testpass123', is_employer=True,
+                                                 company_name='Acme')
+        self.engineering = Category.objects.create(name='Engineering', slug='engineering')
+        self.design = Category.objects.create(name='Design', slug='design')
+        self.add_job('Python Developer', 'FT', self.engineering, 'Remote', 90000, 110000)
+        self.add_job('Go Developer', 'CT', self.engineering, 'London', 130000, None)
+        self.add_job('Product Designer', 'FT', self.design, 'Remote', None, 60000)
+        self.add_job('Brand Designer', 'PT', self.design, 'Berlin', None, None)
+        self.add_job('Old Python Developer', 'FT', self.engineering, 'Remote', 90000, 110000, is_active=False)
+
+    def add_job(self, title, job_type, category, location, salary_min, salary_max, **kwargs):
+        return Job.objects.create(
+            employer=self.employer, title=title, description='Role', job_type=job_type, category=category,
+            location=location, salary_min=salary_min and Decimal(salary_min),
+            salary_max=salary_max and Decimal(salary_max), **kwargs,
+        )
+
+    def get(self, **params):
+        response = self.client.get(reverse('home'), params)
+        panel = {heading: {facet.value: facet.count for facet in values}
+                 for heading, values in response.context['facets']}
+        return response, panel
+
+    def titles(self, response):
+        return sorted(job.title for job in response.context['jobs'])
+
+    def test_counts_for_the_unfiltered_feed(self):
+        response, panel = self.get()
+        self.assertEqual(panel['Job Type'], {'FT': 2, 'PT': 1, 'CT': 1})
+        self.assertEqual(panel['Category'], {'engineering': 2, 'design': 2})
+        self.assertEqual(panel['Location'], {'Remote': 2, 'London': 1, 'Berlin': 1})
+        self.assertEqual(panel['Salary'], {'50-80': 1, '80-120': 1, '120-160': 1, 'none': 1})
+        self.assertContains(response, 'Full-time')
+
+    def test_multi_select_counts_ignore_the_facets_own_selection(self):
+        response, panel = self.get(job_type=['FT', 'CT'], category='engineering')
+        self.assertEqual(self.titles(response), ['Go Developer', 'Python Developer'])
+        # Job types other than the selected ones stay selectable with their counts
+        self.assertEqual(panel['Job Type'], {'FT': 1, 'CT': 1})
+        self.assertEqual(panel['Category'], {'engineering': 2, 'design': 1})
+        self.assertEqual(response.context['paginator'].count, 2)
+
+    def test_salary_bands_and_range(self):
+        response, _ = self.get(salary=['50-80', 'none'])
+        self.assertEqual(self.titles(response), ['Brand Designer', 'Product Designer'])
+
+        # Ranges overlap the requested one; jobs without any salary are left out
+        response, panel = self.get(salary_min='100000', salary_max='120000')
+        self.assertEqual(self.titles(response), ['Python Developer'])
+        response, panel = self.get(salary_min='120000')
+        self.assertEqual(self.titles(response), ['Go Developer'])
+        self.assertEqual(panel['Salary'], {'120-160': 1})
+
+    def test_text_search_narrows_the_counts(self):
+        response, panel = self.get(query='developer', locations='Remote')
+        self.assertEqual(self.titles(response), ['Python Developer'])
+        self.assertEqual(panel['Location'], {'Remote': 1, 'London': 1})
+        self.assertEqual(panel['Job Type'], {'FT': 1})
+
+    def test_pure_python_counts_match_numpy(self):
+        table = facets.facet_table(facets.FeedFilters(), Job.objects.filter(is_active=True))
+        selections = {'job_type': ['FT', 'CT'], 'salary': ['80-120'], 'category': [self.engineering.pk]}
+        expected = table.count(selections)
+        with mock.patch.object(facets, 'np', None):
+            self.assertEqual(table.count(selections), expected)
+        self.assertEqual(expected['job_type'], {'FT': 1})
+
+    def test_invalid_values_are_ignored(self):
+        filters = facets.FeedFilters.from_query_dict(
+            QueryDict('job_type=XX&job_type=FT&salary=lots&salary_min=abc&salary_max=-5&category=Design'))
+        self.assertEqual(filters.job_types, ('FT',))
+        self.assertEqual(filters.salary_bands, ())
+        self.assertEqual((filters.salary_min, filters.salary_max), (None, None))
+        self.assertEqual(filters.categories, ('design',))
+
+    def test_toggle_url(self):
+        params = QueryDict('query=python&job_type=FT&page=3')
+        self.assertEqual(facets.toggle_url(params, 'job_type', 'CT'), '?query=python&job_type=FT&job_type=CT')
+        self.assertEqual(facets.toggle_url(params, 'job_type', 'FT'), '?query=python')
+
+    def test_facet_table_is_cached_until_a_job_changes(self):
+        self.get()
+        # Only the feed generation
+        with self.assertNumQueries(1):
+            table = facets.cached_facet_table(facets.FeedFilters(), Job.objects.filter(is_active=True))
+        self.assertEqual(table.total(), 4)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add_job('Data Engineer', 'IN', self.engineering, 'Remote', 40000, 50000)
+        _, panel = self.get(job_type='FT')
+        self.assertEqual(panel['Job Type']['IN'], 1)
+
+    def test_stored_table_follows_job_changes(self):
+        def assert_matches_jobs():
+            stored = facets.stored_facet_table()
+            grouped = facets.facet_table(facets.FeedFilters(), Job.objects.filter(is_active=True))
+            for selections in ({}, {'job_type': ['FT'], 'category': [self.engineering.pk]}):
+                self.assertEqual(stored.count(selections), grouped.count(selections))
+
+        assert_matches_jobs()
+        job = self.add_job('Data Engineer', 'IN', None, 'Remote', 40000, 50000)
+        assert_matches_jobs()
+        job.category, job.salary_min, job.location = self.design, Decimal(150000), 'Paris'
+        job.save()
+        assert_matches_jobs()
+        job.is_active = False
+        job.save()
+        assert_matches_jobs()
+        Job.objects.filter(title='Go Developer').delete()
+        assert_matches_jobs()
+
+        # Writes that bypass signals
+        Job.objects.filter(title='Brand Designer').update(job_type='FL')
+        self.assertEqual(facets.reconcile_facet_counts(), 3)
+        assert_matches_jobs()
+
+    def test_unfiltered_panel_reads_the_stored_table(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.get()
+        self.assertFalse([query for query in queries if 'GROUP BY' in query['sql']])
+        with CaptureQueriesContext(connection) as queries:
+            self.get(query='developer')
+        self.assertTrue([query for query in queries if 'GROUP BY' in query['sql']])
@@ -0,0 +1,65 @@
+"""
+Tests for the cached job card and job detail fragments.
+"""
+from io import StringIO
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from jobs.models import Category, Job, User
+
+
+class JobFragmentCacheTest(TestCase):
+
+    def setUp(self):
+        caches['template_fragments'].clear()
+        self.employer = User.objects.create_user(username='acme', password='testpass123',
+                                                 is_employer=True, company_name='Acme Corp')
+        self.category = Category.objects.create(name='Engineering', slug='engineering')
+        self.job = Job.objects.create(employer=self.employer, category=self.category, title='Python Developer',
+                                      description='Line one\n\nLine two', location='Remote', salary_min=90000,
+                                      salary_max=120000)
+
+    def pages(self):
+        return [
+            self.client.get(reverse('home')).content.decode(),
+            self.client.get(reverse('job_detail', args=[self.job.slug])).content.decode(),
+        ]
+
+    def test_fragments_are_served_from_cache(self):
+        for page in self.pages():
+            self.assertIn('Python Developer', page)
+            self.assertIn('90,000', page)
+        # A raw UPDATE bypasses Job.save, so updated_at and the cache key stay the same
+        Job.objects.filter(pk=self.job.pk).update(title='Go Developer')
+        for page in self.pages():
+            self.assertIn('Python Developer', page)
+
+    def test_job_save_invalidates(self):
+        self.pages()
+        self.job.title = 'Go Developer'
+        self.job.save()
+        for page in self.pages():
+            self.assertIn('Go Developer', page)
+            self.assertNotIn('Python Developer', page)
+
+    def test_company_rename_invalidates(self):
+        self.pages()
+        self.employer.company_name = 'Globex'
+        self.employer.save()
+        for page in self.pages():
+            self.assertIn('Globex', page)
+            self.assertNotIn('Acme Corp', page)
+
+    def test_viewer_specific_parts_are_not_cached(self):
+        self.pages()
+        self.client.force_login(self.employer)
+        page = self.client.get(reverse('job_detail', args=[self.job.slug])).content.decode()
+        self.assertIn('Edit Job', page)
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_fragment_cache', count=20, repeat=1, stdout=out)
+        self.assertIn('warm', out.getvalue())
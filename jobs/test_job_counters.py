@@ -0,0 +1,84 @@
+"""
+Tests for the denormalized open/total job counters.
+"""
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from jobs.models import Category, Job, User
+
+
+class JobCounterTest(TestCase):
+
+    def setUp(self):
+        self.employer = User.objects.create_user(username='acme', password='testpass123', is_employer=True)
+        self.engineering = Category.objects.create(name='Engineering', slug='engineering')
+        self.design = Category.objects.create(name='Design', slug='design')
+
+    def add_job(self, **kwargs):
+        fields = {'employer': self.employer, 'category': self.engineering, 'title': 'Python Developer',
+                  'description': 'Role', 'location': 'Remote', **kwargs}
+        return Job.objects.create(**fields)
+
+    def assertCounters(self, obj, open_jobs, total_jobs):
+        obj.refresh_from_db()
+        self.assertEqual((obj.open_jobs, obj.total_jobs), (open_jobs, total_jobs))
+
+    def test_create_and_deactivate(self):
+        job = self.add_job()
+        self.add_job(is_active=False)
+        self.assertCounters(self.engineering, 1, 2)
+        self.assertCounters(self.employer, 1, 2)
+
+        job.is_active = False
+        job.save()
+        self.assertCounters(self.engineering, 0, 2)
+        self.assertCounters(self.employer, 0, 2)
+
+    def test_category_change_moves_the_job(self):
+        job = self.add_job()
+        job.category = self.design
+        job.save()
+        self.assertCounters(self.engineering, 0, 0)
+        self.assertCounters(self.design, 1, 1)
+
+        job.category = None
+        job.save()
+        self.assertCounters(self.design, 0, 0)
+        self.assertCounters(self.employer, 1, 1)
+
+    def test_delete(self):
+        self.add_job()
+        Job.objects.filter(employer=self.employer).delete()
+        self.assertCounters(self.engineering, 0, 0)
+        self.assertCounters(self.employer, 0, 0)
+
+    def test_employer_deletion_cascades_to_category_counters(self):
+        self.add_job()
+        self.employer.delete()
+        self.assertCounters(self.engineering, 0, 0)
+
+    def test_stale_instance_does_not_overwrite_counters(self):
+        stale = User.objects.get(pk=self.employer.pk)
+        self.add_job()
+        stale.company_name = 'Acme Corp'
+        stale.save()
+        self.assertCounters(self.employer, 1, 1)
+        self.assertEqual(self.employer.company_name, 'Acme Corp')
+
+    def test_reconcile_fixes_drift(self):
+        self.add_job()
+        self.add_job()
+        # QuerySet.update bypasses the signals
+        Job.objects.update(is_active=False)
+        self.assertCounters(self.engineering, 2, 2)
+
+        out = StringIO()
+        call_command('reconcile_job_counts', dry_run=True, stdout=out)
+        self.assertIn('Categories: 1 would be fixed', out.getvalue())
+        self.assertCounters(self.engineering, 2, 2)
+
+        call_command('reconcile_job_counts', stdout=StringIO())
+        self.assertCounters(self.engineering, 0, 2)
+        self.assertCounters(self.employer, 0, 2)
@@ -0,0 +1,75 @@
+"""
+Tests for the bulk load data generator and the demo seeders.
+"""
+from collections import Counter
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count
+from django.test import TestCase
+
+from jobs.models import Application, Category, Job, User
+
+
+class GenerateLoadDataTest(TestCase):
+
+    def generate(self, **options):
+        options = {'employers': 20, 'seekers': 50, 'jobs': 400, 'applications': 600, 'batch_size': 128, **options}
+        out = StringIO()
+        call_command('generate_load_data', stdout=out, **options)
+        return out.getvalue()
+
+    def test_creates_the_requested_rows(self):
+        output = self.generate(password='loadtest123')
+        self.assertIn('400 jobs', output)
+        self.assertEqual(User.objects.filter(username__startswith='load-employer-').count(), 20)
+        self.assertEqual(User.objects.filter(username__startswith='load-seeker-').count(), 50)
+        self.assertEqual(Job.objects.count(), 400)
+        self.assertEqual(Application.objects.count(), 600)
+        seeker = User.objects.get(username='load-seeker-7')
+        self.assertTrue(seeker.check_password('loadtest123'))
+        # One shared hash
+        self.assertEqual(User.objects.values('password').distinct().count(), 1)
+
+    def test_distributions_are_skewed(self):
+        self.generate()
+        per_employer = sorted(
+            User.objects.filter(is_employer=True).annotate(n=Count('jobs')).values_list('n', flat=True),
+            reverse=True,
+        )
+        self.assertGreater(per_employer[0], 4 * per_employer[len(per_employer) // 2])
+        locations = Counter(Job.objects.values_list('location', flat=True))
+        self.assertEqual(locations.most_common(1)[0][0], 'Remote')
+
+    def test_keeps_derived_data_in_sync(self):
+        self.generate()
+        employer = User.objects.annotate(n=Count('jobs')).filter(is_employer=True).order_by('-n').first()
+        self.assertEqual(employer.total_jobs, employer.n)
+        self.assertEqual(sum(Category.objects.values_list('total_jobs', flat=True)), 400)
+        # Spread-out creation dates were stored, not overwritten with now()
+        self.assertGreater(Job.objects.values('created_at').distinct().count(), 300)
+        response = self.client.get('/', {'query': 'engineer'})
+        self.assertGreater(response.context['paginator'].count, 0)
+
+    def test_prefixes_namespace_runs(self):
+        self.generate(jobs=10, applications=5)
+        with self.assertRaises(CommandError):
+            self.generate(jobs=10, applications=5)
+        self.generate(jobs=10, applications=5, prefix='second')
+        self.assertEqual(Job.objects.count(), 20)
+
+    def test_rejects_prefixes_that_are_not_slugs(self):
+        for prefix in ('Load Test', 'load/2', ''):
+            with self.assertRaises(CommandError):
+                self.generate(jobs=10, applications=5, prefix=prefix)
+        self.assertFalse(Job.objects.exists())
+
+
+class SeedDataTest(TestCase):
+
+    def test_seed_data_runs(self):
+        call_command('seed_data', stdout=StringIO())
+        self.assertTrue(Job.objects.exists())
+        job_types = {code for code, _ in Job.JOB_TYPES}
+        self.assertTrue(set(Job.objects.values_list('job_type', flat=True)) <= job_types)
@@ -0,0 +1,83 @@
+"""
+Tests for resume-to-job matching (jobs/matching.py) and the ranked applications page.
+"""
+import random
+
+from django.test import TestCase
+from django.urls import reverse
+
+from jobs import matching
+from jobs.models import Application, Job, User
+
+
+class MatchingTest(TestCase):
+
+    def setUp(self):
+        self.employer = User.objects.create_user(username='acme', password='testpass123', is_employer=True)
+        self.job = Job.objects.create(
+            employer=self.employer, title='Senior Python Developer', location='Remote',
+            description='Django and PostgreSQL backend services, Python APIs on AWS.',
+        )
+
+    def apply(self, username, parsed_text):
+        seeker = User.objects.create_user(username=username, is_seeker=True)
+        return Application.objects.create(job=self.job, applicant=seeker, resume='resumes/cv.pdf',
+                                          parsed_text=parsed_text, parse_status='parsed')
+
+    def test_batched_scores_match_the_pairwise_reference(self):
+        rng = random.Random(7)
+        words = 'python django postgresql aws react java kubernetes sales design go rust api'.split()
+        documents = [matching.term_vector(' '.join(rng.choices(words, k=rng.randint(0, 60)))) for _ in range(50)]
+        query = matching.term_vector('python python django aws api')
+        expected = matching.pairwise_scores(query, documents)
+        for actual, reference in zip(matching.bm25_scores(query, documents), expected):
+            self.assertAlmostEqual(actual, reference, places=9)
+
+    def test_term_vector_round_trip(self):
+        ids, counts = matching.decode(matching.term_vector('Python, python and Django'))
+        self.assertEqual(sorted(counts.tolist()), [1, 1, 2])
+        self.assertEqual(ids.tolist(), sorted(ids.tolist()))
+        self.assertEqual(matching.term_vector(''), b'')
+
+    def test_vector_follows_parsed_text(self):
+        application = self.apply('sam', 'Python developer')
+        application.refresh_from_db()
+        self.assertEqual(bytes(application.resume_terms), matching.term_vector('Python developer'))
+
+        application.parsed_text = 'Graphic designer'
+        application.save(update_fields=['parsed_text'])
+        application.refresh_from_db()
+        self.assertEqual(bytes(application.resume_terms), matching.term_vector('Graphic designer'))
+
+    def test_ranking(self):
+        self.apply('designer', 'Graphic designer: Figma, print layouts')
+        self.apply('pythonista', 'Senior Python developer: Django, PostgreSQL, AWS and REST APIs')
+        self.apply('java', 'Java developer, Spring and some Python scripting')
+        ranked = matching.rank_applications(self.job, Application.objects.filter(job=self.job))
+        self.assertEqual([a.applicant.username for a in ranked], ['pythonista', 'java', 'designer'])
+        self.assertEqual(ranked[0].match_score, 100)
+        self.assertEqual(ranked[-1].match_score, 0)
+
+    def test_missing_vectors_are_filled_on_first_use(self):
+        application = self.apply('sam', 'Python and Django')
+        Application.objects.filter(pk=application.pk).update(resume_terms=b'')
+        self.apply('empty', '')
+
+        ranked = matching.rank_applications(self.job, Application.objects.filter(job=self.job))
+        self.assertEqual(ranked[0].pk, application.pk)
+        application.refresh_from_db()
+        self.assertEqual(bytes(application.resume_terms), matching.term_vector('Python and Django'))
+
+    def test_applications_page_sorts_by_match(self):
+        self.apply('pythonista', 'Python and Django developer')
+        self.apply('designer', 'Graphic designer')
+        self.client.force_login(self.employer)
+        url = reverse('job_applications', args=[self.job.slug])
+
+        response = self.client.get(url)
+        self.assertEqual([a.applicant.username for a in response.context['applications']], ['designer', 'pythonista'])
+        self.assertEqual(response.context['sort'], 'recent')
+
+        response = self.client.get(url, {'sort': 'match'})
+        self.assertEqual([a.applicant.username for a in response.context['applications']], ['pythonista', 'designer'])
+        self.assertContains(response, '100% match')
@@ -0,0 +1,74 @@
+"""
+Tests for the request metrics middleware and the Prometheus endpoint.
+"""
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from jobs.metrics import Histogram, registry
+from jobs.models import Job, User
+
+
+class RequestMetricsTest(TestCase):
+
+    def setUp(self):
+        registry.reset()
+        self.employer = User.objects.create_user(username='acme', password='testpass123', is_employer=True)
+        self.job = Job.objects.create(employer=self.employer, title='Python Developer',
+                                      description='Role', location='Remote')
+
+    def test_records_per_view_histograms(self):
+        self.client.get(reverse('home'))
+        self.client.get(reverse('home'))
+        self.client.get(reverse('health_check'))
+
+        duration = registry.histogram('jobs_request_duration_seconds', 'home')
+        self.assertEqual(duration.count, 2)
+        self.assertGreater(duration.sum, 0)
+        self.assertEqual(registry.histogram('jobs_request_template_seconds', 'home').count, 2)
+        self.assertGreater(registry.histogram('jobs_request_db_queries', 'home').sum, 0)
+        self.assertGreater(registry.histogram('jobs_response_size_bytes', 'home').sum, 1000)
+        # Plain HttpResponse views have no template time
+        self.assertEqual(registry.histogram('jobs_request_db_queries', 'health_check').sum, 1)
+        self.assertIsNone(registry.histogram('jobs_request_template_seconds', 'health_check'))
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_prometheus_endpoint(self):
+        self.client.get(reverse('job_detail', args=[self.job.slug]))
+        self.client.get('/no-such-page/')
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        body = response.content.decode()
+        self.assertIn('# TYPE jobs_request_duration_seconds histogram', body)
+        self.assertIn('jobs_request_duration_seconds_bucket{view="job_detail",le="+Inf"} 1', body)
+        self.assertIn('jobs_request_duration_seconds_count{view="job_detail"} 1', body)
+        self.assertIn('jobs_http_responses_total{view="<unresolved>",status="4xx"} 1', body)
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_token_protects_the_endpoint(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_endpoint_is_hidden_without_a_token(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 200)
+
+    @override_settings(METRICS_SLOW_REQUEST_MS=0.001)
+    def test_slow_requests_are_logged_with_sql(self):
+        with self.assertLogs('jobs.slow_requests', 'WARNING') as logs:
+            self.client.get(reverse('job_detail', args=[self.job.slug]))
+        self.assertIn('Slow request: GET /job/python-developer/ (job_detail)', logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_can_be_disabled(self):
+        self.client.get(reverse('home'))
+        self.assertIsNone(registry.histogram('jobs_request_duration_seconds', 'home'))
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram((1, 5))
+        for value in (0, 1, 3, 10):
+            histogram.observe(value)
+        self.assertEqual(list(histogram.cumulative()), [(1, 2), (5, 3), (float('inf'), 4)])
@@ -0,0 +1,97 @@
+"""
+Tests for MinHash near-duplicate detection (jobs/minhash.py), the similar
+jobs panel and the admin near-duplicate report.
+"""
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+
+from jobs import minhash
+from jobs.models import Job, JobSignature, JobSignatureBand, User
+
+POSTING = (
+    'We are hiring a backend engineer to design and operate the payment APIs that power checkout '
+    'for millions of customers. You will own services written in Python and Django, tune PostgreSQL '
+    'queries, and work with product managers on the roadmap for fraud detection and billing.'
+)
+DESIGN = (
+    'Our brand studio needs a visual designer for campaigns, packaging and social media. '
+    'Figma, typography, illustration and a portfolio of shipped work are essential.'
+)
+
+
+class MinHashTest(TestCase):
+
+    def setUp(self):
+        self.employer = User.objects.create_user(username='acme', password='testpass123', is_employer=True,
+                                                 company_name='Acme')
+
+    def add_job(self, description, title='Backend Engineer', **kwargs):
+        return Job.objects.create(employer=self.employer, title=title, description=description,
+                                  location='Remote', **kwargs)
+
+    def test_signature_estimates_jaccard_similarity(self):
+        original = minhash.signature(POSTING)
+        repost = minhash.signature(POSTING.replace('millions of', 'many'))
+        self.assertEqual(len(original), minhash.PERMUTATIONS * 4)
+        self.assertGreater(minhash.similarity(original, repost), 0.7)
+        self.assertLess(minhash.similarity(original, minhash.signature(DESIGN)), 0.1)
+        self.assertEqual(minhash.signature('  '), b'')
+
+    def test_pure_python_signature_matches_numpy(self):
+        expected = minhash.signature(POSTING)
+        with mock.patch.object(minhash, 'np', None):
+            self.assertEqual(minhash.signature(POSTING), expected)
+
+    def test_signals_maintain_signature_and_bands(self):
+        job = self.add_job(POSTING)
+        self.assertEqual(bytes(job.signature.minhash), minhash.signature(POSTING))
+        self.assertEqual(JobSignatureBand.objects.filter(job=job).count(), minhash.BANDS)
+
+        job.description = DESIGN
+        job.save()
+        buckets = set(JobSignatureBand.objects.filter(job=job).values_list('band', 'bucket'))
+        self.assertEqual(buckets, set(minhash.bands(minhash.signature(DESIGN))))
+
+        job.delete()
+        self.assertFalse(JobSignature.objects.exists() or JobSignatureBand.objects.exists())
+
+    def test_similar_jobs(self):
+        job = self.add_job(POSTING)
+        repost = self.add_job(POSTING + ' Remote friendly.')
+        self.add_job(DESIGN, title='Designer')
+        self.add_job(POSTING, is_active=False)
+        self.assertEqual(list(minhash.similar_jobs(job)), [repost])
+        self.assertEqual(minhash.similar_jobs(job)[0].shared_bands, minhash.similar_jobs(repost)[0].shared_bands)
+
+    def test_near_duplicate_groups(self):
+        first = self.add_job(POSTING)
+        second = self.add_job(POSTING.replace('millions of', 'many'))
+        third = self.add_job(POSTING)
+        self.add_job(DESIGN, title='Designer')
+        self.add_job(DESIGN, title='Designer', is_active=False)
+        self.assertEqual(minhash.near_duplicate_groups(threshold=0.7), [[first.pk, second.pk, third.pk]])
+        self.assertEqual(len(minhash.near_duplicate_groups(threshold=0.7, active_only=False)), 2)
+
+    def test_rebuild(self):
+        job = self.add_job(POSTING)
+        JobSignature.objects.all().delete()
+        JobSignatureBand.objects.all().delete()
+        self.assertEqual(minhash.rebuild(), 1)
+        self.assertEqual(bytes(JobSignature.objects.get(job=job).minhash), minhash.signature(POSTING))
+
+    def test_detail_page_panel_and_admin_report(self):
+        job = self.add_job(POSTING)
+        repost = self.add_job(POSTING, title='Backend Engineer (Payments)')
+        response = self.client.get(reverse('job_detail', args=[job.slug]))
+        self.assertContains(response, 'Similar Jobs')
+        self.assertContains(response, reverse('job_detail', args=[repost.slug]))
+
+        admin = User.objects.create_superuser(username='admin', password='testpass123', email='a@example.com')
+        self.client.force_login(admin)
+        response = self.client.get(reverse('admin:jobs_job_near_duplicates'))
+        self.assertEqual([[j.pk for j in group] for group in response.context['groups']], [[job.pk, repost.pk]])
+        self.assertContains(response, repost.slug)
+        self.assertContains(self.client.get(reverse('admin:jobs_job_changelist')),
+                            reverse('admin:jobs_job_near_duplicates'))
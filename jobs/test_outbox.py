@@ -0,0 +1,153 @@
+"""
+Tests for the notification email outbox.
+"""
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from smtplib import SMTPServerDisconnected
+from unittest import mock
+
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs.benchmarking import make_pdf
+from jobs.models import Job, OutboundEmail, User
+from jobs.outbox import queue_email
+
+
+class RecordingBackend(EmailBackend):
+    """
+    locmem backend that records which connection delivered each message and
+    how many sessions were opened and closed, like the SMTP backend would.
+    """
+    instances = []
+    opened = closed = 0
+    fail_next = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.session = False
+
+    def open(self):
+        if self.session:
+            return False
+        RecordingBackend.opened += 1
+        self.session = True
+        return True
+
+    def close(self):
+        if self.session:
+            RecordingBackend.closed += 1
+            self.session = False
+
+    def send_messages(self, messages):
+        if RecordingBackend.fail_next:
+            RecordingBackend.fail_next = False
+            raise SMTPServerDisconnected('dropped')
+        # Like SMTP: without an open session each call connects on its own
+        opened = self.open()
+        RecordingBackend.instances.extend(id(self) for _ in messages)
+        try:
+            return super().send_messages(messages)
+        finally:
+            if opened:
+                self.close()
+
+    @classmethod
+    def reset(cls):
+        cls.instances = []
+        cls.opened = cls.closed = 0
+        cls.fail_next = False
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class EmailOutboxTest(TestCase):
+
+    def drain(self, **options):
+        call_command('send_queued_emails', once=True, stdout=StringIO(), stderr=StringIO(), **options)
+
+    def test_apply_queues_notifications_without_sending(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        employer = User.objects.create_user(username='acme', email='hr@acme.test',
+                                            password='testpass123', is_employer=True)
+        seeker = User.objects.create_user(username='sam', email='sam@example.com',
+                                          password='testpass123', is_seeker=True)
+        job = Job.objects.create(employer=employer, title='Analyst', description='Numbers', location='Remote')
+
+        self.client.force_login(seeker)
+        with self.settings(MEDIA_ROOT=media_root):
+            self.client.post(reverse('apply_job', args=[job.slug]), {
+                'resume': SimpleUploadedFile('resume.pdf', make_pdf('Resume'), 'application/pdf'),
+                'cover_letter': 'Hi',
+            })
+
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(
+            sorted(OutboundEmail.objects.values_list('recipients', flat=True)),
+            [['hr@acme.test'], ['sam@example.com']],
+        )
+
+        self.drain()
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['hr@acme.test', 'sam@example.com'])
+        self.assertFalse(OutboundEmail.objects.exclude(status='sent').exists())
+
+    @override_settings(EMAIL_BACKEND='jobs.test_outbox.RecordingBackend')
+    def test_worker_reuses_one_connection(self):
+        for n in range(5):
+            queue_email(f'Hello {n}', 'Body', [f'user{n}@example.com'])
+        RecordingBackend.reset()
+        self.drain(batch_size=2)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(len(RecordingBackend.instances), 5)
+        self.assertEqual(len(set(RecordingBackend.instances)), 1)
+        # One session per batch of two: 2 + 2 + 1
+        self.assertEqual(RecordingBackend.opened, 3)
+        self.assertEqual(RecordingBackend.closed, 3)
+
+    @override_settings(EMAIL_BACKEND='jobs.test_outbox.RecordingBackend')
+    def test_worker_reconnects_after_a_dropped_session(self):
+        for n in range(3):
+            queue_email(f'Hello {n}', 'Body', [f'user{n}@example.com'])
+        RecordingBackend.reset()
+        RecordingBackend.fail_next = True
+        self.drain(batch_size=3)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(OutboundEmail.objects.filter(status='sent').count(), 2)
+        # The failed send closes the first session; the next message reopens it
+        self.assertEqual(RecordingBackend.opened, 2)
+        self.assertEqual(RecordingBackend.closed, 2)
+
+    def test_failures_retry_with_backoff_then_give_up(self):
+        email = queue_email('Hello', 'Body', ['user@example.com'])
+        with mock.patch.object(EmailBackend, 'send_messages', side_effect=SMTPServerDisconnected('gone')):
+            before = timezone.now()
+            self.drain(max_attempts=2, backoff=10)
+            email.refresh_from_db()
+            self.assertEqual(email.status, 'queued')
+            self.assertEqual(email.attempts, 1)
+            self.assertGreaterEqual(email.run_after, before + timedelta(seconds=10))
+
+            OutboundEmail.objects.update(run_after=timezone.now())
+            self.drain(max_attempts=2, backoff=10)
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'failed')
+        self.assertIn('gone', email.last_error)
+
+    def test_rate_limit_spaces_out_sends(self):
+        for n in range(3):
+            queue_email(f'Hello {n}', 'Body', [f'user{n}@example.com'])
+        with mock.patch('jobs.management.commands.send_queued_emails.time.sleep') as sleep:
+            self.drain(rate=2)
+        # The clock does not advance while sleep is mocked, so waits accumulate
+        delays = [call.args[0] for call in sleep.call_args_list]
+        self.assertEqual(len(delays), 2)
+        self.assertAlmostEqual(delays[0], 0.5, places=1)
+        self.assertAlmostEqual(delays[1], 1.0, places=1)
+        self.assertEqual(len(mail.outbox), 3)
@@ -0,0 +1,120 @@
+"""
+Tests for the cursor pagination mode of the job feed.
+"""
+from datetime import timedelta
+from urllib.parse import parse_qs, urlparse
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs.models import Category, Job, User
+from jobs.pagination import CursorPaginator, decode_cursor, encode_cursor
+
+
+@override_settings(JOB_FEED_PAGINATION='cursor')
+class CursorPaginationTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        employer = User.objects.create_user(username='acme', password='testpass123', is_employer=True)
+        cls.category = Category.objects.create(name='Engineering', slug='engineering')
+        Job.objects.bulk_create([
+            Job(employer=employer, title=f'Job {n}', slug=f'job-{n}', description='Role',
+                location='Remote' if n % 2 else 'Berlin', category=cls.category if n % 3 == 0 else None)
+            for n in range(35)
+        ])
+        # Give some jobs identical timestamps, so ties are broken by id
+        now = timezone.now()
+        for job in Job.objects.all():
+            Job.objects.filter(pk=job.pk).update(created_at=now - timedelta(minutes=job.pk // 3))
+        cls.expected = list(Job.objects.order_by('-created_at', '-id').values_list('title', flat=True))
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, **params):
+        return self.client.get(reverse('home'), params)
+
+    def follow(self, response, key):
+        url = response.context[key]
+        self.assertTrue(url)
+        return self.get(**{k: v[0] for k, v in parse_qs(urlparse(url).query).items()})
+
+    def titles(self, response):
+        return [job.title for job in response.context['jobs']]
+
+    def test_walks_every_job_forwards_and_back(self):
+        response = self.get()
+        pages = [self.titles(response)]
+        self.assertFalse(response.context['previous_page_url'])
+        while response.context['next_page_url']:
+            response = self.follow(response, 'next_page_url')
+            pages.append(self.titles(response))
+        self.assertEqual(response.context['page_obj'].number, 4)
+        self.assertEqual([title for page in pages for title in page], self.expected)
+
+        back = []
+        while response.context['previous_page_url']:
+            response = self.follow(response, 'previous_page_url')
+            back.append(self.titles(response))
+        self.assertEqual(back, pages[-2::-1])
+        self.assertEqual(response.context['page_obj'].number, 1)
+
+    def test_deep_pages_cost_the_same_as_the_first(self):
+        response = self.get()
+        counts = []
+        while True:
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(reverse('home'), {'cursor': response.context['page_obj'].next_cursor}
+                                           if counts else {})
+            counts.append(len(ctx.captured_queries))
+            if not response.context['page_obj'].has_next():
+                break
+        self.assertEqual(len(set(counts[1:])), 1, counts)
+        self.assertLessEqual(counts[-1], counts[0])
+        # No OFFSET; the total count comes from the cache after the first page
+        self.assertNotIn('OFFSET', ' '.join(q['sql'] for q in ctx.captured_queries))
+        self.assertNotIn('__count', ' '.join(q['sql'] for q in ctx.captured_queries))
+
+    def test_links_keep_filters(self):
+        response = self.get(location='Remote')
+        self.assertEqual(response.context['page_obj'].paginator.count, 17)
+        next_page = self.follow(response, 'next_page_url')
+        self.assertIn('location=Remote', response.context['next_page_url'])
+        self.assertTrue(all(job.location == 'Remote' for job in next_page.context['jobs']))
+
+    def test_garbled_cursor_shows_first_page(self):
+        response = self.get(cursor='not-a-cursor')
+        self.assertEqual(self.titles(response), self.expected[:10])
+
+    def test_cursor_round_trip(self):
+        created_at = timezone.now()
+        self.assertEqual(decode_cursor(encode_cursor(created_at, 7, 'prev', 3)), (created_at, 7, 'prev', 3))
+
+    def test_paginator_on_filtered_queryset(self):
+        queryset = Job.objects.filter(category=self.category)
+        page = CursorPaginator(queryset, 8).page()
+        second = CursorPaginator(queryset, 8).page(page.next_cursor)
+        self.assertEqual(len(page) + len(second), 12)
+        self.assertFalse(second.has_next())
+
+
+class OffsetPaginationTest(TestCase):
+
+    def setUp(self):
+        employer = User.objects.create_user(username='acme', password='testpass123', is_employer=True)
+        for n in range(12):
+            Job.objects.create(employer=employer, title=f'Python Job {n}', description='Role', location='Remote')
+
+    @override_settings(JOB_FEED_PAGINATION='cursor')
+    def test_search_keeps_offset_pagination(self):
+        response = self.client.get(reverse('home'), {'query': 'python'})
+        self.assertEqual(response.context['next_page_url'], '?query=python&page=2')
+
+    def test_page_links_keep_filters(self):
+        response = self.client.get(reverse('home'), {'location': 'Remote'})
+        self.assertEqual(response.context['next_page_url'], '?location=Remote&page=2')
@@ -0,0 +1,135 @@
+"""
+Query budgets for every view in jobs/urls.py.
+
+Each URL has a pinned maximum query count, and listing pages must not issue
+more queries as rows are added. A new URL without a budget fails
+test_every_url_has_a_budget.
+"""
+import tempfile
+from itertools import count
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from jobs import recommendations, urls
+from jobs.models import Application, Category, Job, User
+from jobs.query_budget import QueryBudgetMixin
+
+# url name -> maximum queries for a GET, including session and user lookups
+BUDGETS = {
+    'home': 6,  # 5 when not searching; facet counts are one grouped query, plus the feed generation
+    'company_list': 1,
+    'company_detail': 2,
+    'health_check': 1,
+    'metrics': 0,
+    'job_detail': 5,  # 4 while the similar-jobs panel is cached
+    'apply_job': 2,
+    'recommended_jobs': 4,
+    'employer_dashboard': 3,
+    'post_job': 3,
+    'update_job': 4,
+    'job_applications': 4,
+    'job_autocomplete': 0,
+}
+
+_serial = count()
+
+
+# Budgets are for a cold cache (e.g. right after a Job change)
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+class QueryBudgetTest(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = User.objects.create_user(username='acme', password='testpass123',
+                                                is_employer=True, company_name='Acme')
+        cls.seeker = User.objects.create_user(username='sam', password='testpass123', is_seeker=True)
+        cls.category = Category.objects.create(name='Engineering', slug='engineering')
+        cls.job = Job.objects.create(employer=cls.employer, category=cls.category, title='Python Engineer',
+                                     description='Build things', location='Remote')
+
+    def add_rows(self, n=5):
+        """Adds n of everything a listing page could show."""
+        for _ in range(n):
+            i = next(_serial)
+            employer = User.objects.create_user(username=f'employer{i}', is_employer=True,
+                                                company_name=f'Company {i}')
+            category = Category.objects.create(name=f'Category {i}', slug=f'category-{i}')
+            seeker = User.objects.create_user(username=f'seeker{i}', is_seeker=True)
+            for owner in (employer, self.employer):
+                Job.objects.create(employer=owner, category=category, title=f'Python Engineer {i}',
+                                   description='Build things', location='Remote')
+            Application.objects.create(job=self.job, applicant=seeker, resume='resumes/cv.pdf')
+
+    def check(self, name, url, data=None, user=None):
+        if user:
+            self.client.force_login(user)
+        # Warm per-process caches (search and autocomplete indexes) first
+        self.fetch(url, data)
+        self.assertConstantQueries(url, self.add_rows, data)
+        self.assertQueryBudget(BUDGETS[name], url, data)
+
+    def test_every_url_has_a_budget(self):
+        names = {pattern.name for pattern in urls.urlpatterns}
+        self.assertEqual(names - set(BUDGETS), set(), 'Add a query budget for the new URL(s)')
+
+    def test_home(self):
+        self.check('home', reverse('home'))
+
+    def test_home_filtered(self):
+        self.check('home', reverse('home'), {'category': 'engineering', 'location': 'remote'})
+
+    def test_home_faceted(self):
+        self.check('home', reverse('home'), {'job_type': ['FT', 'CT'], 'salary': ['80-120', '160+'],
+                                             'category': ['engineering', 'design'], 'salary_min': '60000'})
+
+    def test_home_search(self):
+        self.check('home', reverse('home'), {'query': 'python'})
+
+    def test_company_list(self):
+        self.check('company_list', reverse('company_list'))
+
+    def test_company_detail(self):
+        self.check('company_detail', reverse('company_detail', args=[self.employer.pk]))
+
+    def test_health_check(self):
+        self.check('health_check', reverse('health_check'))
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_metrics(self):
+        self.client.defaults['HTTP_AUTHORIZATION'] = 'Bearer s3cret'
+        self.check('metrics', reverse('metrics'))
+
+    def test_job_detail(self):
+        self.check('job_detail', reverse('job_detail', args=[self.job.slug]), user=self.seeker)
+
+    def test_apply_job(self):
+        self.check('apply_job', reverse('apply_job', args=[self.job.slug]), user=self.seeker)
+
+    def test_employer_dashboard(self):
+        self.check('employer_dashboard', reverse('employer_dashboard'), user=self.employer)
+
+    def test_post_job(self):
+        self.check('post_job', reverse('post_job'), user=self.employer)
+
+    def test_recommended_jobs(self):
+        Application.objects.create(job=self.job, applicant=self.seeker, resume='resumes/cv.pdf')
+        with tempfile.TemporaryDirectory() as index_dir, override_settings(RECOMMENDATIONS_INDEX_DIR=index_dir):
+            recommendations.reset_index()
+            try:
+                self.check('recommended_jobs', reverse('recommended_jobs'), user=self.seeker)
+            finally:
+                recommendations.reset_index()
+
+    def test_update_job(self):
+        self.check('update_job', reverse('update_job', args=[self.job.slug]), user=self.employer)
+
+    def test_job_applications(self):
+        self.check('job_applications', reverse('job_applications', args=[self.job.slug]), user=self.employer)
+
+    def test_job_applications_by_match(self):
+        self.check('job_applications', reverse('job_applications', args=[self.job.slug]), {'sort': 'match'},
+                   user=self.employer)
+
+    def test_job_autocomplete(self):
+        self.check('job_autocomplete', reverse('job_autocomplete'), {'term': 'pyt'})
@@ -0,0 +1,120 @@
+"""
+Tests for the recommended-jobs index (jobs/recommendations.py) and page.
+"""
+import os
+import tempfile
+from unittest import mock
+
+import numpy as np
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from jobs import recommendations
+from jobs.models import Application, Job, User
+
+TOPICS = {
+    'python': 'Python Django PostgreSQL backend APIs',
+    'design': 'Figma illustration branding typography',
+    'sales': 'Quota pipeline prospecting negotiation CRM',
+}
+
+
+class RecommendationIndexTest(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.override = override_settings(RECOMMENDATIONS_INDEX_DIR=self.tmpdir.name)
+        self.override.enable()
+        recommendations.reset_index()
+        self.employer = User.objects.create_user(username='acme', password='testpass123', is_employer=True)
+        self.seeker = User.objects.create_user(username='sam', password='testpass123', is_seeker=True)
+
+    def tearDown(self):
+        recommendations.reset_index()
+        self.override.disable()
+        self.tmpdir.cleanup()
+
+    def add_job(self, topic, n=0, **kwargs):
+        return Job.objects.create(employer=self.employer, title=f'{topic.title()} role {n}', location='Remote',
+                                  description=f'{TOPICS[topic]} team {n}', **kwargs)
+
+    def test_similar_text_is_closer(self):
+        python = recommendations.embed([('Senior Python Developer', 2.0), (TOPICS['python'], 1.0)])
+        backend = recommendations.embed([('Backend Engineer', 2.0), ('Python and Django APIs', 1.0)])
+        designer = recommendations.embed([('Designer', 2.0), (TOPICS['design'], 1.0)])
+        self.assertAlmostEqual(float(np.linalg.norm(python)), 1.0, places=5)
+        self.assertGreater(python @ backend, python @ designer)
+        self.assertFalse(recommendations.embed([('the and of', 1.0)]).any())
+
+    def test_recommends_jobs_like_the_applied_ones(self):
+        applied = self.add_job('python')
+        python = self.add_job('python', 1)
+        self.add_job('design', 1)
+        self.add_job('python', 2, is_active=False)
+        Application.objects.create(job=applied, applicant=self.seeker, resume='resumes/cv.pdf')
+
+        jobs = recommendations.recommend_jobs(self.seeker, k=2)
+        self.assertEqual(jobs[0], python)
+        self.assertNotIn(applied, jobs)
+        self.assertEqual(len(jobs), 2)
+        self.assertEqual(recommendations.recommend_jobs(User.objects.create_user(username='new')), [])
+
+    def test_signals_update_the_shared_files(self):
+        index = recommendations.get_index()
+        self.assertEqual(len(index), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            job = self.add_job('sales')
+        # Another worker maps the same files
+        other = recommendations.RecommendationIndex(self.tmpdir.name)
+        query = recommendations.embed_job(job)
+        self.assertEqual(other.search(query, k=1)[0][0], job.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            job.is_active = False
+            job.save()
+        self.assertEqual(other.search(query, k=1), [])
+        self.assertEqual(len(index), 0)
+
+    def test_appends_past_capacity(self):
+        with mock.patch.object(recommendations, '_MIN_CAPACITY', 2):
+            index = recommendations.get_index()
+            index.rebuild()
+            jobs = []
+            with self.captureOnCommitCallbacks(execute=True):
+                for n in range(5):
+                    jobs.append(self.add_job(('python', 'design', 'sales')[n % 3], n))
+        self.assertEqual(len(index), 5)
+        self.assertGreaterEqual(index.manifest['capacity'], 5)
+        self.assertEqual(index.search(recommendations.embed_job(jobs[3]), k=1)[0][0], jobs[3].pk)
+        # Old generations are cleaned up
+        self.assertEqual(len([name for name in os.listdir(self.tmpdir.name) if name.startswith('vectors-')]), 1)
+
+    def test_clustered_index_finds_what_the_exact_one_does(self):
+        jobs = [self.add_job(topic, n) for n in range(20) for topic in TOPICS]
+        query = recommendations.embed_job(jobs[0])
+        index = recommendations.get_index()
+        index.rebuild()
+        exact = index.search(query, k=5)
+
+        with override_settings(RECOMMENDATIONS_EXACT_MAX=10, RECOMMENDATIONS_NPROBE=3):
+            index.rebuild()
+            self.assertTrue(index.manifest['clustered'])
+            self.assertEqual(len(index.centroids), 7)
+            self.assertEqual(index.search(query, k=1)[0][0], jobs[0].pk)
+            # Probing every cluster is exact (up to the order of equally similar jobs)
+            with override_settings(RECOMMENDATIONS_NPROBE=100):
+                self.assertEqual([round(score, 5) for _, score in index.search(query, k=5)],
+                                 [round(score, 5) for _, score in exact])
+
+    def test_recommended_page(self):
+        applied = self.add_job('design')
+        similar = self.add_job('design', 1)
+        Application.objects.create(job=applied, applicant=self.seeker, resume='resumes/cv.pdf',
+                                   parsed_text='Brand designer, typography and illustration')
+        self.client.force_login(self.seeker)
+        response = self.client.get(reverse('recommended_jobs'))
+        self.assertEqual(list(response.context['jobs']), [similar])
+        self.assertContains(response, similar.title)
+
+        self.client.force_login(self.employer)
+        self.assertEqual(self.client.get(reverse('recommended_jobs')).status_code, 403)
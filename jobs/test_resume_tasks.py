@@ -0,0 +1,277 @@
+"""
+Tests for the background resume parsing queue.
+"""
+import hashlib
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs import resume_cache, tasks
+from jobs.benchmarking import make_pdf
+from jobs.models import Application, Job, ResumeParseTask, ResumeTextCache, User
+from jobs.utils import PDF_PROFILES, parse_pdf_text_with_pages
+
+
+class ResumeParseQueueTest(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root, RESUME_PARSE_ASYNC=True)
+        self.override.enable()
+
+        self.employer = User.objects.create_user(
+            username='acme', email='hr@acme.test', password='testpass123', is_employer=True
+        )
+        self.seeker = User.objects.create_user(
+            username='sam', email='sam@example.com', password='testpass123', is_seeker=True
+        )
+        self.job = Job.objects.create(employer=self.employer, title='Analyst',
+                                      description='Numbers', location='Remote')
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def apply(self, filename='resume.pdf', content=None):
+        self.client.force_login(self.seeker)
+        resume = SimpleUploadedFile(filename, content or make_pdf('Hello Resume'), 'application/pdf')
+        return self.client.post(reverse('apply_job', args=[self.job.slug]),
+                                {'resume': resume, 'cover_letter': 'Hi'})
+
+    def test_apply_queues_parse_without_parsing_inline(self):
+        with mock.patch('jobs.views.extract_text_from_pdf') as extract:
+            response = self.apply()
+        self.assertEqual(response.status_code, 302)
+        extract.assert_not_called()
+
+        application = Application.objects.get()
+        self.assertEqual(application.parse_status, 'pending')
+        self.assertEqual(application.parsed_text, '')
+        self.assertEqual(application.parse_task.status, 'queued')
+
+    def test_non_pdf_is_skipped(self):
+        self.apply(filename='resume.txt', content=b'plain text')
+        application = Application.objects.get()
+        self.assertEqual(application.parse_status, 'skipped')
+        self.assertFalse(ResumeParseTask.objects.exists())
+
+    def test_upload_is_hashed_while_streaming_to_disk(self):
+        pdf = make_pdf('Streamed Resume')
+        with mock.patch('jobs.resume_cache.file_sha256') as rehash:
+            self.apply(content=pdf)
+        rehash.assert_not_called()
+        application = Application.objects.get()
+        self.assertEqual(application.resume_sha256, hashlib.sha256(pdf).hexdigest())
+
+    def test_pdf_extension_without_pdf_content_is_skipped(self):
+        self.apply(filename='resume.pdf', content=b'MZ\x90\x00 not a pdf')
+        application = Application.objects.get()
+        self.assertEqual(application.parse_status, 'skipped')
+        self.assertFalse(ResumeParseTask.objects.exists())
+
+    def test_worker_parses_queued_resume(self):
+        self.apply()
+        call_command('process_resume_queue', '--once', '--workers=1', stdout=StringIO(), stderr=StringIO())
+
+        application = Application.objects.get()
+        self.assertEqual(application.parse_status, 'parsed')
+        self.assertIn('Hello Resume', application.parsed_text)
+        self.assertEqual(application.parse_task.status, 'done')
+
+    def test_failures_retry_with_backoff_then_give_up(self):
+        self.apply(content=b'%PDF-1.4 truncated')
+        task = tasks.claim_tasks(limit=5, lease_seconds=60)[0]
+        self.assertEqual(task.attempts, 1)
+
+        before = timezone.now()
+        tasks.fail_task(task, 'broken', max_attempts=2, backoff_seconds=10)
+        task.refresh_from_db()
+        self.assertEqual(task.status, 'queued')
+        self.assertGreaterEqual(task.run_after, before + timedelta(seconds=10))
+        self.assertEqual(tasks.claim_tasks(limit=5, lease_seconds=60), [])
+
+        ResumeParseTask.objects.update(run_after=timezone.now())
+        task = tasks.claim_tasks(limit=5, lease_seconds=60)[0]
+        tasks.fail_task(task, 'still broken', max_attempts=2, backoff_seconds=10)
+        task.refresh_from_db()
+        self.assertEqual(task.status, 'failed')
+        self.assertEqual(task.last_error, 'still broken')
+        self.assertEqual(task.application.parse_status, 'failed')
+
+    def test_expired_lease_is_reclaimed(self):
+        self.apply()
+        tasks.claim_tasks(limit=5, lease_seconds=60)
+        self.assertEqual(tasks.claim_tasks(limit=5, lease_seconds=60), [])
+
+        ResumeParseTask.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        reclaimed = tasks.claim_tasks(limit=5, lease_seconds=60)
+        self.assertEqual(len(reclaimed), 1)
+        self.assertEqual(reclaimed[0].attempts, 2)
+
+
+class ReparseResumesCommandTest(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+        employer = User.objects.create_user(username='acme', password='testpass123', is_employer=True)
+        job = Job.objects.create(employer=employer, title='Analyst', description='Numbers', location='Remote')
+        self.applications = []
+        for i in range(3):
+            seeker = User.objects.create_user(username=f'seeker{i}', password='testpass123')
+            content = make_pdf(f'Resume {i}') if i < 2 else b'corrupt'
+            self.applications.append(Application.objects.create(
+                job=job, applicant=seeker, parse_status='skipped',
+                resume=SimpleUploadedFile(f'resume{i}.pdf', content),
+            ))
+        self.checkpoint = f'{self.media_root}/reparse.checkpoint'
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def reparse(self, *args):
+        out = StringIO()
+        call_command('reparse_resumes', '--workers=2', '--chunk-size=2',
+                     f'--checkpoint={self.checkpoint}', *args, stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    def test_reparses_in_chunks_and_reports_throughput(self):
+        Application.objects.filter(pk=self.applications[2].pk).update(parsed_text='Earlier text')
+        with CaptureQueriesContext(connection) as queries:
+            output = self.reparse()
+        # Failed rows are written back without loading their deferred fields one by one
+        self.assertFalse([query['sql'] for query in queries if 'LIMIT 21' in query['sql']])
+        statuses = [Application.objects.get(pk=app.pk).parse_status for app in self.applications]
+        self.assertEqual(statuses, ['parsed', 'parsed', 'failed'])
+        self.assertEqual(Application.objects.get(pk=self.applications[2].pk).parsed_text, 'Earlier text')
+        self.assertIn('Resume 1', Application.objects.get(pk=self.applications[1].pk).parsed_text)
+        self.assertIn('files/sec', output)
+        self.assertIn('pages/sec', output)
+
+    def test_resumes_from_checkpoint(self):
+        with open(self.checkpoint, 'w') as f:
+            f.write('{"last_pk": %d, "files": 2, "pages": 2, "failed": 0}' % self.applications[1].pk)
+        self.reparse()
+        statuses = [Application.objects.get(pk=app.pk).parse_status for app in self.applications]
+        self.assertEqual(statuses, ['skipped', 'skipped', 'failed'])
+
+
+class ResumeTextCacheTest(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root, RESUME_PARSE_ASYNC=True)
+        self.override.enable()
+        resume_cache.reset_counters()
+        employer = User.objects.create_user(username='acme', password='testpass123', is_employer=True)
+        self.jobs = [
+            Job.objects.create(employer=employer, title=f'Role {i}', description='Work', location='Remote')
+            for i in range(2)
+        ]
+        self.seeker = User.objects.create_user(username='sam', password='testpass123', is_seeker=True)
+        self.client.force_login(self.seeker)
+        self.pdf = make_pdf('Cached Resume')
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def apply(self, job):
+        resume = SimpleUploadedFile('resume.pdf', self.pdf, 'application/pdf')
+        self.client.post(reverse('apply_job', args=[job.slug]), {'resume': resume, 'cover_letter': 'Hi'})
+        return Application.objects.get(job=job)
+
+    def test_repeat_upload_reuses_extracted_text(self):
+        first = self.apply(self.jobs[0])
+        self.assertEqual(first.parse_status, 'pending')
+        call_command('process_resume_queue', '--once', '--workers=1', stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(ResumeTextCache.objects.get().sha256, first.resume_sha256)
+
+        second = self.apply(self.jobs[1])
+        self.assertEqual(second.parse_status, 'parsed')
+        self.assertIn('Cached Resume', second.parsed_text)
+        self.assertFalse(ResumeParseTask.objects.filter(application=second).exists())
+
+        stats = resume_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 2))
+        self.assertEqual(stats['total_hits'], 1)
+
+    @override_settings(RESUME_REUSE_STORED_FILES=True, RESUME_PARSE_ASYNC=False)
+    def test_repeat_upload_can_reuse_stored_file(self):
+        first = self.apply(self.jobs[0])
+        second = self.apply(self.jobs[1])
+        self.assertEqual(second.resume.name, first.resume.name)
+
+    def test_evicts_least_recently_used(self):
+        now = timezone.now()
+        for i in range(4):
+            ResumeTextCache.objects.create(sha256=f'{i:064x}', text='x' * 10,
+                                           last_used_at=now - timedelta(minutes=10 - i))
+        resume_cache.lookup(f'{0:064x}')
+        self.assertEqual(resume_cache.evict(max_entries=3, max_bytes=20), 2)
+        self.assertEqual(sorted(ResumeTextCache.objects.values_list('sha256', flat=True)),
+                         [f'{0:064x}', f'{3:064x}'])
+
+    @override_settings(RESUME_TEXT_CACHE_MAX_ENTRIES=2, RESUME_TEXT_CACHE_EVICT_EVERY=5)
+    def test_stores_evict_every_few_calls(self):
+        resume_cache.store(f'{0:064x}', 'text')
+        resume_cache.store(f'{1:064x}', 'text')
+        # Over the limit, but not checked until the third store
+        with CaptureQueriesContext(connection) as queries:
+            resume_cache.store(f'{2:064x}', 'text')
+            resume_cache.store(f'{3:064x}', 'text')
+        self.assertFalse([query for query in queries if 'COUNT' in query['sql']])
+        self.assertEqual(ResumeTextCache.objects.count(), 4)
+        resume_cache.store(f'{4:064x}', 'text')
+        self.assertEqual(ResumeTextCache.objects.count(), 2)
+
+
+class PDFProfileTest(TestCase):
+
+    def setUp(self):
+        self.pdf = make_pdf([[f'Page {n} line one', f'Page {n} line two'] for n in range(1, 6)])
+
+    def test_accurate_profile_reads_every_page(self):
+        text, pages = parse_pdf_text_with_pages(self.pdf, 'accurate')
+        self.assertEqual(pages, 5)
+        self.assertIn('Page 5 line two', text)
+
+    def test_fast_profile_keeps_lines_and_words(self):
+        text, _ = parse_pdf_text_with_pages(self.pdf, 'fast')
+        self.assertIn('Page 1 line one\nPage 1 line two', text)
+
+    def test_fast_profile_stops_at_page_limit(self):
+        profile = PDF_PROFILES['fast']._replace(max_pages=2)
+        text, pages = parse_pdf_text_with_pages(self.pdf, profile)
+        self.assertEqual(pages, 2)
+        self.assertNotIn('Page 3', text)
+
+    def test_fast_profile_stops_at_character_limit(self):
+        profile = PDF_PROFILES['fast']._replace(max_chars=20)
+        text, pages = parse_pdf_text_with_pages(self.pdf, profile)
+        self.assertEqual(pages, 1)
+        self.assertEqual(len(text), 20)
+
+    def test_reads_files_from_disk_through_mmap(self):
+        with tempfile.NamedTemporaryFile(suffix='.pdf') as f:
+            f.write(self.pdf)
+            f.flush()
+            text, pages = parse_pdf_text_with_pages(f.name, 'accurate')
+        self.assertEqual(pages, 5)
+        self.assertIn('Page 3 line one', text)
+
+    @override_settings(RESUME_PARSE_PROFILE='fast', RESUME_PARSE_MAX_PAGES=1)
+    def test_settings_select_profile_and_caps(self):
+        self.assertEqual(parse_pdf_text_with_pages(self.pdf)[1], 1)
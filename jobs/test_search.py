@@ -0,0 +1,143 @@
+"""
+Tests for the full-text job search backends.
+"""
+from django.test import TestCase
+from django.urls import reverse
+
+from jobs import search
+from jobs.models import Job, User
+
+
+class InvertedIndexTest(TestCase):
+    """Unit tests for the pure-Python BM25 index."""
+
+    def setUp(self):
+        self.index = search.InvertedIndex()
+        self.index.add(1, {'title': 'Senior Python Developer', 'description': 'Django and APIs'})
+        self.index.add(2, {'title': 'Designer', 'description': 'Works with python developers'})
+        self.index.add(3, {'title': 'Accountant', 'description': 'Spreadsheets'})
+
+    def test_title_match_outranks_description_match(self):
+        ids = [doc_id for doc_id, _ in self.index.search(['python'])]
+        self.assertEqual(ids, [1, 2])
+
+    def test_all_tokens_must_match(self):
+        ids = [doc_id for doc_id, _ in self.index.search(['python', 'django'])]
+        self.assertEqual(ids, [1])
+
+    def test_last_token_matches_prefix(self):
+        ids = [doc_id for doc_id, _ in self.index.search(['spread'])]
+        self.assertEqual(ids, [3])
+
+    def test_remove(self):
+        self.index.remove(1)
+        ids = [doc_id for doc_id, _ in self.index.search(['python'])]
+        self.assertEqual(ids, [2])
+        self.assertEqual(len(self.index), 2)
+
+
+class SearchViewTestMixin:
+    """Shared HomeView search behaviour, run against each backend."""
+    backend_name = None
+
+    def setUp(self):
+        self.employer = User.objects.create_user(
+            username='acme', password='testpass123', is_employer=True, company_name='Acme Robotics'
+        )
+        self.python_job = Job.objects.create(
+            employer=self.employer, title='Senior Python Developer',
+            description='Build APIs', location='Remote',
+        )
+        self.other_job = Job.objects.create(
+            employer=self.employer, title='Office Manager',
+            description='Keeps the python developers happy', location='Berlin',
+        )
+
+    def search(self, **params):
+        response = self.client.get(reverse('home'), params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_ranks_title_matches_first(self):
+        response = self.search(query='python developer')
+        self.assertEqual(list(response.context['jobs']), [self.python_job, self.other_job])
+        self.assertEqual(response.context['page_obj'].paginator.count, 2)
+
+    def test_matches_company_name(self):
+        response = self.search(query='robotics')
+        self.assertEqual(response.context['page_obj'].paginator.count, 2)
+
+    def test_combines_with_location_filter(self):
+        response = self.search(query='python', location='berlin')
+        self.assertEqual(list(response.context['jobs']), [self.other_job])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.python_job.title = 'Rust Engineer'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.python_job.save()
+        self.assertEqual(list(self.search(query='rust').context['jobs']), [self.python_job])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.python_job.delete()
+        self.assertEqual(self.search(query='rust').context['page_obj'].paginator.count, 0)
+
+    def test_company_rename_is_reindexed(self):
+        self.employer.company_name = 'Globex'
+        self.employer.save()
+        self.assertEqual(self.search(query='globex').context['page_obj'].paginator.count, 2)
+        self.assertEqual(self.search(query='robotics').context['page_obj'].paginator.count, 0)
+
+    def test_pagination(self):
+        for i in range(12):
+            Job.objects.create(employer=self.employer, title=f'Python Tester {i}',
+                               description='QA', location='Remote')
+        response = self.search(query='tester')
+        self.assertEqual(response.context['page_obj'].paginator.count, 12)
+        self.assertEqual(len(response.context['jobs']), 10)
+        response = self.search(query='tester', page=2)
+        self.assertEqual(len(response.context['jobs']), 2)
+
+
+class SQLiteFTSSearchTest(SearchViewTestMixin, TestCase):
+
+    def setUp(self):
+        search.reset_backend()
+        super().setUp()
+        if not isinstance(search.get_backend(), search.SQLiteFTSSearchBackend):
+            self.skipTest('SQLite FTS5 search table is not available')
+
+    def tearDown(self):
+        search.reset_backend()
+
+
+class MemorySearchTest(SearchViewTestMixin, TestCase):
+
+    def setUp(self):
+        search.reset_backend()
+        with self.settings(SEARCH_BACKEND='memory'):
+            self.assertIsInstance(search.get_backend(), search.MemorySearchBackend)
+        super().setUp()
+
+    def tearDown(self):
+        search.reset_backend()
+
+    def test_count_and_page_share_one_filter_query(self):
+        backend = search.get_backend()
+        backend.rebuild(Job.objects.select_related('employer'))
+        results = backend.search('python', Job.objects.filter(is_active=True))
+        with self.assertNumQueries(1):
+            self.assertEqual(results.count(), 2)
+            self.assertEqual(results.ranked_ids(0, 10), [self.python_job.pk, self.other_job.pk])
+
+    def test_large_hit_list_is_filtered_in_one_query(self):
+        Job.objects.bulk_create([
+            Job(employer=self.employer, title=f'Python Tester {i}', description='QA',
+                location='Remote', slug=f'python-tester-{i}')
+            for i in range(search._IN_CHUNK_SIZE + 10)
+        ])
+        backend = search.get_backend()
+        backend.rebuild(Job.objects.select_related('employer'))
+        results = backend.search('python', Job.objects.exclude(pk=self.python_job.pk))
+        with self.assertNumQueries(1):
+            self.assertEqual(results.count(), search._IN_CHUNK_SIZE + 11)
+        self.assertNotIn(self.python_job.pk, results.ranked_ids(0, None))
@@ -0,0 +1,83 @@
+"""
+Tests for Job slug allocation.
+"""
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from jobs.models import Job, User
+
+
+class JobSlugTest(TestCase):
+
+    def setUp(self):
+        self.employer = User.objects.create_user(username='acme', password='testpass123', is_employer=True)
+
+    def create(self, title='Senior Python Developer', **kwargs):
+        return Job.objects.create(employer=self.employer, title=title, description='Role',
+                                  location='Remote', **kwargs)
+
+    def test_duplicate_titles_get_increasing_suffixes(self):
+        slugs = [self.create().slug for _ in range(12)]
+        self.assertEqual(slugs[:3], ['senior-python-developer', 'senior-python-developer-1',
+                                     'senior-python-developer-2'])
+        self.assertEqual(slugs[-1], 'senior-python-developer-11')
+
+    def test_similar_slugs_do_not_count_as_suffixes(self):
+        self.create(title='Senior Python Developer Remote')
+        self.assertEqual(self.create().slug, 'senior-python-developer')
+
+    def test_allocation_is_two_queries_regardless_of_collisions(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(Job._next_free_slug('senior-python-developer'), 'senior-python-developer')
+        for _ in range(20):
+            self.create()
+        with CaptureQueriesContext(connection) as ctx:
+            slug = Job._next_free_slug('senior-python-developer')
+        self.assertEqual(slug, 'senior-python-developer-20')
+        self.assertEqual(len(ctx.captured_queries), 2)
+
+    def test_suffix_search_reads_only_matching_slugs(self):
+        self.create()
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite query plan')
+        with CaptureQueriesContext(connection) as ctx:
+            Job._next_free_slug('senior-python-developer')
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {ctx.captured_queries[-1]['sql']}")
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        self.assertRegex(plan, r'SEARCH jobs_job USING (COVERING )?INDEX \S+ \(slug>\? AND slug<\?\)')
+
+    def test_retries_when_a_concurrent_insert_takes_the_slug(self):
+        self.create()
+        # Simulate a concurrent writer: the first allocation returns a slug that is already taken
+        real = Job._next_free_slug.__func__
+        calls = []
+
+        def racing(cls, base_slug):
+            calls.append(base_slug)
+            return 'senior-python-developer' if len(calls) == 1 else real(cls, base_slug)
+
+        with mock.patch.object(Job, '_next_free_slug', classmethod(racing)):
+            job = self.create()
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(job.slug, 'senior-python-developer-1')
+
+    def test_other_integrity_errors_are_not_retried(self):
+        with mock.patch('django.db.models.Model.save', side_effect=IntegrityError('NOT NULL')) as save:
+            with self.assertRaises(IntegrityError):
+                self.create()
+        save.assert_called_once()
+
+    def test_explicit_slug_is_kept(self):
+        self.assertEqual(self.create(slug='custom').slug, 'custom')
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_slug_allocation', count=30, legacy_count=10, stdout=out)
+        self.assertIn('senior-python-developer-29', out.getvalue())
+        self.assertFalse(Job.objects.exists())
@@ -0,0 +1,99 @@
+"""
+Tests for the serverless cold-start helpers.
+"""
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.template import engines
+from django.test import TestCase, override_settings
+
+from jobs import startup
+
+
+class EnsureMigratedTest(TestCase):
+
+    def setUp(self):
+        state_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(state_dir.cleanup)
+        override = override_settings(STARTUP_STATE_DIR=state_dir.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_disk_migrations(self):
+        migrations = startup.disk_migrations()
+        self.assertIn(('jobs', '0001_initial'), migrations)
+        self.assertIn(('auth', '0001_initial'), migrations)
+        self.assertNotIn(('jobs', '__init__'), migrations)
+        # The test database is fully migrated
+        self.assertEqual(startup.pending_migrations(migrations), set())
+
+    def test_checks_once_then_uses_the_marker(self):
+        with mock.patch('django.core.management.call_command') as migrate:
+            self.assertEqual(startup.ensure_migrated('check'), 'up-to-date')
+            with self.assertNumQueries(0):
+                self.assertEqual(startup.ensure_migrated('check'), 'cached')
+        migrate.assert_not_called()
+
+    def test_migrates_when_something_is_pending(self):
+        pending = {('jobs', '9999_future')}
+        with mock.patch.object(startup, 'pending_migrations', return_value=pending), \
+                mock.patch('django.core.management.call_command') as migrate:
+            self.assertEqual(startup.ensure_migrated('check'), 'migrated')
+        migrate.assert_called_once()
+
+    def test_new_migrations_change_the_fingerprint(self):
+        migrations = startup.disk_migrations()
+        self.assertNotEqual(
+            startup.migration_fingerprint(migrations),
+            startup.migration_fingerprint(migrations | {('jobs', '9999_future')}),
+        )
+
+    def test_off(self):
+        with mock.patch('django.core.management.call_command') as migrate:
+            self.assertEqual(startup.ensure_migrated('off'), 'off')
+        migrate.assert_not_called()
+
+
+class WarmupTest(TestCase):
+
+    def test_compiles_every_project_template(self):
+        self.assertEqual(startup.warmup(), len(startup.project_templates(engines['django'].engine)))
+        self.assertIn('jobs/includes/job_card.html', startup.project_templates(engines['django'].engine))
+
+    def test_parse_importtime(self):
+        output = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       118 |      83061 | django.urls\n'
+            'import time:       284 |      82836 |   django.urls.base\n'
+        )
+        self.assertEqual(startup.parse_importtime(output), [
+            ('django.urls', 118, 83061, 0),
+            ('django.urls.base', 284, 82836, 1),
+        ])
+
+    def test_profile_startup_command(self):
+        out = StringIO()
+        call_command('profile_startup', entry='json', top=3, stdout=out)
+        self.assertIn('Cold start of json', out.getvalue())
+        self.assertIn('json ', out.getvalue())
+
+    def test_templates_use_the_cached_loader(self):
+        loaders = engines['django'].engine.template_loaders
+        self.assertEqual([type(loader).__name__ for loader in loaders], ['Loader'])
+        self.assertEqual(type(loaders[0]).__module__, 'django.template.loaders.cached')
+
+    def test_warm_templates_command(self):
+        out = StringIO()
+        call_command('warm_templates', stdout=out)
+        self.assertIn('Compiled', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('warm_templates', 'jobs/missing.html', stdout=StringIO())
+
+    def test_benchmark_templates_command(self):
+        out = StringIO()
+        call_command('benchmark_templates', requests=2, jobs=10, stdout=out)
+        self.assertIn('cached+warmup', out.getvalue())
+        self.assertIn('account_login', out.getvalue())
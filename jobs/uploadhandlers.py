@@ -0,0 +1,38 @@
+"""
+Upload handler that streams files to disk while hashing them.
+
+Every upload goes to a temporary file chunk by chunk, so memory use per
+upload stays constant regardless of file size. While the chunks pass through
+we compute the SHA-256 and keep the leading bytes for content sniffing, so
+nothing has to re-read the file afterwards. FileSystemStorage then moves the
+temporary file into MEDIA_ROOT instead of copying it.
+"""
+import hashlib
+
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+
+MAGIC_BYTES_LENGTH = 8
+
+
+class HashingTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """
+    Adds ``sha256`` (hex digest) and ``magic_bytes`` (first bytes of the
+    content) attributes to every TemporaryUploadedFile it produces.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.digest = hashlib.sha256()
+        self.magic_bytes = b''
+
+    def receive_data_chunk(self, raw_data, start):
+        if len(self.magic_bytes) < MAGIC_BYTES_LENGTH:
+            self.magic_bytes += raw_data[:MAGIC_BYTES_LENGTH - len(self.magic_bytes)]
+        self.digest.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        file.sha256 = self.digest.hexdigest()
+        file.magic_bytes = self.magic_bytes
+        return file
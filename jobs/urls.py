@@ -1,8 +1,8 @@
 from django.urls import path
 from .views import (
     HomeView, JobDetailView, ApplyJobView, CompanyListView, CompanyDetailView,
-    EmployerDashboardView, PostJobView, UpdateJobView, JobApplicationsView,
-    job_autocomplete, health_check
+    EmployerDashboardView, PostJobView, UpdateJobView, JobApplicationsView, RecommendedJobsView,
+    job_autocomplete, health_check, metrics
 )
 
 urlpatterns = [
@@ -10,8 +10,10 @@ urlpatterns = [
     path('companies/', CompanyListView.as_view(), name='company_list'),
     path('companies/<int:pk>/', CompanyDetailView.as_view(), name='company_detail'),
     path('health/', health_check, name='health_check'),
+    path('metrics/', metrics, name='metrics'),
     path('job/<slug:slug>/', JobDetailView.as_view(), name='job_detail'),
     path('job/<slug:slug>/apply/', ApplyJobView.as_view(), name='apply_job'),
+    path('recommended/', RecommendedJobsView.as_view(), name='recommended_jobs'),
     
     # Employer URLs
     path('employer/dashboard/', EmployerDashboardView.as_view(), name='employer_dashboard'),
@@ -1,22 +1,202 @@
-from pdfminer.high_level import extract_text
+from collections import namedtuple
+from django.conf import settings
+from contextlib import contextmanager
+from functools import lru_cache
 import io
+import mmap
+import os
 
-def extract_text_from_pdf(pdf_file):
+# How resumes are turned into text:
+#   accurate - pdfminer's full layout analysis on every page (slowest, best reading order)
+#   fast     - no layout analysis, stops after max_pages pages / max_chars characters
+# A limit of 0 means unlimited.
+PDFProfile = namedtuple('PDFProfile', ['name', 'layout', 'max_pages', 'max_chars'])
+
+PDF_PROFILES = {
+    'accurate': PDFProfile('accurate', layout=True, max_pages=0, max_chars=0),
+    'fast': PDFProfile('fast', layout=False, max_pages=10, max_chars=50000),
+}
+
+def get_pdf_profile(name=None):
+    """
+    Resolves an extraction profile.
+    Args:
+        name: A PDF_PROFILES key, or None for settings.RESUME_PARSE_PROFILE.
+    Returns:
+        PDFProfile: The profile, with page/character caps overridden by
+        RESUME_PARSE_MAX_PAGES / RESUME_PARSE_MAX_CHARS when those are set.
+    """
+    profile = PDF_PROFILES[name or getattr(settings, 'RESUME_PARSE_PROFILE', 'accurate')]
+    max_pages = getattr(settings, 'RESUME_PARSE_MAX_PAGES', None)
+    max_chars = getattr(settings, 'RESUME_PARSE_MAX_CHARS', None)
+    if max_pages is not None:
+        profile = profile._replace(max_pages=max_pages)
+    if max_chars is not None:
+        profile = profile._replace(max_chars=max_chars)
+    return profile
+
+# pdfminer takes ~30ms to import; it is loaded on the first parse, not at startup
+@lru_cache(maxsize=None)
+def _fast_text_converter():
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LTChar, LTContainer
+
+    class FastTextConverter(TextConverter):
+        """
+        Writes characters in content-stream order without layout analysis.
+        Lines are broken on baseline jumps and words on horizontal gaps, which is
+        enough for search and matching on typical single-column resumes.
+        """
+
+        def receive_layout(self, ltpage):
+            last = None
+            for char in self._iter_chars(ltpage):
+                if last is not None:
+                    if abs(char.y0 - last.y0) > last.height / 2:
+                        self.write_text('\n')
+                    elif char.x0 - last.x1 > char.size * 0.25:
+                        self.write_text(' ')
+                self.write_text(char.get_text())
+                last = char
+            self.write_text('\n\f')
+
+        def _iter_chars(self, container):
+            for item in container:
+                if isinstance(item, LTChar):
+                    yield item
+                elif isinstance(item, LTContainer):
+                    yield from self._iter_chars(item)
+
+    return FastTextConverter
+
+class _MappedPDF(io.RawIOBase):
+    """
+    Read-only file object over a memory-mapped PDF. pdfminer seeks around the
+    file a lot; reads are served from the page cache without extra syscalls
+    or buffering the whole file in memory.
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            self._file.close()
+            raise
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def read(self, size=-1):
+        return self._map.read(None if size is None or size < 0 else size)
+
+    def readinto(self, buffer):
+        data = self._map.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        self._map.seek(offset, whence)
+        return self._map.tell()
+
+    def tell(self):
+        return self._map.tell()
+
+    def close(self):
+        if not self.closed:
+            self._map.close()
+            self._file.close()
+        super().close()
+
+@contextmanager
+def _open_pdf(source):
+    """Opens bytes, paths and Django File wrappers as something pdfminer accepts."""
+    if isinstance(source, (bytes, bytearray)):
+        yield io.BytesIO(source)
+        return
+    # Uploads streamed to disk by TemporaryFileUploadHandler have a path
+    if hasattr(source, 'temporary_file_path'):
+        source = source.temporary_file_path()
+    if isinstance(source, (str, os.PathLike)):
+        try:
+            fp = _MappedPDF(source)
+        except ValueError:
+            fp = open(source, 'rb')
+        with fp:
+            yield fp
+        return
+    # UploadedFile/FieldFile (and NamedTemporaryFile) wrap the real file
+    # object; pdfminer only accepts paths and io.IOBase instances
+    while not isinstance(source, io.IOBase) and hasattr(source, 'file'):
+        source.seek(0)
+        source = source.file
+    yield source
+
+def parse_pdf_text_with_pages(source, profile=None):
+    """
+    Extracts text from a PDF page by page, raising on failure.
+    Args:
+        source: A file path (read through a memory map), a binary file
+            object, a Django File, or the PDF bytes.
+        profile: A PDFProfile (or PDF_PROFILES key); defaults to get_pdf_profile().
+    Returns:
+        tuple: (text, page_count). Stops early once the profile's page or
+        character limit is reached.
+    """
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+
+    if not isinstance(profile, PDFProfile):
+        profile = get_pdf_profile(profile)
+    with _open_pdf(source) as fp, io.StringIO() as output:
+        rsrcmgr = PDFResourceManager(caching=True)
+        if profile.layout:
+            device = TextConverter(rsrcmgr, output, laparams=LAParams())
+        else:
+            device = _fast_text_converter()(rsrcmgr, output, laparams=None)
+        interpreter = PDFPageInterpreter(rsrcmgr, device)
+        pages = 0
+        for page in PDFPage.get_pages(fp, maxpages=profile.max_pages, caching=True):
+            interpreter.process_page(page)
+            pages += 1
+            if profile.max_chars and output.tell() >= profile.max_chars:
+                break
+        text = output.getvalue()
+        if profile.max_chars:
+            text = text[:profile.max_chars]
+        return text, pages
+
+def parse_pdf_text(source, profile=None):
+    """
+    Extracts text from a PDF, raising on failure.
+    Args:
+        source: A file path, a binary file object, or the PDF bytes.
+        profile: See parse_pdf_text_with_pages.
+    Returns:
+        str: The extracted text.
+    """
+    return parse_pdf_text_with_pages(source, profile)[0]
+
+def extract_text_from_pdf(pdf_file, profile=None):
     """
     Extracts text from a PDF file.
     Args:
         pdf_file: A Django UploadedFile object or a file path.
+        profile: See parse_pdf_text_with_pages.
     Returns:
         str: The extracted text or empty string on failure.
     """
     try:
-        # If it's an uploaded file (InMemoryUploadedFile or TemporaryUploadedFile)
-        if hasattr(pdf_file, 'read'):
-             # pdfminer extract_text expects a path or a binary file stream
-             text = extract_text(pdf_file)
-        else:
-             text = extract_text(pdf_file)
-        return text
+        # Works for uploaded files (InMemoryUploadedFile or TemporaryUploadedFile)
+        # and paths alike: pdfminer accepts a path or a binary file stream
+        return parse_pdf_text(pdf_file, profile)
     except Exception as e:
         print(f"Error extracting text from PDF: {e}")
         return ""
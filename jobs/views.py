@@ -3,11 +3,19 @@ from django.views.generic import ListView, DetailView, CreateView, UpdateView, T
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.urls import reverse_lazy
 from django.contrib import messages
-from django.core.mail import send_mail
 from django.conf import settings
-from django.db.models import Q, Count
+from django.core.files.storage import default_storage
+from django.db.models import Q, Count, OuterRef, QuerySet, Subquery
+from django.db.models.functions import Coalesce
 from .models import Job, Application, Category, User
 from .forms import JobForm, ApplicationForm, JobFilterForm
+from .search import search_jobs
+from .pagination import CountedPaginator, CursorPage, CursorPaginator
+from .counts import feed_count, generation
+from .facets import FeedFilters
+from .autocomplete import get_service as get_autocomplete_service
+from .metrics import registry as request_metrics
+from . import bitmaps, facets, matching, minhash, recommendations
 
 # Mixins for Role Access
 class EmployerRequiredMixin(UserPassesTestMixin):
@@ -20,14 +28,8 @@ class CompanyListView(ListView):
     context_object_name = 'employers'
 
     def get_queryset(self):
-        return (
-            User.objects.filter(is_employer=True)
-            .annotate(
-                open_jobs=Count('jobs', filter=Q(jobs__is_active=True), distinct=True),
-                total_jobs=Count('jobs', distinct=True),
-            )
-            .order_by('company_name', 'username')
-        )
+        # open_jobs/total_jobs are counter columns (see jobs/counters.py)
+        return User.objects.filter(is_employer=True).order_by('company_name', 'username')
 
 class CompanyDetailView(DetailView):
     model = User
@@ -35,13 +37,15 @@ class CompanyDetailView(DetailView):
     context_object_name = 'company'
 
     def get_queryset(self):
-        return User.objects.filter(is_employer=True).annotate(
-            open_jobs=Count('jobs', filter=Q(jobs__is_active=True), distinct=True)
-        )
+        return User.objects.filter(is_employer=True)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['jobs'] = Job.objects.filter(employer=self.object, is_active=True).order_by('-created_at')
+        context['jobs'] = (
+            Job.objects.filter(employer=self.object, is_active=True)
+            .select_related('category')
+            .order_by('-created_at')
+        )
         return context
 
 class SeekerRequiredMixin(UserPassesTestMixin):
@@ -57,25 +61,75 @@ class HomeView(ListView):
     paginate_by = 10
 
     def get_queryset(self):
-        queryset = Job.objects.filter(is_active=True).order_by('-created_at')
-        
-        # Simple search logic
-        query = self.request.GET.get('query')
-        location = self.request.GET.get('location')
-        category = self.request.GET.get('category')
-
-        if query:
-            queryset = queryset.filter(Q(title__icontains=query) | Q(description__icontains=query) | Q(employer__company_name__icontains=query))
-        if location:
-            queryset = queryset.filter(location__icontains=location)
-        if category:
-            queryset = queryset.filter(category__slug=category)
-            
+        queryset = (
+            Job.objects.filter(is_active=True)
+            .select_related('employer', 'category')
+            .order_by('-created_at', '-id')
+        )
+        # Text, location, multi-select facet and salary filters (see jobs/facets.py)
+        self.filters = FeedFilters.from_query_dict(self.request.GET)
+        # Read once: every cached count and facet table below is keyed on it
+        self.feed_generation = generation()
+        self.categories = list(Category.objects.all())
+        queryset = self.filters.apply(queryset)
+        index = bitmaps.get_index(feed_generation=self.feed_generation)
+        self.bitmap_index = index if index is not None and index.supports(self.filters) else None
+        if self.bitmap_index is not None and settings.JOB_FEED_PAGINATION != 'cursor':
+            # Candidates intersected in memory; only the page is fetched, by pk (see jobs/bitmaps.py)
+            return self.bitmap_index.search(self.filters.stored_selections(self.categories), queryset)
+        if self.filters.query:
+            # Ranked full-text search (see jobs/search.py), best match first
+            return search_jobs(self.filters.query, queryset)
+
         return queryset
 
+    def feed_count(self, results):
+        filters = self.filters.key()
+        return lambda: feed_count(results, filters, self.feed_generation)
+
+    def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs):
+        return CountedPaginator(queryset, per_page, count=self.feed_count(queryset), orphans=orphans,
+                                allow_empty_first_page=allow_empty_first_page, **kwargs)
+
+    def paginate_queryset(self, queryset, page_size):
+        # Ranked search results have no (created_at, id) order to key on
+        if settings.JOB_FEED_PAGINATION != 'cursor' or not isinstance(queryset, QuerySet):
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size, count=self.feed_count(queryset))
+        page = paginator.page(self.request.GET.get('cursor'))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def page_url(self, **params):
+        query = self.request.GET.copy()
+        for key in ('page', 'cursor'):
+            query.pop(key, None)
+        query.update(params)
+        return f'?{query.urlencode()}'
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['categories'] = Category.objects.all()
+        page = context['page_obj']
+        if page is not None:
+            # Page links keep the current filters, in either pagination mode
+            if isinstance(page, CursorPage):
+                context['next_page_url'] = page.has_next() and self.page_url(cursor=page.next_cursor)
+                context['previous_page_url'] = page.has_previous() and self.page_url(cursor=page.previous_cursor)
+            else:
+                context['next_page_url'] = page.has_next() and self.page_url(page=page.next_page_number())
+                context['previous_page_url'] = page.has_previous() and self.page_url(page=page.previous_page_number())
+        context['categories'] = self.categories
+        # Counts for every facet value: popcounts on the bitmap index, else one grouped query cached per search
+        context['facets'] = facets.facet_panel(
+            self.filters, Job.objects.filter(is_active=True), self.categories,
+            lambda name, value: facets.toggle_url(self.request.GET, name, value),
+            table=self.bitmap_index, feed_generation=self.feed_generation,
+        )
+        context['filters'] = self.filters
+        # Keep the other filters when the salary range form is submitted
+        context['salary_form_params'] = [
+            (key, value) for key, values in self.request.GET.lists() for value in values
+            if key not in ('salary_min', 'salary_max', 'page', 'cursor')
+        ]
         # Keep filter values in search bar
         context['current_query'] = self.request.GET.get('query', '')
         context['current_location'] = self.request.GET.get('location', '')
@@ -87,13 +141,21 @@ class JobDetailView(DetailView):
     template_name = 'jobs/job_detail.html'
     context_object_name = 'job'
 
+    def get_queryset(self):
+        return super().get_queryset().select_related('employer', 'category')
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         if self.request.user.is_authenticated:
             context['has_applied'] = Application.objects.filter(job=self.object, applicant=self.request.user).exists()
+        # Lazy: only runs when the cached panel has expired
+        context['similar_jobs'] = minhash.similar_jobs(self.object)
         return context
 
 from .utils import extract_text_from_pdf
+from .tasks import enqueue_resume_parse, is_pdf
+from .outbox import queue_email
+from . import resume_cache
 
 class ApplyJobView(LoginRequiredMixin, CreateView):
     model = Application
@@ -111,36 +173,53 @@ class ApplyJobView(LoginRequiredMixin, CreateView):
         form.instance.job = job
         form.instance.applicant = self.request.user
         
-        if 'resume' in self.request.FILES:
-            resume_file = self.request.FILES['resume']
-            if resume_file.name.endswith('.pdf'):
-                parsed_text = extract_text_from_pdf(resume_file)
-                form.instance.parsed_text = parsed_text
+        resume_file = self.request.FILES.get('resume')
+        parse_async = getattr(settings, 'RESUME_PARSE_ASYNC', True)
+        parseable = bool(resume_file) and is_pdf(resume_file)
+
+        # Identical PDFs were already parsed for an earlier application
+        cached = None
+        if parseable:
+            # Already hashed while streaming in (see jobs/uploadhandlers.py)
+            form.instance.resume_sha256 = getattr(resume_file, 'sha256', None) or resume_cache.file_sha256(resume_file)
+            cached = resume_cache.lookup(form.instance.resume_sha256)
+
+        if cached is not None:
+            form.instance.parsed_text = cached.text
+            form.instance.parse_status = 'parsed'
+            if settings.RESUME_REUSE_STORED_FILES and cached.file_name and default_storage.exists(cached.file_name):
+                form.instance.resume = cached.file_name
+        elif not parseable:
+            form.instance.parse_status = 'skipped'
+        elif not parse_async:
+            form.instance.parsed_text = extract_text_from_pdf(resume_file)
+            form.instance.parse_status = 'parsed' if form.instance.parsed_text else 'failed'
         
         # Save first to get the ID/object
         response = super().form_valid(form)
+
+        if cached is None and parseable:
+            if parse_async:
+                # Resume text is extracted later by the process_resume_queue worker
+                enqueue_resume_parse(self.object)
+            elif self.object.parse_status == 'parsed':
+                resume_cache.store(self.object.resume_sha256, self.object.parsed_text,
+                                   size=resume_file.size, file_name=self.object.resume.name)
         
-        # Send Email Notifications
-        try:
-            # 1. To Applicant
-            send_mail(
-                subject=f'Application Received: {job.title}',
-                message=f'Hi {self.request.user.username},\n\nWe have received your application for {job.title} at {job.employer.company_name}.\n\nGood luck!',
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[self.request.user.email],
-                fail_silently=True,
-            )
-            
-            # 2. To Employer
-            send_mail(
-                subject=f'New Applicant for {job.title}',
-                message=f'Hello {job.employer.username},\n\n{self.request.user.username} has just applied for {job.title}. Check your dashboard to review their resume.',
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[job.employer.email],
-                fail_silently=True,
-            )
-        except Exception as e:
-            print(f"Email Error: {e}")
+        # Email notifications are delivered by the send_queued_emails worker
+        # 1. To Applicant
+        queue_email(
+            subject=f'Application Received: {job.title}',
+            message=f'Hi {self.request.user.username},\n\nWe have received your application for {job.title} at {job.employer.company_name}.\n\nGood luck!',
+            recipient_list=[self.request.user.email],
+        )
+
+        # 2. To Employer
+        queue_email(
+            subject=f'New Applicant for {job.title}',
+            message=f'Hello {job.employer.username},\n\n{self.request.user.username} has just applied for {job.title}. Check your dashboard to review their resume.',
+            recipient_list=[job.employer.email],
+        )
 
         messages.success(self.request, "Application submitted successfully!")
         return response
@@ -156,7 +235,16 @@ class EmployerDashboardView(EmployerRequiredMixin, ListView):
     context_object_name = 'jobs'
 
     def get_queryset(self):
-        return Job.objects.filter(employer=self.request.user).order_by('-created_at')
+        return (
+            Job.objects.filter(employer=self.request.user)
+            # Correlated count rather than JOIN + GROUP BY, so rows still come
+            # straight off the (employer, -created_at) index without a sort
+            .annotate(application_count=Coalesce(Subquery(
+                Application.objects.filter(job=OuterRef('pk')).order_by()
+                .values('job').annotate(count=Count('pk')).values('count')
+            ), 0))
+            .order_by('-created_at')
+        )
 
 class PostJobView(EmployerRequiredMixin, CreateView):
     model = Job
@@ -179,29 +267,47 @@ class UpdateJobView(EmployerRequiredMixin, UpdateView):
         # Ensure user owns the job
         return super().get_queryset().filter(employer=self.request.user)
 
+class RecommendedJobsView(SeekerRequiredMixin, TemplateView):
+    template_name = 'jobs/recommended_jobs.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Nearest neighbours of the seeker's applications and resume (see jobs/recommendations.py)
+        context['jobs'] = recommendations.recommend_jobs(self.request.user, k=10)
+        context['recommendations_available'] = recommendations.available()
+        return context
+
 class JobApplicationsView(EmployerRequiredMixin, ListView):
     model = Application
     template_name = 'jobs/job_applications.html'
     context_object_name = 'applications'
 
     def get_queryset(self):
-        job = get_object_or_404(Job, employer=self.request.user, slug=self.kwargs['slug'])
-        return Application.objects.filter(job=job).order_by('-applied_at')
+        self.job = get_object_or_404(Job, employer=self.request.user, slug=self.kwargs['slug'])
+        self.sort = 'match' if self.request.GET.get('sort') == 'match' and matching.available() else 'recent'
+        applications = Application.objects.filter(job=self.job).select_related('applicant').order_by('-applied_at')
+        if self.sort == 'match':
+            # Every applicant is scored in one batch (see jobs/matching.py)
+            return matching.rank_applications(self.job, applications)
+        return applications.defer('parsed_text', 'resume_terms')
 
-from django.http import JsonResponse
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['job'] = self.job
+        context['sort'] = self.sort
+        context['match_available'] = matching.available()
+        return context
+
+from django.http import Http404, HttpResponse, HttpResponseForbidden, JsonResponse
+from django.utils.crypto import constant_time_compare
 from django.db import connection
 
 def job_autocomplete(request):
     term = request.GET.get('term', '')
     results = {'titles': [], 'locations': []}
     if term:
-        # Search distinct titles
-        titles = Job.objects.filter(title__icontains=term).values_list('title', flat=True).distinct()[:5]
-        # Search distinct locations
-        locations = Job.objects.filter(location__icontains=term).values_list('location', flat=True).distinct()[:5]
-        
-        results['titles'] = list(titles)
-        results['locations'] = list(locations)
+        # Answered from the in-memory prefix index (see jobs/autocomplete.py)
+        results = get_autocomplete_service().complete(term, k=5)
     
     return JsonResponse(results)
 
@@ -223,5 +329,16 @@ def health_check(request):
             'error': str(e)
         }, status=500)
 
+def metrics(request):
+    """Request metrics of this worker process, for Prometheus (see jobs/metrics.py)"""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token:
+        # Fails closed: without a token only development servers expose metrics
+        if not settings.DEBUG:
+            raise Http404
+    elif not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponseForbidden()
+    return HttpResponse(request_metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 def custom_404(request, exception):
     return render(request, '404.html', status=404)